@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Benchmark of the memory allocations caused by the events of a tick.
+
+Emulates the events fired by the gamestate processors for a horde of moving
+and idle actors and counts, with `tracemalloc`, the memory blocks allocated
+per tick by the legacy `__dict__`-based events, by slotted events and by
+pooled slotted events.
+
+Run from the client source directory:
+
+    PYTHONPATH=. python benchmarks/bench_event_alloc.py
+"""
+from configparser import ConfigParser
+from context import Context
+from events import send_events
+from events import set_pool_size
+from events import subscriber
+from game.events import ActorIdle
+from game.events import ActorMove
+import tracemalloc
+
+N_ACTORS = 1000
+N_TICKS = 50
+
+
+class LegacyEvent:
+    """Event implementation prior to slots: context injected per instance."""
+
+    def __new__(cls, *args, **kwargs):
+        inst = super(LegacyEvent, cls).__new__(cls)
+        inst.context = Context.get_instance()
+        return inst
+
+
+class LegacyActorIdle(LegacyEvent):
+
+    def __init__(self, srv_id, x, y):
+        self.srv_id = srv_id
+        self.x, self.y = x, y
+
+
+class LegacyActorMove(LegacyEvent):
+
+    def __init__(self, srv_id, position, path, speed):
+        self.srv_id = srv_id
+        self.position = position
+        self.path = path
+        self.speed = speed
+
+
+def create_events(idle, move, create):
+    evts = []
+    for i in range(N_ACTORS):
+        if i % 2:
+            evts.append(create(idle, i, 1.0, 2.0))
+        else:
+            evts.append(create(move, i, (1.0, 2.0), [(1.5, 2.0)], 2.0))
+    return evts
+
+
+def measure(label, idle, move, create):
+    # Warm up caches and free lists
+    send_events(create_events(idle, move, create))
+
+    blocks, size, peak = 0, 0, 0
+    for _ in range(N_TICKS):
+        tracemalloc.start()
+        evts = create_events(idle, move, create)
+        # Every block still traced here was allocated during the tick
+        stats = tracemalloc.take_snapshot().statistics('filename')
+        send_events(evts)
+        _, tick_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        blocks += sum(s.count for s in stats)
+        size += sum(s.size for s in stats)
+        peak = max(peak, tick_peak)
+        del evts
+
+    print('{:<8} blocks/tick: {:>8.0f}  bytes/tick: {:>9.0f}  '
+          'peak bytes: {:>9}'.format(
+              label, blocks / N_TICKS, size / N_TICKS, peak))
+
+
+def main():
+    Context(ConfigParser())
+
+    @subscriber(ActorIdle)
+    def on_idle(evt):
+        pass
+
+    @subscriber(ActorMove)
+    def on_move(evt):
+        pass
+
+    def construct(cls, *args):
+        return cls(*args)
+
+    def acquire(cls, *args):
+        return cls.acquire(*args)
+
+    print('{} actors, {} ticks'.format(N_ACTORS, N_TICKS))
+    measure('legacy', LegacyActorIdle, LegacyActorMove, construct)
+    measure('slotted', ActorIdle, ActorMove, construct)
+    set_pool_size(N_ACTORS)
+    measure('pooled', ActorIdle, ActorMove, acquire)
+
+
+if __name__ == '__main__':
+    main()
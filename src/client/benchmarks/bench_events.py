@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Benchmark of the event dispatch throughput.
+
+Compares the legacy dispatcher (a defaultdict lookup and an eagerly formatted
+debug string per event) with the cached dispatch table, both with
+`send_event` and with batched `send_events`.
+
+Run from the client source directory:
+
+    PYTHONPATH=. python benchmarks/bench_events.py
+"""
+from collections import defaultdict
+from context import Context
+from configparser import ConfigParser
+from events import send_event
+from events import send_events
+from events import subscriber
+from game.events import ActorIdle
+import logging
+import time
+
+LOG = logging.getLogger('bench')
+
+N_EVENTS = 200000
+N_SUBSCRIBERS = 3
+
+
+def legacy_send_event(table, event):
+    LOG.debug('Sending event {}'.format(event))
+    for f in table[type(event)]:
+        f(event)
+
+
+def measure(label, f):
+    start = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - start
+    print('{:<30} {:>12.0f} events/s'.format(label, N_EVENTS / elapsed))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    Context(ConfigParser())
+
+    calls = [0]
+
+    def handler(evt):
+        calls[0] += 1
+
+    legacy_table = defaultdict(list)
+    for _ in range(N_SUBSCRIBERS):
+        legacy_table[ActorIdle].append(handler)
+        subscriber(ActorIdle)(handler)
+
+    evts = [ActorIdle(i, 1.0, 2.0) for i in range(N_EVENTS)]
+
+    def legacy():
+        for evt in evts:
+            legacy_send_event(legacy_table, evt)
+
+    def single():
+        for evt in evts:
+            send_event(evt)
+
+    def batch():
+        send_events(evts)
+
+    measure('legacy send_event', legacy)
+    measure('cached send_event', single)
+    measure('cached send_events (batch)', batch)
+
+
+if __name__ == '__main__':
+    main()
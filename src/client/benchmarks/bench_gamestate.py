@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Benchmark of the gamestate processing with logging at INFO level.
+
+Synthetic gamestates go through the same path as the ones received from the
+server: they are polled from the message proxy (decoding included), handled
+by the gamestate processors and dispatched to the event subscribers. No
+debug record is emitted at INFO level, so any time spent on debug logging is
+pure overhead.
+
+Run from the client source directory, on the revisions to be compared:
+
+    PYTHONPATH=. python benchmarks/bench_gamestate.py
+"""
+from configparser import ConfigParser
+from context import Context
+from game.components import Movable
+from game.entities.entity import Entity
+from game.gamestate import process_gamestate
+from inspect_history import synthetic_gamestates
+from network import Message
+from network import MessageProxy
+from network import MessageType as MT
+import logging
+import time
+
+
+N_ENTITIES = 500
+N_TICKS = 200
+
+
+class BenchActor(Entity):
+    """Actor without a visual representation."""
+
+    def __init__(self):
+        super().__init__(Movable((0.0, 0.0)))
+
+    def set_action(self, action):
+        pass
+
+    def update(self, dt):
+        pass
+
+    def remove(self):
+        pass
+
+
+class Null:
+    """Object accepting and ignoring any method call (eg. audio, UI)."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class ReplayConnection:
+    """Connection returning a fixed sequence of encoded messages."""
+
+    def __init__(self, packets):
+        self.packets = iter(packets)
+
+    def recv(self):
+        return next(self.packets, None)
+
+    def send(self, msgtype, payload):
+        pass
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s - %(levelname)s:%(name)s] %(message)s')
+    try:
+        from log import update_loggers
+    except ImportError:
+        pass
+    else:
+        update_loggers()
+
+    context = Context(ConfigParser())
+    context.audio_mgr = Null()
+    context.ui = Null()
+
+    # NOTE: the entities are registered in advance, since spawning them would
+    # require the resources and the renderer.
+    for srv_id in range(N_ENTITIES):
+        actor = BenchActor()
+        context.entities.add(actor, srv_id)
+
+    packets = [
+        Message(MT.gamestate, gamestate).encode()
+        for gamestate in synthetic_gamestates(N_ENTITIES, N_TICKS)
+    ]
+    proxy = MessageProxy(ReplayConnection(packets))
+
+    start = time.perf_counter()
+    for msg in proxy.poll():
+        process_gamestate(msg.data)
+    elapsed = time.perf_counter() - start
+
+    print('{} entities, {} gamestates: {:.2f} ms per gamestate'.format(
+        N_ENTITIES, N_TICKS, elapsed / N_TICKS * 1000))
+
+
+if __name__ == '__main__':
+    main()
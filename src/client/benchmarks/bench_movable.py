@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Benchmark of the update of the movable components.
+
+Compares the update of each movable in turn with the update of all the
+movables of a store at once (movement and orientation systems).
+
+Run from the client source directory:
+
+    PYTHONPATH=. python benchmarks/bench_movable.py
+"""
+from game.components import Movable
+from game.components import MovableStore
+from game.entities.entity import Entity
+import random
+import time
+
+
+SIZES = (10, 100, 1000, 5000)
+FRAMES = 100
+DT = 1 / 60
+
+
+class Walker(Entity):
+
+    def __init__(self, store, rand):
+        super().__init__(Movable((0.0, 0.0), store))
+        path = [(rand.uniform(-50, 50), rand.uniform(-50, 50)) for _ in range(4)]
+        self[Movable].move((0.0, 0.0), path, rand.uniform(1, 4))
+
+    def update(self, dt):
+        pass
+
+    def remove(self):
+        pass
+
+
+def measure(n, f):
+    store = MovableStore()
+    rand = random.Random(0)
+    movables = [Walker(store, rand)[Movable] for _ in range(n)]
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        f(store, movables)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def each(store, movables):
+    for movable in movables:
+        movable.update(DT)
+
+
+def batch(store, movables):
+    store.update(DT)
+
+
+def main():
+    print('{:>8} {:>12} {:>12}'.format('movables', 'each', 'store'))
+    for n in SIZES:
+        print('{:>8} {:>9.3f} ms {:>9.3f} ms'.format(
+            n, measure(n, each), measure(n, batch)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Benchmark of the ray versus bounding boxes intersection.
+
+Compares the legacy plane-by-plane test and the scalar slab test, called on
+each box in turn, with the vectorised slab test of all the boxes at once
+(both including and excluding the construction of the array of boxes).
+
+Run from the client source directory:
+
+    PYTHONPATH=. python benchmarks/bench_ray_aabb.py
+"""
+from matlib.vec import Vec
+from utils import bounding_boxes
+from utils import intersect
+from utils import ray_aabb
+import random
+import time
+
+
+SIZES = (10, 100, 1000, 10000)
+REPEAT = 20
+
+
+def legacy_intersection(pos, ray, norm, d):
+    t = -(pos.dot(norm) + d) / ray.dot(norm)
+    return pos + (ray * t)
+
+
+def legacy_intersect(pos, ray, bb):
+    l, m = bb
+    p = legacy_intersection(pos, ray, Vec(0, 0, -1), m.z)
+    if l.x <= p.x <= m.x and l.y <= p.y <= m.y:
+        return True
+    p = legacy_intersection(pos, ray, Vec(1, 0, 0), l.x)
+    if l.y <= p.y <= m.y and l.z <= p.z <= m.z:
+        return True
+    p = legacy_intersection(pos, ray, Vec(-1, 0, 0), m.x)
+    if l.y <= p.y <= m.y and l.z <= p.z <= m.z:
+        return True
+    p = legacy_intersection(pos, ray, Vec(0, -1, 0), m.y)
+    if l.x <= p.x <= m.x and l.z <= p.z <= m.z:
+        return True
+    p = legacy_intersection(pos, ray, Vec(1, 0, 0), l.z)
+    if l.x <= p.x <= m.x and l.y <= p.y <= m.y:
+        return True
+    return False
+
+
+def measure(f):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        f()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    rand = random.Random(0)
+    pos, ray = Vec(0, 16, 22), Vec(0.1, -0.6, -0.8)
+
+    print('{:>6} {:>12} {:>12} {:>12} {:>12}'.format(
+        'boxes', 'legacy', 'slab', 'batch+build', 'batch'))
+    for n in SIZES:
+        bbs = []
+        for _ in range(n):
+            x, z = rand.uniform(-50, 50), rand.uniform(-50, 50)
+            bbs.append((Vec(x - 0.5, 0, z - 0.5), Vec(x + 0.5, 2, z + 0.5)))
+        boxes = bounding_boxes(bbs)
+
+        legacy = measure(lambda: [legacy_intersect(pos, ray, bb) for bb in bbs])
+        slab = measure(lambda: [intersect(pos, ray, bb) for bb in bbs])
+        build = measure(lambda: ray_aabb(pos, ray, bounding_boxes(bbs)))
+        batch = measure(lambda: ray_aabb(pos, ray, boxes))
+        print('{:>6} {:>9.3f} ms {:>9.3f} ms {:>9.3f} ms {:>9.3f} ms'.format(
+            n, legacy, slab, build, batch))
+
+
+if __name__ == '__main__':
+    main()
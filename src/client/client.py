@@ -1,30 +1,56 @@
 from context import Context
+from core.clock import get_server_clock
+from core.clock import millis
+from core.loop import GameLoop
+from events import enable_deferred_events
 from events import send_event
-from game.actions import ray_cast
+from events import set_pool_size
+from game.archive import ArchiveWriter
+from game.components import get_movable_store
+from game.components import get_transform_counter
+from game.culling import VisibilityPass
+from game.entities.actor import Actor
 from game.entities.actor import ActorType
+from game.entities.building import Building
+from game.entities.enemy import Enemy
+from game.entities.enemy import enemy_resource
 from game.entities.map import Map
+from game.entities.map_object import MapObject
+from game.entities.pool import ActorPool
 from game.entities.terrain import Terrain
 from game.events import CharacterJoin
 from game.events import CharacterLeave
 from game.events import PlayerJoin
+from game.gamestate import add_recorder
 from game.gamestate import process_gamestate
+from game.history import GameStateHistory
+from game.materials import get_material_cache
+from game.scheduler import UpdateScheduler
+from game.spatial import SpatialHash
 from game.ui import UI
+from game.viewport import Viewport
+from hitch import enable_watchdog
+from hitch import get_watchdog
 from itertools import count
+from log import Lazy
+from log import get_logger
 from matlib.vec import Vec
 from network import Message
 from network import MessageField as MF
 from network import MessageType as MT
 from network import get_message_handlers
 from network import message_handler
+from profiling import FrameProfiler
 from renderlib.camera import PerspectiveCamera
 from renderlib.light import Light
 from renderlib.scene import Scene
 from utils import as_utf8
-from utils import tstamp
 import logging
+import os
+import time
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class Client:
@@ -63,6 +89,19 @@ class Client:
         context.res_mgr = res_mgr
         context.audio_mgr = audio_mgr
 
+        # Load ahead the resources of the entities spawned during the game
+        self.setup_resources(res_mgr, conf)
+
+        # Keep track of the number of entities of each kind
+        for cls in (Actor, Enemy, Building, MapObject):
+            context.entities.view(cls)
+
+        # Setup the free lists of the high-volume events
+        set_pool_size(conf.getint('Game', 'EventPoolSize', fallback=0))
+
+        # Setup the queue of the deferred subscribers (disabled by default)
+        self.deferred = self.setup_deferred_events(conf)
+
         # Setup the player
         c_res = res_mgr.get('/characters')
         c_data = c_res.data['map'][character]
@@ -74,13 +113,19 @@ class Client:
         map_res = res_mgr.get('/map')
         context.matrix = map_res['matrix']
         context.scale_factor = map_res.data['scale_factor']
+        context.entities.spatial = SpatialHash(context.scale_factor)
+        context.entities.scheduler = UpdateScheduler()
 
         # Setup lights, scene, camera, terrain and map
         context.light = self.setup_light()
         context.scene = self.setup_scene(context)
-        context.camera, context.ratio = self.setup_camera(context)
+        context.camera, context.viewport, context.ratio = self.setup_camera(context)
+        self.culling = VisibilityPass(context.viewport, get_movable_store())
         context.terrain = self.setup_terrain(context)
         context.map = self.setup_map(context)
+        context.enemy_pool = self.setup_enemy_pool(context, conf)
+        context.frame_profiler = self.setup_frame_profiler(conf)
+        self.setup_watchdog(conf)
 
         # Setup UI
         ui_res = context.res_mgr.get('/ui')
@@ -95,15 +140,162 @@ class Client:
 
         # Client status variable
         self.exit = False  # Wether or not the client should stop the game loop
-        self.last_update = None  # Last tick update
+        self.loop = self.setup_loop(conf)
 
-        self.sync_counter = count()  # The computed time delta with the server
+        self.sync_counter = count()  # The ids of the ping messages
         self._syncing = {}
-        self.delta = 0  # The computed time delta with the server
+        self.server_clock = get_server_clock()  # The mapping of server times
 
         self.time_acc = 0.0  # FPS time accumulator
         self.fps_count = 0  # FPS counter
 
+        # Gamestate history and archive (disabled by default)
+        self.history = self.setup_history(conf)
+        self.archive = self.setup_archive(conf)
+
+        # From now on, loading resources causes hitches
+        res_mgr.warm = True
+
+    def setup_loop(self, conf):
+        """Sets up the pacing of the main loop.
+
+        :param conf: Configuration
+        :type conf: mapping
+
+        :returns: The game loop
+        :rtype: :class:`core.loop.GameLoop`
+        """
+        rate = conf.getint('Game', 'SimulationRate', fallback=60)
+        max_fps = conf.getint('Game', 'MaxFPS', fallback=0)
+        return GameLoop(1.0 / rate, max_fps, self.renderer.vsync)
+
+    def setup_resources(self, res_mgr, conf):
+        """Loads the packages of all the entities and buildings.
+
+        :param res_mgr: The resource manager
+        :type res_mgr: :class:`loader.ResourceManager`
+
+        :param conf: Configuration
+        :type conf: mapping
+        """
+        entities = res_mgr.get('/entities')
+        packages = set(entities.data['entities_map'].values())
+        packages.update(entities.data['buildings_map'].values())
+
+        def progress(done, total, package):
+            LOG.info('Loading resources (%d/%d): %s', done, total, package)
+
+        workers = conf.getint('Game', 'WarmupWorkers', fallback=4)
+        res_mgr.warmup(sorted(packages), workers, progress)
+
+    def setup_deferred_events(self, conf):
+        """Sets up the queue of the deferred event subscribers.
+
+        :param conf: Configuration
+        :type conf: mapping
+
+        :returns: The queue or None, if disabled
+        :rtype: :class:`events.DeferredQueue`
+        """
+        budget = conf.getfloat('Game', 'EventBudget', fallback=0)
+        if not budget:
+            return None
+
+        return enable_deferred_events(budget / 1000.0)
+
+    def setup_enemy_pool(self, context, conf):
+        """Sets up the pool of the recycled enemies.
+
+        :param context: The client context
+        :type context: :class:`context.Context`
+
+        :param conf: Configuration
+        :type conf: mapping
+
+        :returns: The pool or None, if disabled
+        :rtype: :class:`game.entities.pool.ActorPool`
+        """
+        size = conf.getint('Game', 'EnemyPoolSize', fallback=0)
+        if not size:
+            return None
+
+        pool = ActorPool(Enemy, context.scene, max_size=size)
+        for actor_type in Enemy.MEMBERS:
+            pool.prewarm(enemy_resource(context, actor_type), actor_type, size)
+        return pool
+
+    def setup_frame_profiler(self, conf):
+        """Sets up the profiler of the phases of the main loop.
+
+        :param conf: Configuration
+        :type conf: mapping
+
+        :returns: The frame profiler or None, if disabled
+        :rtype: :class:`profiling.FrameProfiler`
+        """
+        frames = conf.getint('Debug', 'FrameProfile', fallback=0)
+        if frames <= 0:
+            return None
+        LOG.info('Profiling the last %d frames (F3: overlay, F4: export)', frames)
+        return FrameProfiler(frames)
+
+    def setup_watchdog(self, conf):
+        """Sets up the watchdog of the frames exceeding the time budget.
+
+        :param conf: Configuration
+        :type conf: mapping
+        """
+        budget = conf.getfloat('Debug', 'HitchBudget', fallback=0)
+        if budget <= 0:
+            return
+        path = conf.get('Debug', 'HitchReport', fallback='hitches.txt')
+        interval = conf.getfloat('Debug', 'HitchInterval', fallback=5)
+        # The frame pacing sleep and, with vertical sync, the buffer swap wait
+        # by design
+        exclude = ('present', 'wait') if self.renderer.vsync else ('wait',)
+        enable_watchdog(
+            budget / 1000, path, interval=interval / 1000, exclude=exclude)
+        LOG.info(
+            'Watching frames over %.1f ms, reporting to %s', budget, path)
+
+    def setup_history(self, conf):
+        """Sets up the history of the received gamestates.
+
+        :param conf: Configuration
+        :type conf: mapping
+
+        :returns: The gamestate history or None, if disabled
+        :rtype: :class:`game.history.GameStateHistory`
+        """
+        seconds = conf.getfloat('Debug', 'HistorySeconds', fallback=0)
+        if not seconds:
+            return None
+
+        budget = conf.getint('Debug', 'HistoryBudget', fallback=16)
+        history = GameStateHistory(seconds, budget * 1024 * 1024)
+        add_recorder(history.push)
+        return history
+
+    def setup_archive(self, conf):
+        """Sets up the columnar archive of the received gamestates.
+
+        :param conf: Configuration
+        :type conf: mapping
+
+        :returns: The archive writer or None, if disabled
+        :rtype: :class:`game.archive.ArchiveWriter`
+        """
+        path = conf.get('Debug', 'ArchiveDir', fallback=None)
+        if not path:
+            return None
+
+        # Each session is archived in its own subdirectory
+        path = os.path.join(path, time.strftime('session_%Y%m%d_%H%M%S'))
+        archive = ArchiveWriter(path)
+        LOG.info('Archiving the gamestates to %s', path)
+        add_recorder(archive.push)
+        return archive
+
     def setup_scene(self, context):
         """Sets up the scene.
 
@@ -152,7 +344,7 @@ class Client:
         :param context: Game context.
         :type context: :class:`context.Context`
 
-        :returns: The camera and the ratio
+        :returns: The camera, its viewport projection and the ratio
         :rtype: :class:`tuple`
         """
         # Aspect ratio
@@ -164,11 +356,12 @@ class Client:
         w = renderer_conf.getint('width')
         h = renderer_conf.getint('height')
 
-        p1 = ray_cast(0, 0, w, h, camera)
-        p2 = ray_cast(w, 0, w, h, camera)
+        viewport = Viewport(camera, w, h)
+        p1 = viewport.ground(0, 0)
+        p2 = viewport.ground(w, 0)
         ratio = (p1 - p2).mag() / w
 
-        return camera, ratio
+        return camera, viewport, ratio
 
     def setup_light(self):
         light = Light()
@@ -186,21 +379,6 @@ class Client:
         """
         return len(self._syncing) > 0
 
-    def dt(self):
-        """Returns the dt from the last update.
-
-        NOTE: this method updates the internal status of the client.
-
-        :returns: The dt from the last update in seconds
-        :rtype: float
-        """
-        now = tstamp()
-        if self.last_update is None:
-            self.last_update = now
-        dt = (now - self.last_update) / 1000.0
-        self.last_update = now
-        return dt
-
     def update_fps_counter(self, dt):
         """Helper function to handle the fps counter.
 
@@ -212,16 +390,44 @@ class Client:
         if self.time_acc >= 1:
             # Update fps count and reset the helper variables.
             self.time_acc -= 1
-            self.context.ui.set_fps(self.fps_count)
+            frames = self.fps_count
+            self.context.ui.set_fps(frames)
             self.fps_count = 0
 
+            if self.context.show_frame_stats:
+                self.context.ui.set_frame_stats(
+                    self.context.frame_profiler.table())
+
+            if self.deferred and LOG.isEnabledFor(logging.DEBUG):
+                LOG.debug(
+                    'Deferred events: depth={depth} max_depth={max_depth} '
+                    'mean_latency={mean_latency:.4f} '
+                    'p99_latency={p99_latency:.4f}'.format(
+                        **self.deferred.stats()))
+
+            LOG.debug('Entities: %s', Lazy(self.context.entities.counts))
+            LOG.debug('Visibility: %s', Lazy(self.culling.counts))
+            LOG.debug('Materials: %s', Lazy(get_material_cache().counts))
+
+            pool = self.context.enemy_pool
+            if pool is not None and LOG.isEnabledFor(logging.DEBUG):
+                LOG.debug(
+                    'Enemy pool: free={free} hits={hits} misses={misses} '
+                    'mean_latency={mean_latency:.4f} '
+                    'p99_latency={p99_latency:.4f}'.format(**pool.stats()))
+
+            writes, avoided = get_transform_counter().reset()
+            LOG.debug(
+                'Transforms per frame: %.1f written, %.1f avoided',
+                writes / frames, avoided / frames)
+
     def process_message(self, msg):
         """Processes a message received from the server.
 
         :param msg: the message to be processed
         :type msg: :class:`message.Message`
         """
-        LOG.debug('Processing message: {} {}'.format(msg, msg.data))
+        LOG.debug('Processing message: %s %s', msg, msg.data)
         for func in get_message_handlers(msg.msgtype):
             func(self, msg)
 
@@ -238,10 +444,10 @@ class Client:
 
         # Create and enqueue the ping message
         sync_id = next(self.sync_counter)
-        msg = Message(MT.ping, {MF.id: sync_id, MF.timestamp: tstamp()})
+        msg = Message(MT.ping, {MF.id: sync_id, MF.timestamp: int(millis())})
 
         def callback():
-            self._syncing[sync_id] = tstamp()
+            self._syncing[sync_id] = millis()
 
         self.proxy.enqueue(msg, callback)
 
@@ -271,28 +477,68 @@ class Client:
         self.ping()
         self.join(self.context.character_name, self.context.character_type)
 
+        store = get_movable_store()
+
+        # Time the phases of each frame and watch for hitches, if the frame
+        # profiler or the watchdog are enabled
+        timers = [
+            t for t in (self.context.frame_profiler, get_watchdog())
+            if t is not None
+        ]
+
+        def begin():
+            for t in timers:
+                t.begin()
+
+        def mark(phase):
+            for t in timers:
+                t.mark(phase)
+
+        def end():
+            for t in timers:
+                t.end()
+
         while not self.exit:
-            # Compute time delta
-            dt = self.dt()
+            # Compute the number of simulation steps and the frame time
+            steps, dt = self.loop.advance()
+            begin()
 
             # Update FPS stats
             self.update_fps_counter(dt)
 
             # Poll messages from network
             self.poll_network()
+            mark('network')
 
             # Process user input
             self.context.input_mgr.process_input()
+            mark('input')
+
+            # Execute the deferred subscribers within the frame budget
+            if self.deferred:
+                self.deferred.drain()
+            mark('deferred')
 
-            # Update entities
-            for ent in self.context.entities.values():
-                ent.update(dt)
+            # Advance the simulation of all the entities by fixed steps
+            for _ in range(steps):
+                store.update(self.loop.step)
+            mark('simulation')
+
+            # Update the active entities, rendered between the last two
+            # simulation steps
+            store.alpha = self.loop.alpha
+            self.culling.update()
+            self.context.entities.scheduler.update(dt)
+            mark('entities')
 
             # rendering
             self.renderer.clear()
             self.context.scene.render(self.context.camera, self.context.light)
+            mark('scene')
             self.context.ui.render()
+            mark('ui')
             self.renderer.present()
+            mark('present')
 
             # Enqueue messages in context and emtpy the queue
             for msg in self.context.msg_queue:
@@ -301,6 +547,12 @@ class Client:
 
             # Push messages in the proxy queue
             self.proxy.push()
+            mark('messages')
+
+            # Sleep until the next frame
+            self.loop.wait()
+            mark('wait')
+            end()
 
     @message_handler(MT.pong)
     def pong(self, msg):
@@ -309,11 +561,12 @@ class Client:
         :param msg: The pong message
         :type msg: :class:`network.message.Message`
         """
-        now = tstamp(0)
+        now = millis()
         sent_at = self._syncing.pop(msg.data[MF.id])
-        self.delta = (
-            now - msg.data[MF.timestamp] + (now - sent_at) / 2)
-        LOG.info('Synced time with server: delta={}'.format(self.delta))
+        offset = self.server_clock.sync(sent_at, msg.data[MF.timestamp], now)
+        LOG.info(
+            'Synced time with server: offset={:.1f} ms, rtt={:.1f} ms'.format(
+                offset, self.server_clock.rtt))
 
     @message_handler(MT.stay)
     def handle_stay(self, msg):
@@ -380,13 +633,16 @@ class Client:
 
         Convert the server timestamp to the client one. Every timestamp in the
         gamestate messages payload from now on is to be considered comparable to
-        the local timestamp (as returned by `utils.tstamp` function.
+        the local timestamp (as returned by `core.clock.millis` function); the
+        gamestates received before the time sync are stamped with the local
+        time they were received at.
 
         :param msg: the message to be processed
         :type msg: :class:`message.Message`
         """
         LOG.debug('Processing gamestate message')
-        # Update the server timestamp adding the offset calculated after the
-        # ping-pong exchange.
-        msg.data[MF.timestamp] += self.delta or 0
+        # Map the server timestamp onto the local clock, using the offset
+        # calculated after the ping-pong exchange.
+        msg.data[MF.timestamp] = self.server_clock.to_local(
+            msg.data[MF.timestamp])
         process_gamestate(msg.data)
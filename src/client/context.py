@@ -1,7 +1,194 @@
 from collections import defaultdict
+from collections.abc import MutableMapping
 from enum import Enum
 from enum import unique
-from utils import intersect
+from itertools import chain
+from utils import bounding_boxes
+from utils import ray_aabb
+
+
+class EntityRegistry(MutableMapping):
+    """Registry of the game entities.
+
+    Maps the local ids to the entities and keeps the mapping between local and
+    server ids in both directions. Views of the entities of given classes (eg.
+    enemies, buildings) are kept up to date as entities are added and removed.
+
+    The registry behaves as a mapping of the local ids to the entities.
+    """
+
+    def __init__(self):
+        self.entities = {}
+        #: Server id to local id
+        self.server_map = {}
+        #: Local id to server id
+        self.local_map = {}
+        self.views = {}
+        #: Spatial index of the entities with a server id (if any)
+        self.spatial = None
+        #: Scheduler of the entity updates (if any)
+        self.scheduler = None
+
+    def __getitem__(self, e_id):
+        return self.entities[e_id]
+
+    def __setitem__(self, e_id, entity):
+        if e_id != entity.e_id:
+            raise ValueError('entity {} registered as {}'.format(
+                entity.e_id, e_id))
+        self.add(entity)
+
+    def __delitem__(self, e_id):
+        self.remove(e_id)
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add(self, entity, srv_id=None, routed=True):
+        """Adds an entity.
+
+        Entities with a server id are registered as the targets of the events
+        addressed to it (see :func:`events.keyed_subscriber`), unless they are
+        not `routed`.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+
+        :param srv_id: The server id of the entity (if any)
+        :type srv_id: int
+
+        :param routed: Whether the entity is the target of the events addressed
+            to its server id
+        :type routed: bool
+
+        :raises ValueError: if the server id is already registered
+        """
+        # imported here, since the events refer to the context
+        from events import add_route
+
+        if srv_id is not None and srv_id in self.server_map:
+            raise ValueError('server id {} already registered'.format(srv_id))
+
+        e_id = entity.e_id
+        if e_id in self.entities:
+            self.remove(e_id)
+        self.entities[e_id] = entity
+        if self.scheduler is not None:
+            self.scheduler.add(entity)
+        if srv_id is not None:
+            self.server_map[srv_id] = e_id
+            self.local_map[e_id] = srv_id
+            if routed:
+                add_route(srv_id, entity)
+            if self.spatial is not None:
+                self.spatial.add(entity)
+        for cls, view in self.views.items():
+            if isinstance(entity, cls):
+                view[e_id] = entity
+
+    def remove(self, e_id):
+        """Removes an entity.
+
+        :param e_id: The local id of the entity
+        :type e_id: int
+
+        :returns: The removed entity
+        :rtype: :class:`game.entities.entity.Entity`
+
+        :raises KeyError: if the entity is not registered
+        """
+        from events import remove_route
+
+        entity = self.entities.pop(e_id)
+        if self.scheduler is not None:
+            self.scheduler.remove(entity)
+        srv_id = self.local_map.pop(e_id, None)
+        if srv_id is not None:
+            del self.server_map[srv_id]
+            remove_route(srv_id)
+            if self.spatial is not None:
+                self.spatial.remove(entity)
+        for view in self.views.values():
+            view.pop(e_id, None)
+        return entity
+
+    def remove_server(self, srv_id):
+        """Removes the entity with the given server id.
+
+        :param srv_id: The server id of the entity
+        :type srv_id: int
+
+        :returns: The removed entity or None, if not registered
+        :rtype: :class:`game.entities.entity.Entity`
+        """
+        e_id = self.server_map.get(srv_id)
+        if e_id is None:
+            return None
+        return self.remove(e_id)
+
+    def resolve(self, srv_id):
+        """Returns the entity with the given server id.
+
+        :param srv_id: The server id
+        :type srv_id: int
+
+        :returns: The entity or None, if not registered
+        :rtype: :class:`game.entities.entity.Entity`
+        """
+        return self.entities.get(self.server_map.get(srv_id))
+
+    def server_id(self, e_id):
+        """Returns the server id of an entity.
+
+        :param e_id: The local id of the entity
+        :type e_id: int
+
+        :returns: The server id or None, if the entity has none
+        :rtype: int
+        """
+        return self.local_map.get(e_id)
+
+    def view(self, cls):
+        """Returns the entities of the given class.
+
+        The view is built on the first call and kept up to date afterwards; it
+        must not be modified.
+
+        :param cls: The entity class
+        :type cls: type
+
+        :returns: Mapping of the local ids to the entities
+        :rtype: dict
+        """
+        view = self.views.get(cls)
+        if view is None:
+            view = self.views[cls] = {
+                e_id: entity
+                for e_id, entity in self.entities.items()
+                if isinstance(entity, cls)
+            }
+        return view
+
+    def counts(self):
+        """Returns the number of registered entities.
+
+        :returns: Mapping of the counts: `total`, `server` (entities with a
+            server id), the name of each viewed class and, if scheduled,
+            `active` and `sleeping`
+        :rtype: dict
+        """
+        counts = {
+            'total': len(self.entities),
+            'server': len(self.server_map),
+        }
+        if self.scheduler is not None:
+            counts.update(self.scheduler.counts())
+        for cls, view in self.views.items():
+            counts[cls.__name__] = len(view)
+        return counts
 
 
 class Context:
@@ -37,15 +224,23 @@ class Context:
         self.scale_factor = 1
         self.scene = None
         self.camera = None
+        self.viewport = None
         self.ratio = None
         self.map = None
         self.terrain = None
         self.ui = None
         self.light = None
 
-        # Entity related maps
-        self.server_entities_map = {}
-        self.entities = {}
+        # Entity registry
+        self.entities = EntityRegistry()
+
+        # Pool of the recycled enemies (if any)
+        self.enemy_pool = None
+
+        # Profiler of the phases of the main loop (if any) and whether its
+        # overlay is shown
+        self.frame_profiler = None
+        self.show_frame_stats = False
 
         # Local player entity information
         self.player_name = None
@@ -73,6 +268,11 @@ class Context:
     def player(self):
         return self.resolve_entity(self.player_id)
 
+    @property
+    def server_entities_map(self):
+        """Mapping of the server ids to the local ids (read only)."""
+        return self.entities.server_map
+
     def resolve_entity(self, srv_id):
         """Resolve the srv_id into the local id of the entity.
 
@@ -82,7 +282,7 @@ class Context:
         :returns: The entity object
         :rtype: :class:`game.entities.entity.Entity`
         """
-        return self.entities.get(self.server_entities_map.get(srv_id))
+        return self.entities.resolve(srv_id)
 
     def server_id(self, e_id):
         """Take the entity or id and return the corresponding server id.
@@ -93,8 +293,7 @@ class Context:
         :returns: The server id
         :rtype: :class:`int`
         """
-        reverse_map = {v: k for k, v in self.server_entities_map.items()}
-        return reverse_map.get(e_id)
+        return self.entities.server_id(e_id)
 
     def get_entity(self, e_id):
         """Returns the entity identified by the given (local) id.
@@ -123,8 +322,8 @@ class Context:
             prev, self.game_mode = self.game_mode, mode
         return prev, self.game_mode
 
-    def pick_entity(self, pos, ray):
-        """Picks an entity and returns it.
+    def pick_entities(self, pos, ray):
+        """Picks all the entities hit by a ray.
 
         :param pos: The origin of the ray
         :type pos: :class:`mathlib.Vec`
@@ -132,21 +331,43 @@ class Context:
         :param ray: The normalized ray vector
         :type ray: :class:`mathlib.Vec`
 
-        :returns: The entity picked
-        :rtype: :class:`game.entities.entity.Entity` or None
+        :returns: The entities hit and the distances of the hits, sorted
+            front-to-back
+        :rtype: list of tuple
         """
-        # This is the list of the entities, sorted by z-axis (reverse order)
-        entities = sorted(
-            [
+        spatial = self.entities.spatial
+        if spatial is not None:
+            candidates = chain.from_iterable(spatial.query_ray(pos, ray))
+        else:
+            candidates = (
                 self.entities[e_id]
-                for e_id in self.server_entities_map.values()
-                if self.entities[e_id].bounding_box
-            ],
-            key=lambda entity: entity.bounding_box[1].z, reverse=True)
+                for e_id in self.server_entities_map.values())
+
+        entities, bbs = [], []
+        for entity in candidates:
+            bb = entity.bounding_box
+            if bb:
+                entities.append(entity)
+                bbs.append(bb)
+        if not entities:
+            return []
+
+        hits, distances = ray_aabb(pos, ray, bounding_boxes(bbs))
+        return [
+            (entities[i], t) for i, t in zip(hits.tolist(), distances.tolist())
+        ]
+
+    def pick_entity(self, pos, ray):
+        """Picks an entity and returns it.
+
+        :param pos: The origin of the ray
+        :type pos: :class:`mathlib.Vec`
 
-        # Check eventual intersections between the ray and the bounding boxes
-        for e in entities:
-            if intersect(pos, ray, e.bounding_box):
-                return e
+        :param ray: The normalized ray vector
+        :type ray: :class:`mathlib.Vec`
 
-        return None
+        :returns: The nearest entity hit by the ray
+        :rtype: :class:`game.entities.entity.Entity` or None
+        """
+        hits = self.pick_entities(pos, ray)
+        return hits[0][0] if hits else None
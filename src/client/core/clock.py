@@ -0,0 +1,122 @@
+"""Time keeping of the client.
+
+Local times are read from a monotonic high resolution clock, which is not
+affected by the changes of the system wall clock; its origin is arbitrary, so
+they are only meaningful relative to each other. Server times (in
+milliseconds since epoch) are mapped onto the local clock by
+:class:`ServerClock`, using the offset estimated by the ping/pong exchange.
+"""
+from collections import deque
+import time
+
+
+#: Local time in seconds, from a monotonic high resolution clock
+monotonic = time.perf_counter
+
+
+def millis():
+    """Returns the local time in milliseconds.
+
+    :returns: The local time
+    :rtype: float
+    """
+    return monotonic() * 1000.0
+
+
+class ServerClock:
+    """Mapping between the server clock and the local clock.
+
+    Each time sync yields an estimate of the offset between the two clocks,
+    assuming the server read its clock halfway through the round trip; the
+    estimate of the fastest of the most recent round trips is the most
+    accurate one, since it leaves the least room for asymmetric delays.
+    """
+
+    def __init__(self, max_samples=8):
+        """Constructor.
+
+        :param max_samples: Number of most recent time syncs the offset is
+            chosen among
+        :type max_samples: int
+        """
+        # Pairs of (round trip time, offset) in milliseconds
+        self.samples = deque(maxlen=max_samples)
+        #: Server time minus local time in milliseconds (None until synced)
+        self.offset = None
+        #: Round trip time of the sync the offset comes from, in milliseconds
+        self.rtt = None
+
+    @property
+    def synced(self):
+        """Whether the offset between the clocks is known."""
+        return self.offset is not None
+
+    def sync(self, sent_at, server_time, received_at):
+        """Updates the offset with the result of a ping/pong exchange.
+
+        :param sent_at: Local time the ping was sent at, in milliseconds
+        :type sent_at: float
+
+        :param server_time: Server time of the pong, in milliseconds
+        :type server_time: int
+
+        :param received_at: Local time the pong was received at, in
+            milliseconds
+        :type received_at: float
+
+        :returns: The current offset in milliseconds
+        :rtype: float
+        """
+        rtt = received_at - sent_at
+        self.samples.append((rtt, server_time - (sent_at + received_at) / 2))
+        self.rtt, self.offset = min(self.samples)
+        return self.offset
+
+    def to_local(self, server_time):
+        """Converts a server time to local time.
+
+        Until the clocks are synced the offset is unknown, and the current
+        local time is returned instead: a message received before the sync is
+        then stamped with the time it was received at, on the same scale as
+        the messages received afterwards.
+
+        :param server_time: The server time in milliseconds
+        :type server_time: int
+
+        :returns: The local time in milliseconds
+        :rtype: float
+        """
+        if self.offset is None:
+            return millis()
+        return server_time - self.offset
+
+    def to_server(self, local_time):
+        """Converts a local time to server time.
+
+        :param local_time: The local time in milliseconds
+        :type local_time: float
+
+        :returns: The server time in milliseconds
+        :rtype: float
+        """
+        return local_time + (self.offset or 0)
+
+    def now(self):
+        """Returns the estimated server time.
+
+        :returns: The server time in milliseconds
+        :rtype: float
+        """
+        return self.to_server(millis())
+
+
+__SERVER_CLOCK = ServerClock()
+
+
+def get_server_clock():
+    """Returns the clock of the server the client is connected to.
+
+    :returns: The server clock
+    :rtype: :class:`core.clock.ServerClock`
+    """
+    return __SERVER_CLOCK
@@ -6,6 +6,8 @@ from events import Event
 class MouseClickEvent(Event):
     """Mouse click event."""
 
+    __slots__ = ('x', 'y', 'button', 'state')
+
     @unique
     class Button(Enum):
         """Enumeration of mouse buttons."""
@@ -50,6 +52,8 @@ class MouseClickEvent(Event):
 class MouseMoveEvent(Event):
     """Mouse move event."""
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         """Constructor.
 
@@ -69,6 +73,8 @@ class MouseMoveEvent(Event):
 class KeyPressEvent(Event):
     """Key press event."""
 
+    __slots__ = ('key',)
+
     @unique
     class State(Enum):
         """Enumeration of key states."""
@@ -16,7 +16,12 @@ class InputManager:
     """
 
     def process_input(self):
-        """Process buffered input and dispatch resulting events."""
+        """Process buffered input and dispatch resulting events.
+
+        Mouse motions are coalesced: only the latest position is dispatched,
+        before any click and at the end of the batch.
+        """
+        motion = None
         events = sdl_ext.get_events()
         for evt in events:
             if evt.type in {sdl.SDL_KEYUP}:
@@ -24,10 +29,13 @@ class InputManager:
                 send_event(KeyPressEvent(key_event.keysym.sym))
 
             elif evt.type in {sdl.SDL_MOUSEMOTION}:
-                mouse_motion = evt.motion
-                send_event(MouseMoveEvent(mouse_motion.x, mouse_motion.y))
+                motion = evt.motion.x, evt.motion.y
 
             elif evt.type in {sdl.SDL_MOUSEBUTTONDOWN, sdl.SDL_MOUSEBUTTONUP}:
+                if motion:
+                    send_event(MouseMoveEvent(*motion))
+                    motion = None
+
                 mouse_event = evt.button
 
                 if mouse_event.button == sdl.SDL_BUTTON_LEFT:
@@ -48,6 +56,9 @@ class InputManager:
                     button,
                     state))
 
+        if motion:
+            send_event(MouseMoveEvent(*motion))
+
     @property
     def mouse_position(self):
         """Current mouse position in screen coordinates.
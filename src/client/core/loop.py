@@ -0,0 +1,81 @@
+"""Pacing of the client main loop.
+
+The simulation advances by fixed steps, decoupled from the rendering: each
+frame runs as many steps as the elapsed time requires and renders the state
+interpolated between the last two steps. Frames are capped to a maximum rate
+by sleeping, unless the vertical sync of the display already paces them.
+"""
+from core.clock import monotonic
+import time
+
+
+class GameLoop:
+    """Fixed step simulation clock and frame pacer."""
+
+    #: Time before the frame deadline spent spinning instead of sleeping, to
+    # make up for the coarse resolution of `time.sleep`
+    SPIN = 0.001
+
+    def __init__(self, step, max_fps=0, vsync=False, max_frame=0.25,
+                 clock=monotonic, sleep=time.sleep):
+        """Constructor.
+
+        :param step: The duration of a simulation step in seconds
+        :type step: float
+
+        :param max_fps: The maximum number of frames per second (0 for no cap)
+        :type max_fps: int
+
+        :param vsync: Whether the frames are already paced by vertical sync
+        :type vsync: bool
+
+        :param max_frame: The longest frame time simulated; longer frames (eg.
+            at startup or after a stall) are truncated
+        :type max_frame: float
+
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+
+        :param sleep: Function suspending the execution for a given time
+        :type sleep: callable
+        """
+        self.step = step
+        self.period = 1.0 / max_fps if max_fps and not vsync else 0.0
+        self.max_frame = max_frame
+        self.clock = clock
+        self.sleep = sleep
+
+        self.last = None  # start time of the current frame
+        self.accumulator = 0.0  # simulation time left over
+        self.alpha = 0.0  # interpolation factor of the current frame
+        self.slept = 0.0  # total time spent sleeping
+
+    def advance(self):
+        """Starts a new frame.
+
+        :returns: The number of simulation steps to run and the time elapsed
+            since the start of the previous frame in seconds
+        :rtype: :class:`tuple`
+        """
+        now = self.clock()
+        dt = 0.0 if self.last is None else now - self.last
+        self.last = now
+
+        self.accumulator += min(dt, self.max_frame)
+        steps = int(self.accumulator / self.step)
+        self.accumulator -= steps * self.step
+        self.alpha = self.accumulator / self.step
+        return steps, dt
+
+    def wait(self):
+        """Waits for the start of the next frame, if frames are capped."""
+        if not self.period or self.last is None:
+            return
+
+        deadline = self.last + self.period
+        remaining = deadline - self.clock()
+        if remaining > self.SPIN:
+            self.sleep(remaining - self.SPIN)
+            self.slept += remaining - self.SPIN
+        while self.clock() < deadline:
+            pass
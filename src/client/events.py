@@ -1,26 +1,177 @@
-from abc import ABC
-from context import Context
+from abc import ABCMeta
 from collections import defaultdict
+from context import Context
+from heapq import heappop
+from heapq import heappush
+from hitch import get_watchdog
+from itertools import count
+from log import get_logger
+from profiling import CallStats
+from profiling import get_profiler
 import logging
+import time
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 __SUBSCRIBED = defaultdict(list)
 
+# Keyed subscribers: handlers called only with the target registered for the
+# server id the event is addressed to.
+__KEYED = defaultdict(list)
+__ROUTES = {}
+
+# Dispatch table: maps each concrete event class to the tuple of its
+# subscribers, merged along the class hierarchy. Cleared at every subscription.
+__DISPATCH = {}
+
+# The queue of deferred subscriber calls (if enabled)
+__DEFERRED = None
 
-def subscriber(event):
+
+def subscriber(event, deferred=False, priority=0):
     """Decorator for event handlers.
 
+    Handlers subscribed to an event class are called for the events of any of
+    its subclasses too.
+
+    Non-critical handlers (eg. sounds, UI updates) can be deferred: when the
+    deferred queue is enabled, their calls are queued and executed by
+    :meth:`DeferredQueue.drain` within the time budget of each frame,
+    otherwise they are called immediately like any other handler.
+
     :param event: the event to be handled
     :type event: :class:`Event`
+
+    :param deferred: Whether the calls to the handler can be deferred
+    :type deferred: bool
+
+    :param priority: The priority of deferred calls (lower values first)
+    :type priority: int
     """
     def wrap(f):
-        __SUBSCRIBED[event].append(f)
+        __SUBSCRIBED[event].append(defer(f, priority) if deferred else f)
+        __DISPATCH.clear()
         return f
     return wrap
 
 
+def defer(f, priority):
+    """Builds the subscriber queueing the calls to a deferred handler.
+
+    :param f: The deferred handler
+    :type f: function
+
+    :param priority: The priority of the calls
+    :type priority: int
+
+    :returns: The subscriber function
+    :rtype: function
+    """
+    def deferred(event):
+        queue = __DEFERRED
+        if queue is None:
+            f(event)
+        else:
+            queue.push(f, event, priority)
+
+    deferred.__module__ = f.__module__
+    deferred.__qualname__ = 'defer({})'.format(f.__qualname__)
+    return deferred
+
+
+def keyed_subscriber(event):
+    """Decorator for event handlers bound to the addressed entity.
+
+    The decorated function is called as `f(target, event)` only if a target has
+    been registered with :func:`add_route` for the `srv_id` of the event, so it
+    does not need to resolve the entity by itself.
+
+    :param event: the event to be handled
+    :type event: :class:`Event`
+    """
+    def wrap(f):
+        __KEYED[event].append(f)
+        __DISPATCH.clear()
+        return f
+    return wrap
+
+
+def add_route(srv_id, target):
+    """Registers the target of the events addressed to a server id.
+
+    :param srv_id: The server id
+    :type srv_id: int
+
+    :param target: The target of the events (usually the game entity)
+    :type target: object
+    """
+    __ROUTES[srv_id] = target
+
+
+def remove_route(srv_id):
+    """Unregisters the target of the events addressed to a server id.
+
+    :param srv_id: The server id
+    :type srv_id: int
+
+    :returns: The target previously registered (if any)
+    :rtype: object
+    """
+    return __ROUTES.pop(srv_id, None)
+
+
+def router(handlers):
+    """Builds the subscriber dispatching an event to its keyed handlers.
+
+    :param handlers: The keyed handlers
+    :type handlers: tuple
+
+    :returns: The subscriber function
+    :rtype: function
+    """
+    routes = __ROUTES
+
+    def route(event):
+        target = routes.get(event.srv_id)
+        if target is not None:
+            for f in handlers:
+                f(target, event)
+
+    route.__qualname__ = 'route({})'.format(
+        ', '.join(f.__qualname__ for f in handlers))
+    return route
+
+
+def get_subscribers(event_cls):
+    """Returns all the handlers to be called for the given event class.
+
+    Subscribers of the most specific classes come first, followed by a single
+    router for the keyed subscribers (if any). The result is computed once for
+    each class and cached until a new subscriber is registered.
+
+    :param event_cls: The concrete event class
+    :type event_cls: type
+
+    :returns: The event handlers
+    :rtype: tuple
+    """
+    subscribers = __DISPATCH.get(event_cls)
+    if subscribers is None:
+        merged, keyed = [], []
+        for cls in event_cls.__mro__:
+            for f in __SUBSCRIBED.get(cls, ()):
+                if f not in merged:
+                    merged.append(f)
+            for f in __KEYED.get(cls, ()):
+                if f not in keyed:
+                    keyed.append(f)
+        if keyed:
+            merged.append(router(tuple(keyed)))
+        subscribers = __DISPATCH[event_cls] = tuple(merged)
+    return subscribers
+
+
 def send_event(event):
     """Emits the given event.
 
@@ -29,16 +180,275 @@ def send_event(event):
     :param event: The event to be emitted.
     :type event: :class:`game.events.Event`
     """
-    LOG.debug('Sending event {}'.format(event))
-    for subscriber in __SUBSCRIBED[type(event)]:
-        subscriber(event)
+    LOG.debug('Sending event %s', event)
+    watchdog = get_watchdog()
+    if watchdog:
+        watchdog.event_sent(event)
+
+    profiler = get_profiler()
+    if profiler:
+        profiler.event_sent()
+        for subscriber in get_subscribers(type(event)):
+            profiler.call('subscriber', subscriber, event)
+    else:
+        for subscriber in get_subscribers(type(event)):
+            subscriber(event)
+
+    if isinstance(event, PooledEvent):
+        event.release()
+
+
+def send_events(events):
+    """Emits the given events, in order.
+
+    Equivalent to calling :func:`send_event` for each event, without paying
+    the per-call overhead.
+
+    :param events: The events to be emitted.
+    :type events: sequence of :class:`game.events.Event`
+    """
+    if get_profiler() or LOG.isEnabledFor(logging.DEBUG):
+        for event in events:
+            send_event(event)
+        return
+
+    dispatch = __DISPATCH
+    watchdog = get_watchdog()
+    for event in events:
+        cls = type(event)
+        if watchdog:
+            watchdog.event_sent(event)
+        for subscriber in dispatch.get(cls) or get_subscribers(cls):
+            subscriber(event)
+        if isinstance(event, PooledEvent):
+            event.release()
 
 
-class Event(ABC):
+class DeferredQueue:
+    """Priority queue of deferred subscriber calls.
+
+    Calls are executed in order of priority and, for equal priorities, in
+    order of emission. Calls for events addressed to the same entity (ie.
+    with the same `srv_id`) are always executed in order of emission: a call
+    inherits the priority of the last pending call for its entity, when
+    lower.
+    """
+
+    def __init__(self, budget, max_samples=1000):
+        """Constructor.
+
+        :param budget: Time available to deferred calls in each frame, in
+            seconds
+        :type budget: float
+
+        :param max_samples: Number of latencies kept to compute percentiles
+        :type max_samples: int
+        """
+        self.budget = budget
+        self.heap = []
+        self.seq = count()
+        # Priority and sequence number of the last pending call of each entity
+        self.pending = {}
+
+        self.max_depth = 0
+        self.latency = CallStats(max_samples)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, f, event, priority=0):
+        """Queues the call of a handler.
+
+        :param f: The handler
+        :type f: function
+
+        :param event: The event to be handled
+        :type event: :class:`Event`
+
+        :param priority: The priority of the call (lower values first)
+        :type priority: int
+        """
+        seq = next(self.seq)
+        key = getattr(event, 'srv_id', None)
+        if key is not None:
+            last = self.pending.get(key)
+            if last is not None and last[0] > priority:
+                priority = last[0]
+            self.pending[key] = priority, seq
+
+        if isinstance(event, PooledEvent):
+            # NOTE: pooled events can't be recycled until handled.
+            event.holds = getattr(event, 'holds', 0) + 1
+
+        heappush(self.heap, (priority, seq, key, time.perf_counter(), f, event))
+        self.max_depth = max(self.max_depth, len(self.heap))
+
+    def drain(self, budget=None):
+        """Executes the queued calls until the time budget is exhausted.
+
+        At least one call is executed, so that the queue always makes progress.
+
+        :param budget: The time budget in seconds (default: the frame budget)
+        :type budget: float
+
+        :returns: The number of executed calls
+        :rtype: int
+        """
+        heap = self.heap
+        if not heap:
+            return 0
+
+        start = time.perf_counter()
+        deadline = start + (self.budget if budget is None else budget)
+        profiler = get_profiler()
+        n = 0
+        now = start
+        while heap:
+            priority, seq, key, queued, f, event = heappop(heap)
+            if key is not None and self.pending.get(key) == (priority, seq):
+                del self.pending[key]
+
+            self.latency.add(now - queued, 0)
+            try:
+                if profiler:
+                    profiler.call('deferred', f, event)
+                else:
+                    f(event)
+            finally:
+                if isinstance(event, PooledEvent):
+                    event.holds -= 1
+                    event.release()
+
+            n += 1
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+        return n
+
+    def stats(self):
+        """Returns the statistics of the queue.
+
+        Latencies are the times spent by the calls in the queue, in seconds.
+
+        :returns: Mapping of the statistics names to their values
+        :rtype: dict
+        """
+        return {
+            'depth': len(self.heap),
+            'max_depth': self.max_depth,
+            'calls': self.latency.count,
+            'mean_latency': self.latency.mean,
+            'p99_latency': self.latency.percentile(99),
+        }
+
+
+def enable_deferred_events(budget, **kwargs):
+    """Enables the deferred execution of the deferred subscribers.
+
+    :param budget: Time available to deferred calls in each frame, in seconds
+    :type budget: float
+
+    :param kwargs: Additional arguments for the :class:`DeferredQueue`
+        constructor
+    :type kwargs: dict
+
+    :returns: The queue of deferred calls
+    :rtype: :class:`DeferredQueue`
+    """
+    global __DEFERRED
+    __DEFERRED = DeferredQueue(budget, **kwargs)
+    return __DEFERRED
+
+
+def disable_deferred_events():
+    """Disables deferred execution, executing all the pending calls.
+
+    :returns: The queue that was enabled (if any)
+    :rtype: :class:`DeferredQueue` or None
+    """
+    global __DEFERRED
+    queue, __DEFERRED = __DEFERRED, None
+    if queue:
+        queue.drain(float('inf'))
+    return queue
+
+
+def get_deferred_queue():
+    """Returns the queue of deferred calls.
+
+    :returns: The queue or None, if deferred execution is disabled
+    :rtype: :class:`DeferredQueue` or None
+    """
+    return __DEFERRED
+
+
+class Event(metaclass=ABCMeta):
     """Abstract base class for all the event classes.
+
+    Events are short-lived objects created in large amounts: subclasses are
+    expected to declare their attributes in `__slots__`.
+    """
+    __slots__ = ()
+
+    @property
+    def context(self):
+        """The game context, shared by all the events."""
+        return Context.get_instance()
+
+
+class PooledEvent(Event):
+    """Base class for high-volume events which can be recycled.
+
+    Instances obtained with :meth:`acquire` are given back to a per-class free
+    list as soon as all the subscribers (deferred ones included) have been
+    called, therefore subscribers must not keep references to pooled events.
+    Pooling is disabled until a pool size is set with :func:`set_pool_size`.
+    """
+    # Number of pending deferred calls
+    __slots__ = ('holds',)
+
+    #: Maximum number of free instances kept for each class
+    pool_size = 0
+
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        """Returns an initialized instance, reusing a free one if available.
+
+        :param args: The constructor arguments
+        :type args: tuple
+
+        :param kwargs: The constructor keyword arguments
+        :type kwargs: dict
+
+        :returns: The event
+        :rtype: :class:`PooledEvent`
+        """
+        free = cls.__dict__.get('free_list')
+        evt = free.pop() if free else cls.__new__(cls)
+        evt.__init__(*args, **kwargs)
+        evt.holds = 0
+        return evt
+
+    def release(self):
+        """Gives the event back to the free list of its class.
+
+        Events with pending deferred calls are not released.
+        """
+        cls = type(self)
+        if not cls.pool_size or getattr(self, 'holds', 0):
+            return
+        free = cls.__dict__.get('free_list')
+        if free is None:
+            free = []
+            setattr(cls, 'free_list', free)
+        if len(free) < cls.pool_size:
+            free.append(self)
+
+
+def set_pool_size(size):
+    """Sets the maximum number of free instances kept for each pooled event.
+
+    :param size: The size of the free lists (0 disables pooling)
+    :type size: int
     """
-    def __new__(cls, *args, **kwargs):
-        """Injects the client instance in the event object."""
-        inst = super(Event, cls).__new__(cls)
-        inst.context = Context.get_instance()
-        return inst
+    PooledEvent.pool_size = size
@@ -5,51 +5,15 @@ from events import send_event
 from events import subscriber
 from game.events import EntityPick
 from game.events import GameModeToggle
-from matlib.vec import Vec
+from log import get_logger
 from network import Message
 from network import MessageField
 from network import MessageType
 from utils import clamp_to_grid
 from utils import to_world
-import logging
 import sdl2 as sdl
 
-LOG = logging.getLogger(__name__)
-
-
-def ray_cast(x, y, w, h, camera):
-    """Returns the world coordinates related to the given x,y coordinates.
-
-    :param x: The x coordinate relative to screen
-    :type x: int
-
-    :param y: The y coordinate relative to screen
-    :type y: int
-
-    :param w: The width of the screen
-    :type w: int
-
-    :param h: The height of the screen
-    :type h: int
-
-    :param camera: The camera we are using to trace the ray.
-    :type camera: :class:`renderer.Camera`
-
-    :returns: The point in world coordinates.
-    :type: :class:`mat.Vec`
-    """
-    # Find the direction applying the modelview matrix to the facing direction
-    # of the camera
-    pos, ray = camera.trace_ray(x, y, w, h)
-
-    # The normal vector for the y=0 plane
-    norm = Vec(0, 1, 0)
-
-    # And here finally we have the target of the click in world coordinates More
-    # reference about the used math here:
-    #  * http://antongerdelan.net/opengl/raycasting.html
-    t = - (pos.dot(norm)) / ray.dot(norm)
-    return pos + (ray * t)
+LOG = get_logger(__name__)
 
 
 def start_move_action(context, position):
@@ -108,23 +72,19 @@ def handle_mouse_click(evt):
     context = evt.context
     if evt.state == MouseClickEvent.State.up and context.player:
 
-        LOG.debug('Action: {}'.format(evt))
-        LOG.debug('Viewport pos: {},{}'.format(evt.x, evt.y))
-
-        renderer_conf = context.conf['Renderer']
-        w = int(renderer_conf['width'])
-        h = int(renderer_conf['height'])
+        LOG.debug('Action: %s', evt)
+        LOG.debug('Viewport pos: %s,%s', evt.x, evt.y)
 
         x, y = evt.x, evt.y
-        camera = context.camera
+        viewport = context.viewport
 
-        target = ray_cast(x, y, w, h, camera)
+        target = viewport.ground(x, y)
         world_pos = to_world(target.x, target.y, target.z)
-        LOG.debug('World pos: {}'.format(world_pos))
+        LOG.debug('World pos: %s', world_pos)
         pos = world_pos.x, world_pos.y
 
         if context.game_mode == context.GameMode.default:
-            c_pos, ray = camera.trace_ray(x, y, w, h)
+            c_pos, ray = viewport.ray(x, y)
             entity = context.pick_entity(c_pos, ray)
             if entity:
                 # step 1 - try to pick entities
@@ -148,18 +108,11 @@ def place_building_template(context, x, y):
     :param y: The non-clamped y-ayis coordinate.
     :type y: int
     """
-    map_res = context.res_mgr.get('/map')
-
-    renderer_conf = context.conf['Renderer']
-    w = int(renderer_conf['width'])
-    h = int(renderer_conf['height'])
-    camera = context.camera
-
-    target = ray_cast(x, y, w, h, camera)
+    target = context.viewport.ground(x, y)
     world_pos = to_world(target.x, target.y, target.z)
-    pos = clamp_to_grid(
-            world_pos.x, world_pos.y, map_res.data['scale_factor'])
+    pos = clamp_to_grid(world_pos.x, world_pos.y, context.scale_factor)
     context.building_template.pos = pos
+    context.building_template.wake()
 
 
 @subscriber(MouseMoveEvent)
@@ -178,13 +131,38 @@ def handle_mouse_move(evt):
 
 @subscriber(KeyPressEvent)
 def handle_key_press(evt):
-    """Handles the B key pressed event.
+    """Handles the B, F3 and F4 key pressed events.
 
-    Toggles the building game mode.
+    B toggles the building game mode; when the frame profiler is enabled, F3
+    toggles its overlay and F4 exports the recorded frames.
 
     :param evt: The key press event.
     :type evt: :class:`core.events.KeyPressEvent`
     """
     context = evt.context
+    profiler = context.frame_profiler
     if evt.key == sdl.SDLK_b:
         send_event(GameModeToggle(context.GameMode.building))
+    elif evt.key == sdl.SDLK_F3 and profiler is not None:
+        context.show_frame_stats = not context.show_frame_stats
+        context.ui.set_frame_stats(
+            profiler.table() if context.show_frame_stats else [])
+    elif evt.key == sdl.SDLK_F4 and profiler is not None:
+        export_frame_profile(context)
+
+
+def export_frame_profile(context):
+    """Writes the frames recorded by the frame profiler as CSV and as Chrome
+    trace.
+
+    The files are named after the `FrameProfileFile` debug setting, with the
+    `.csv` and `.json` extensions.
+
+    :param context: The context.
+    :type context: :class:`context.Context`
+    """
+    base = context.conf.get(
+        'Debug', 'FrameProfileFile', fallback='frame_profile')
+    context.frame_profiler.export_csv(base + '.csv')
+    context.frame_profiler.export_trace(base + '.json')
+    LOG.info('Written frame profile to %s.csv and %s.json', base, base)
@@ -0,0 +1,263 @@
+"""Columnar on-disk archive of the received gamestates.
+
+The archive is a directory containing an `index.json` file and a set of chunk
+directories, each one holding a fixed number of ticks as NumPy `.npy` arrays:
+
+    archive/
+        index.json
+        chunk_00000/
+            tick.npy         per-tick arrays
+            timestamp.npy
+            time.npy
+            row_tick.npy     per-entity arrays (one row per entity per tick)
+            id.npy
+            type.npy
+            x.npy
+            y.npy
+            hp.npy
+            action.npy
+        chunk_00001/
+            ...
+
+Arrays are stored uncompressed so that the reader can memory-map them and
+analyses can run vectorised queries on hours of data without loading it.
+"""
+from log import get_logger
+from network import MessageField as MF
+import json
+import numpy as np
+import os
+
+
+LOG = get_logger(__name__)
+
+
+INDEX_FILE = 'index.json'
+
+#: Per-tick columns and their types
+TICK_COLUMNS = {
+    'tick': np.uint32,
+    'timestamp': np.int64,
+    'time': np.uint32,
+}
+
+#: Per-entity columns and their types
+ROW_COLUMNS = {
+    'row_tick': np.uint32,
+    'id': np.uint32,
+    'type': np.uint8,
+    'x': np.float32,
+    'y': np.float32,
+    'hp': np.uint16,
+    'action': np.uint8,
+}
+
+
+class ArchiveWriter:
+    """Writer of gamestate archives.
+
+    Gamestates are buffered in memory and written as a new chunk every
+    `chunk_ticks` gamestates.
+    """
+
+    def __init__(self, path, chunk_ticks=600):
+        """Constructor.
+
+        :param path: The archive directory (created if missing, it must be
+            empty otherwise)
+        :type path: str
+
+        :param chunk_ticks: Number of ticks per chunk
+        :type chunk_ticks: int
+
+        :raises FileExistsError: if the directory is not empty
+        """
+        self.path = path
+        self.chunk_ticks = chunk_ticks
+        os.makedirs(path, exist_ok=True)
+        if os.listdir(path):
+            # NOTE: the chunks and the index of another archive would be
+            # overwritten
+            raise FileExistsError(
+                'archive directory {} is not empty'.format(path))
+
+        self.index = {
+            'tick_columns': {
+                k: np.dtype(t).str for k, t in TICK_COLUMNS.items()
+            },
+            'row_columns': {
+                k: np.dtype(t).str for k, t in ROW_COLUMNS.items()
+            },
+            'chunks': [],
+        }
+        self.next_tick = 0
+        self.reset()
+
+    def reset(self):
+        """Empties the buffers of the current chunk."""
+        self.ticks = {k: [] for k in TICK_COLUMNS}
+        self.rows = {k: [] for k in ROW_COLUMNS}
+
+    def push(self, gamestate):
+        """Appends a gamestate to the archive.
+
+        :param gamestate: The gamestate
+        :type gamestate: dict
+        """
+        tick = self.next_tick
+        self.next_tick += 1
+
+        self.ticks['tick'].append(tick)
+        self.ticks['timestamp'].append(gamestate.get(MF.timestamp, 0))
+        self.ticks['time'].append(gamestate.get(MF.time, 0))
+
+        rows = self.rows
+        for srv_id, entity in gamestate.get(MF.entities, {}).items():
+            rows['row_tick'].append(tick)
+            rows['id'].append(srv_id)
+            rows['type'].append(entity[MF.entity_type])
+            rows['x'].append(entity[MF.x_pos])
+            rows['y'].append(entity[MF.y_pos])
+            rows['hp'].append(entity[MF.cur_hp])
+            rows['action'].append(entity[MF.action_type])
+
+        if len(self.ticks['tick']) >= self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered gamestates as a new chunk."""
+        n_ticks = len(self.ticks['tick'])
+        if not n_ticks:
+            return
+
+        name = 'chunk_{:05d}'.format(len(self.index['chunks']))
+        chunk_path = os.path.join(self.path, name)
+        os.makedirs(chunk_path, exist_ok=True)
+        tables = (TICK_COLUMNS, self.ticks), (ROW_COLUMNS, self.rows)
+        for columns, buffers in tables:
+            for column, dtype in columns.items():
+                np.save(
+                    os.path.join(chunk_path, column + '.npy'),
+                    np.array(buffers[column], dtype=dtype))
+
+        self.index['chunks'].append({
+            'name': name,
+            'first_tick': self.ticks['tick'][0],
+            'ticks': n_ticks,
+            'rows': len(self.rows['id']),
+            'first_timestamp': self.ticks['timestamp'][0],
+            'last_timestamp': self.ticks['timestamp'][-1],
+        })
+        self.write_index()
+        LOG.debug('Written archive chunk %s (%d ticks)', name, n_ticks)
+        self.reset()
+
+    def write_index(self):
+        """Writes the index of the archive."""
+        with open(os.path.join(self.path, INDEX_FILE), 'w') as fp:
+            json.dump(self.index, fp, indent=2)
+
+    def close(self):
+        """Writes any buffered gamestate and finalizes the archive."""
+        self.flush()
+        self.write_index()
+
+
+class Archive:
+    """Reader of gamestate archives.
+
+    Chunk arrays are memory-mapped on first access.
+    """
+
+    def __init__(self, path):
+        """Constructor.
+
+        :param path: The archive directory
+        :type path: str
+        """
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), 'r') as fp:
+            self.index = json.load(fp)
+        self.chunks = self.index['chunks']
+        self.cache = {}
+
+    def __len__(self):
+        """Number of ticks in the archive."""
+        return sum(chunk['ticks'] for chunk in self.chunks)
+
+    def chunk(self, i, columns=None):
+        """Returns the memory-mapped arrays of a chunk.
+
+        :param i: The index of the chunk
+        :type i: int
+
+        :param columns: The names of the columns (all if None)
+        :type columns: sequence of str
+
+        :returns: Mapping of column names to arrays
+        :rtype: dict
+        """
+        name = self.chunks[i]['name']
+        if columns is None:
+            columns = (
+                list(self.index['tick_columns']) +
+                list(self.index['row_columns']))
+
+        arrays = {}
+        for column in columns:
+            key = name, column
+            if key not in self.cache:
+                self.cache[key] = np.load(
+                    os.path.join(self.path, name, column + '.npy'),
+                    mmap_mode='r')
+            arrays[column] = self.cache[key]
+        return arrays
+
+    def scan(self, columns=None):
+        """Iterates over all the chunks of the archive.
+
+        :param columns: The names of the columns (all if None)
+        :type columns: sequence of str
+
+        :returns: Generator of mappings of column names to arrays
+        :rtype: generator
+        """
+        for i in range(len(self.chunks)):
+            yield self.chunk(i, columns)
+
+    def column(self, name):
+        """Returns a whole column, concatenating all the chunks.
+
+        NOTE: unlike chunk arrays, the result is loaded in memory.
+
+        :param name: The name of the column
+        :type name: str
+
+        :returns: The column
+        :rtype: :class:`numpy.ndarray`
+        """
+        arrays = [chunk[name] for chunk in self.scan([name])]
+        if not arrays:
+            dtypes = dict(self.index['tick_columns'])
+            dtypes.update(self.index['row_columns'])
+            return np.empty(0, dtype=dtypes[name])
+        return np.concatenate(arrays)
+
+    def tick(self, tick):
+        """Returns the entity rows of a single tick.
+
+        :param tick: The tick
+        :type tick: int
+
+        :returns: Mapping of row column names to arrays
+        :rtype: dict
+
+        :raises IndexError: if the tick is not in the archive
+        """
+        for i, chunk in enumerate(self.chunks):
+            if chunk['first_tick'] <= tick < chunk['first_tick'] + chunk['ticks']:
+                arrays = self.chunk(i, self.index['row_columns'])
+                row_tick = arrays['row_tick']
+                start, end = np.searchsorted(row_tick, [tick, tick + 1])
+                return {k: v[start:end] for k, v in arrays.items()}
+        raise IndexError('tick {} not in archive'.format(tick))
@@ -1,2 +1,6 @@
 from game.components.component import Component  # noqa
-from game.components.movable import Movable  # noqa
\ No newline at end of file
+from game.components.movable import Movable  # noqa
+from game.components.movable import MovableStore  # noqa
+from game.components.movable import get_movable_store  # noqa
+from game.components.transform import Transform  # noqa
+from game.components.transform import get_transform_counter  # noqa
@@ -1,9 +1,273 @@
 from game.components import Component
+from log import get_logger
+from math import pi
 from matlib.vec import Vec
-import logging
+import numpy as np
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
+
+
+WHOLE_ANGLE = 2.0 * pi
+
+
+class MovableStore:
+    """Contiguous storage of the movable components.
+
+    The data of each movable lives in a slot of a set of arrays, so that the
+    movement and orientation systems update all the movables at once; the
+    :class:`game.components.Movable` instances are views over their slots.
+    """
+
+    def __init__(self, capacity=64, lod=4):
+        """Constructor.
+
+        :param capacity: The initial number of slots
+        :type capacity: int
+
+        :param lod: The movables not visible are oriented once every `lod`
+            updates
+        :type lod: int
+        """
+        self.lod = lod
+        self.frame = 0
+        self.capacity = 0
+        #: Factor of the interpolation between the positions before and after
+        # the last update, for rendering
+        self.alpha = 1.0
+        self.position = np.zeros((0, 2))
+        self.previous = np.zeros((0, 2))
+        self.destination = np.zeros((0, 2))
+        self.direction = np.zeros((0, 2))
+        self.speed = np.zeros(0)
+        self.heading = np.zeros(0)
+        # Whether the slot has a destination and a valid direction
+        self.has_destination = np.zeros(0, dtype=bool)
+        self.has_direction = np.zeros(0, dtype=bool)
+        # Whether the slot is in use and within the view of the camera
+        self.used = np.zeros(0, dtype=bool)
+        self.visible = np.zeros(0, dtype=bool)
+
+        # Per-slot data which does not fit into arrays
+        self.views = []
+        self.paths = []
+        self.free = []
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def grow(self, capacity):
+        """Enlarges the arrays to the given number of slots.
+
+        :param capacity: The new number of slots
+        :type capacity: int
+        """
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+
+        def extend(a):
+            return np.concatenate((a, np.zeros((extra,) + a.shape[1:], a.dtype)))
+
+        for name in ('position', 'previous', 'destination', 'direction',
+                     'speed', 'heading', 'has_destination', 'has_direction',
+                     'used', 'visible'):
+            setattr(self, name, extend(getattr(self, name)))
+
+        self.views.extend([None] * extra)
+        self.paths.extend([[] for _ in range(extra)])
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def allocate(self, view, position):
+        """Assigns a slot to a movable.
+
+        :param view: The movable
+        :type view: :class:`game.components.Movable`
+
+        :param position: The starting position of the movable
+        :type position: tuple
+
+        :returns: The index of the slot
+        :rtype: int
+        """
+        if not self.free:
+            self.grow(self.capacity * 2 or 1)
+        i = self.free.pop()
+        self.views[i] = view
+        self.paths[i] = []
+        self.position[i] = self.previous[i] = position
+        self.speed[i] = 0
+        self.heading[i] = 0
+        self.has_destination[i] = False
+        self.has_direction[i] = False
+        self.used[i] = True
+        self.visible[i] = True
+        return i
+
+    def release(self, i):
+        """Frees the slot of a movable.
+
+        :param i: The index of the slot
+        :type i: int
+        """
+        if self.views[i] is not None:
+            self.halt(i, (0.0, 0.0))
+            self.used[i] = False
+            self.views[i] = None
+            self.free.append(i)
+
+    def update(self, dt):
+        """Runs the movement and orientation systems.
+
+        :param dt: The time spent since the last update (in seconds)
+        :type dt: float
+        """
+        self.previous[:] = self.position
+        self.update_movement(dt)
+        self.update_orientation()
+        self.frame += 1
+
+    def update_movement(self, dt):
+        """Moves all the movables with a destination.
+
+        Movables which do not reach their next waypoint within `dt` are moved
+        at once; the others switch waypoint or arrive one at a time.
+
+        :param dt: The time spent since the last update (in seconds)
+        :type dt: float
+        """
+        idx = np.flatnonzero(self.has_destination & (self.speed != 0))
+        if not len(idx):
+            return
+
+        distance = self.speed[idx] * dt
+        delta = self.destination[idx] - self.position[idx]
+        remaining = np.hypot(delta[:, 0], delta[:, 1])
+
+        # We did not reach the next waypoint yet
+        going = distance < remaining
+        i = idx[going]
+        direction = delta[going] / remaining[going, None]
+        self.direction[i] = direction
+        self.has_direction[i] = True
+        self.position[i] += direction * distance[going, None]
+
+        # We reached or surpassed the next waypoint
+        for i, d in zip(idx[~going].tolist(), distance[~going].tolist()):
+            self.partial_movement(i, d)
+
+        views = self.views
+        for i in idx.tolist():
+            views[i].moved()
+
+    def partial_movement(self, i, distance):
+        """Moves a movable along its path by the given distance.
+
+        :param i: The index of the slot
+        :type i: int
+
+        :param distance: The magnitude of the movement
+        :type distance: float
+        """
+        path = self.paths[i]
+        x, y = self.position[i].tolist()
+        while True:
+            nx, ny = self.destination[i].tolist()
+            dx, dy = nx - x, ny - y
+            dst = (dx * dx + dy * dy) ** 0.5
+
+            if distance < dst:
+                self.direction[i] = dx / dst, dy / dst
+                self.has_direction[i] = True
+                self.position[i] = x + dx / dst * distance, y + dy / dst * distance
+                return
+
+            if not path:
+                LOG.debug('Movable arrived at destination %s', (nx, ny))
+                self.halt(i, (nx, ny))
+                return
+
+            # Continue toward the next waypoint of the path
+            distance -= dst
+            x, y = nx, ny
+            self.destination[i] = path.pop(0)
+            LOG.debug('Switched destination to %s', self.destination[i])
+
+    def halt(self, i, position):
+        """Stops a movable, clearing its destination and path.
+
+        :param i: The index of the slot
+        :type i: int
+
+        :param position: The final position of the movable
+        :type position: tuple
+        """
+        self.has_destination[i] = False
+        self.has_direction[i] = False
+        self.paths[i] = []
+        self.speed[i] = 0
+        self.position[i] = position
+
+    def update_orientation(self):
+        """Rotates the movables towards their direction of movement.
+
+        The movables not visible are rotated once every `lod` updates, by as
+        much as `lod` rotations would rotate them, so that they turn at the
+        same rate as the visible ones.
+        """
+        mask = self.has_direction
+        if self.frame % self.lod:
+            mask = mask & self.visible
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            return
+
+        dx, dy = self.direction[idx, 0], self.direction[idx, 1]
+        heading = self.heading[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            target = np.where(
+                dx != 0,
+                np.arctan(dy / dx) + (pi / 2) * np.copysign(1, dx),
+                np.where(dy > 0, pi, 0))
+
+        # Compute remaining rotation
+        delta = target - heading
+        abs_delta = np.abs(delta)
+        wrap = abs_delta > WHOLE_ANGLE / 2
+        abs_delta[wrap] = WHOLE_ANGLE - abs_delta[wrap]
+        delta[wrap] = -delta[wrap]
+
+        # tweak speed (XXX: make it more rational)
+        rate = 2 * pi / 40
+        # Each rotation covers a fraction of the remaining one: the movables
+        # not visible are given all the rotations they skipped at once
+        steps = np.where(self.visible[idx], 1, self.lod)
+        rot_speed = abs_delta * (1 - (1 - rate) ** steps)
+
+        # Rotations complete within a small error are forced to the exact value
+        heading = np.where(
+            abs_delta < rot_speed * 2,
+            target,
+            heading + np.copysign(1, delta) * rot_speed)
+
+        # normalize angle to be in (-pi, pi)
+        heading[heading >= WHOLE_ANGLE / 2] -= WHOLE_ANGLE
+        heading[heading < -WHOLE_ANGLE / 2] += WHOLE_ANGLE
+        self.heading[idx] = heading
+
+
+__STORE = MovableStore()
+
+
+def get_movable_store():
+    """Returns the storage of the movables created without an explicit one.
+
+    :returns: The movable store
+    :rtype: :class:`game.components.movable.MovableStore`
+    """
+    return __STORE
 
 
 class Movable(Component):
@@ -11,6 +275,10 @@ class Movable(Component):
 
     Given a destination and a target arrival timestamp, computes the position
     for each dt.
+
+    The state of the movable is kept in a slot of a
+    :class:`game.components.movable.MovableStore`, which updates all of its
+    movables at once.
     """
 
     #: tolerance: if the current position is not different from the new "current
@@ -18,26 +286,35 @@ class Movable(Component):
     # current interpolation.
     EPSILON = 0.1
 
-    def __init__(self, position):
+    def __init__(self, position, store=None):
         """Constructor.
 
         :param position: The starting position of the movable.
         :type position: tuple
+
+        :param store: The storage of the movable (the shared one by default).
+        :type store: :class:`game.components.movable.MovableStore`
         """
-        # Current position of the server
-        self._position = position
+        self.store = store if store is not None else get_movable_store()
+        self.index = self.store.allocate(self, position)
 
-        # Destination
-        self.next_position = None
+        # Function called as `on_move(entity, position)` at each position
+        # change (eg. to update a spatial index)
+        self.on_move = None
 
-        # Path
-        self.path = None
+        # Function called as `on_visible(visible)` when the movable enters or
+        # leaves the view of the camera
+        self.on_visible = None
 
-        # Speed
-        self.speed = 0
+    @property
+    def slot(self):
+        """The index of the slot of the movable in its store.
 
-        # Direction vector
-        self._direction = None
+        :raises RuntimeError: if the movable has been released
+        """
+        if self.index is None:
+            raise RuntimeError('movable released from its store')
+        return self.index
 
     @property
     def position(self):
@@ -46,11 +323,37 @@ class Movable(Component):
         :returns: The current position of the movable.
         :rtype: tuple
         """
-        return self._position
+        return tuple(self.store.position[self.slot].tolist())
+
+    @property
+    def interpolated(self):
+        """Position to be rendered.
+
+        :returns: The position interpolated between the ones before and after
+            the last update of the store.
+        :rtype: tuple
+        """
+        store, i = self.store, self.slot
+        a = store.alpha
+        px, py = store.previous[i].tolist()
+        x, y = store.position[i].tolist()
+        return px + (x - px) * a, py + (y - py) * a
+
+    @property
+    def moving(self):
+        """Whether the movable is moving or its rendering is catching up."""
+        store, i = self.store, self.slot
+        return bool(
+            store.has_destination[i] or
+            (store.previous[i] != store.position[i]).any())
 
     @property
     def direction(self):
-        return self._direction
+        i = self.slot
+        if self.store.has_direction[i]:
+            dx, dy = self.store.direction[i].tolist()
+            return Vec(dx, dy, 0.0)
+        return None
 
     @position.setter
     def position(self, value):
@@ -59,18 +362,42 @@ class Movable(Component):
         :param value: The new position to be used as current.
         :type value: tuple
         """
-        LOG.debug('Manually setting position {} -> {}'.format(
-            self._position, value))
-        self.next_position = None
-        self._direction = None
-        self.path = []
-        self.speed = 0
-        self._position = value
+        LOG.debug('Manually setting position %s -> %s', self.position, value)
+        self.stop(value)
 
     @property
     def destination(self):
         return self.next_position
 
+    @property
+    def next_position(self):
+        i = self.slot
+        if self.store.has_destination[i]:
+            return tuple(self.store.destination[i].tolist())
+        return None
+
+    @property
+    def path(self):
+        return self.store.paths[self.slot]
+
+    @property
+    def speed(self):
+        return float(self.store.speed[self.slot])
+
+    @property
+    def visible(self):
+        """Whether the movable is within the view of the camera."""
+        return bool(self.store.visible[self.slot])
+
+    @property
+    def heading(self):
+        """Current heading of the movable (in radians)."""
+        return float(self.store.heading[self.slot])
+
+    @heading.setter
+    def heading(self, value):
+        self.store.heading[self.slot] = value
+
     def move(self, position, path, speed):
         """Initial setup of a movable.
 
@@ -86,70 +413,59 @@ class Movable(Component):
         :param speed: The movement speed.
         :type target_tstamp: :class:`float`
         """
-        # compute new direction
-        self.speed = speed
-        self.next_position = path[0]
-        self.path = path[1:] if len(path) > 1 else []
-        self._position = position
+        store, i = self.store, self.slot
+        store.speed[i] = speed
+        store.destination[i] = path[0]
+        store.has_destination[i] = True
+        store.paths[i] = list(path[1:])
+        store.position[i] = store.previous[i] = position
+        self.moved()
+        self.entity.wake()
+
+    def stop(self, position):
+        """Stops the movable at the given position.
+
+        :param position: The final position of the movable.
+        :type position: tuple
+        """
+        self.store.halt(self.slot, position)
+        self.store.previous[self.slot] = position
+        self.moved()
+        self.entity.wake()
 
-    def partial_movement(self, distance, position, next_position, path):
-        """Recursive function to calculate parial movements (to consider cases
-        in which during the given dt we are actually going over a the
-        destination point.
+    def moved(self):
+        """Notifies the change of position to the `on_move` function."""
+        if self.on_move:
+            self.on_move(self.entity, self.position)
 
-        :param distance: The magnitude of the movement vector.
-        :type distance: float
+    def release(self):
+        """Frees the slot of the movable in its store.
 
-        :param position: The current position of the movable.
-        :type position: tuple
+        The movable must not be used until it gets a new slot with
+        :meth:`allocate`.
+        """
+        if self.index is not None:
+            self.store.release(self.index)
+            self.index = None
 
-        :param next_position: The next position in the path.
-        :type next_position: tuple
+    def allocate(self, position):
+        """Assigns a new slot to a released movable.
 
-        :param path: The other points of the path.
-        :type path: list
+        :param position: The starting position of the movable.
+        :type position: tuple
         """
-        # Actual distance from destination
-        np = Vec(next_position[0], next_position[1], 0.0)
-        p = Vec(position[0], position[1], 0.0)
-        dst = (np - p).mag()
-
-        # We did not reach the next_position yet.
-        if distance < dst:
-            self._direction = np - p
-            self._direction.norm()
-            cur = p + self._direction * distance
-            self._position = cur.x, cur.y
-
-        # We arrived in next_position, continue toward the next waypoint of the
-        # path recursively calling partial_movement.
-        elif path:
-            position, next_position, path = next_position, path[0], path[1:]
-            LOG.debug('Switched destination to {}'.format(next_position))
-            self.partial_movement(
-                distance - dst, position, next_position, path)
-
-        # We reached or surpassed next_position and there are no more path
-        # steps: we arrived!
-        else:
-            LOG.debug('Movable arrived at destination {}'.format(self._position))
-            self.next_position = None
-            self._direction = None
-            self.path = []
-            self.speed = 0
-            self._position = next_position
+        if self.index is None:
+            self.index = self.store.allocate(self, position)
 
     def update(self, dt):
         """Movable update function.
 
-        Computes the amount of movement to be done in the given dt time. The
-        movement is calculated using the speed and the direction of the
-        movement.
+        Moves only this movable; the store updates all of its movables at once.
 
         :param dt: The time spent since the last update call (in seconds).
         :type dt: float
         """
-        if self.next_position and self.speed:
-            distance = self.speed * dt
-            self.partial_movement(
-                distance, self._position, self.next_position, self.path)
+        store, i = self.store, self.slot
+        if store.has_destination[i] and store.speed[i]:
+            store.partial_movement(i, store.speed[i] * dt)
+            self.moved()
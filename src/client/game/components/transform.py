@@ -0,0 +1,124 @@
+from game.components import Component
+from log import get_logger
+from matlib.vec import Vec
+from utils import to_scene
+
+
+LOG = get_logger(__name__)
+
+
+#: Rotation axis of the entities (the scene vertical axis)
+Y_AXIS = Vec(0, 1, 0)
+
+
+class TransformCounter:
+    """Counter of the transform writes done and avoided."""
+
+    def __init__(self):
+        self.writes = 0
+        self.avoided = 0
+
+    def reset(self):
+        """Resets the counters.
+
+        :returns: The number of writes done and avoided since the last reset
+        :rtype: :class:`tuple`
+        """
+        counts = self.writes, self.avoided
+        self.writes = self.avoided = 0
+        return counts
+
+
+__COUNTER = TransformCounter()
+
+
+def get_transform_counter():
+    """Returns the counter shared by all the transforms.
+
+    :returns: The transform counter
+    :rtype: :class:`game.components.transform.TransformCounter`
+    """
+    return __COUNTER
+
+
+class Transform(Component):
+    """Transform component.
+
+    Caches the position, heading and scale applied to the scene object of an
+    entity and pushes them to the object only when they change.
+    """
+
+    def __init__(self, obj):
+        """Constructor.
+
+        :param obj: The scene object of the entity.
+        :type obj: :class:`renderlib.scene.SceneObject`
+        """
+        self.counter = get_transform_counter()
+        self.obj = obj
+        self.hidden = False
+        self.invalidate()
+
+    def invalidate(self):
+        """Forgets the cached values, so that they are all written again."""
+        self.position = None
+        self.heading = None
+        self.scale = None
+
+    def hide(self):
+        """Hides the scene object, scaling it down to nothing.
+
+        Updates are ignored until the object is shown again.
+        """
+        if not self.hidden:
+            self.hidden = True
+            self.obj.scale = Vec(0, 0, 0)
+            self.invalidate()
+
+    def show(self):
+        """Shows the scene object again, at the next update."""
+        self.hidden = False
+
+    def update(self, position, heading=None, scale=None):
+        """Applies the transform to the scene object.
+
+        :param position: The position in world coordinates.
+        :type position: :class:`tuple`
+
+        :param heading: The rotation around the vertical axis (in radians), or
+            None to leave it untouched.
+        :type heading: float
+
+        :param scale: The uniform scale, or None to leave it untouched.
+        :type scale: float
+
+        :returns: Whether the scene object was written.
+        :rtype: bool
+        """
+        if self.hidden:
+            return False
+
+        writes = 0
+        managed = 1
+        obj = self.obj
+        if position != self.position:
+            self.position = position
+            obj.position = to_scene(*position)
+            writes += 1
+        if heading is not None:
+            managed += 1
+            if heading != self.heading:
+                self.heading = heading
+                obj.rotation.rotatev(Y_AXIS, heading)
+                writes += 1
+        if scale is not None:
+            managed += 1
+            if scale != self.scale:
+                self.scale = scale
+                obj.scale = Vec(scale, scale, scale)
+                writes += 1
+
+        counter = self.counter
+        counter.writes += writes
+        counter.avoided += managed - writes
+        return writes > 0
@@ -0,0 +1,61 @@
+"""Visibility of the movable entities.
+
+The movables out of the footprint of the camera view on the ground are culled:
+their scene objects are hidden and their animation and orientation are updated
+at a reduced rate, while their movement goes on as usual.
+"""
+from log import get_logger
+import numpy as np
+
+
+LOG = get_logger(__name__)
+
+
+class VisibilityPass:
+    """Tells the movables within the view of the camera from the culled ones."""
+
+    def __init__(self, viewport, store, margin=1.0):
+        """Constructor.
+
+        :param viewport: The projection of the camera onto the ground
+        :type viewport: :class:`game.viewport.Viewport`
+
+        :param store: The storage of the movables
+        :type store: :class:`game.components.movable.MovableStore`
+
+        :param margin: The distance from the view within which movables are
+            still visible (ie. the extent of their scene objects)
+        :type margin: float
+        """
+        self.viewport = viewport
+        self.store = store
+        self.margin = margin
+
+    def update(self):
+        """Updates the visibility of all the movables.
+
+        The `on_visible` function of the movables is called only for the ones
+        entering or leaving the view.
+        """
+        store = self.store
+        position = store.position
+        visible = self.viewport.contains(
+            position[:, 0], position[:, 1], self.margin)
+        visible &= store.used
+
+        changed = np.flatnonzero(visible != store.visible)
+        store.visible = visible
+        views = store.views
+        for i in changed.tolist():
+            view = views[i]
+            if view is not None and view.on_visible:
+                view.on_visible(bool(visible[i]))
+
+    def counts(self):
+        """Returns the number of visible and culled movables.
+
+        :returns: Mapping of the counts: `visible` and `culled`
+        :rtype: dict
+        """
+        visible = int(np.count_nonzero(self.store.visible))
+        return {'visible': visible, 'culled': len(self.store) - visible}
@@ -1,27 +1,21 @@
 from enum import IntEnum
 from enum import unique
-from events import subscriber
+from events import keyed_subscriber
 from game.components import Movable
+from game.components import Transform
 from game.entities.entity import Entity
 from game.events import ActorActionChange
 from game.events import ActorIdle
 from game.events import ActorMove
-from math import atan
-from math import copysign
+from game.materials import get_material_cache
+from log import get_logger
 from math import pi
 from matlib.vec import Vec
 from renderlib.animation import AnimationInstance
-from renderlib.material import Material
 from renderlib.mesh import MeshProps
-from renderlib.texture import Texture
-from utils import to_scene
-import logging
 
 
-LOG = logging.getLogger(__name__)
-
-
-WHOLE_ANGLE = 2.0 * pi
+LOG = get_logger(__name__)
 
 
 @unique
@@ -65,6 +59,9 @@ class Actor(Entity):
         ActorType.zombie: (pi, 0.05),
     }
 
+    #: Time step of the animations of the actors out of the camera view
+    CULLED_ANIMATION_STEP = 0.25
+
     def init_animations(self, mesh):
         self.animations = {}
         for i in range(3):
@@ -97,13 +94,9 @@ class Actor(Entity):
         self.init_animations(mesh)
         self.current_anim = self.animations[action_anim_index(ActionType.idle)]
 
-        # create a 2D texture from texture image
-        texture = Texture.from_image(resource['texture'], Texture.TextureType.texture_2d)
-
-        # create a material
-        material = Material()
-        material.texture = texture
-        material.receive_light = True
+        # get the material shared by the actors of the same resource
+        material = get_material_cache().acquire(
+            resource, 'texture', receive_light=True)
 
         # rendering props
         self.props = MeshProps()
@@ -117,15 +110,17 @@ class Actor(Entity):
 
         # Initialize movable component
         movable = Movable((0.0, 0.0))
+        movable.on_visible = self.set_visible
 
         # initialize actor
-        super().__init__(movable)
+        super().__init__(movable, Transform(self.obj))
+
+        # animation time not played yet while out of the camera view
+        self.animation_lag = 0.0
 
         # FIXME: hardcoded bounding box
         self._bounding_box = Vec(-0.5, 0, -0.5), Vec(0.5, 2, 0.5)
 
-        self.heading = 0.0
-
     @property
     def position(self):
         """The position of the actor in world coordinates.
@@ -149,46 +144,38 @@ class Actor(Entity):
         pos = self.position
         return l + Vec(pos[0], 0, pos[1]), m + Vec(pos[0], 0, pos[1])
 
-    def orientate(self):
-        """Orientate the character towards the current destination.
+    @property
+    def heading(self):
+        """The heading of the actor (in radians).
+
+        :returns: The heading
+        :rtype: float
         """
-        direction = self[Movable].direction
-        if direction:
-            dx = direction.x
-            dy = direction.y
-            if dx:
-                target_heading = atan(dy / dx) + (pi / 2) * copysign(1, dx)
-            else:
-                target_heading = pi if dy > 0 else 0
-
-            # Compute remaining rotation
-            delta = target_heading - self.heading
-            abs_delta = abs(delta)
-            if abs_delta > WHOLE_ANGLE / 2:
-                abs_delta = WHOLE_ANGLE - abs(delta)
-                delta = -delta
-
-            # tweak speed (XXX: make it more rational)
-            rot_speed = abs_delta * 2 * pi / 40
-            if abs_delta < rot_speed * 2:
-                # Rotation is complete within a small error.
-                # Force it to the exact value:
-                self.heading = target_heading
-                return
+        return self[Movable].heading
+
+    def awake(self):
+        """Tells whether the actor is moving or playing a visible animation.
 
-            self.heading += copysign(1, delta) * rot_speed
+        The idle animation is played only within the camera view: idle actors
+        out of the view sleep until :meth:`set_visible` wakes them up.
 
-            # normalize angle to be in (-pi, pi)
-            if self.heading >= WHOLE_ANGLE / 2:
-                self.heading = -WHOLE_ANGLE + self.heading
-            if self.heading < -WHOLE_ANGLE / 2:
-                self.heading = WHOLE_ANGLE + self.heading
+        :returns: Whether the actor is awake
+        :rtype: bool
+        """
+        movable = self[Movable]
+        if movable.moving:
+            return True
+        idle = self.animations[action_anim_index(ActionType.idle)]
+        return self.current_anim is not None and (
+            movable.visible or self.current_anim is not idle)
 
     def remove(self):
         """Removes itself from the scene.
         """
-        LOG.debug('Remove actor {}'.format(self.e_id))
+        LOG.debug('Remove actor %s', self.e_id)
         self.obj.remove()
+        self[Movable].release()
+        get_material_cache().release(self.props.material)
 
     def set_action(self, action_type):
         """Sets current player action.
@@ -198,75 +185,114 @@ class Actor(Entity):
         """
         anim = self.animations[action_anim_index(action_type)]
         self.props.animation = self.current_anim = anim
+        self.wake()
+
+    def park(self):
+        """Hides the actor, keeping it ready to be reused with :meth:`unpark`.
+
+        The actor must have been removed from the game.
+        """
+        self[Transform].hide()
+        self[Movable].release()
+
+    def unpark(self):
+        """Makes a parked actor ready to be added to the game again.
+
+        The animations are instantiated again, so that they start playing from
+        the beginning as for a new actor.
+        """
+        self.e_id = next(self.count)
+        self[Movable].allocate((0.0, 0.0))
+        self[Transform].show()
+        self.init_animations(self.resource['model'])
+        anim = self.animations[action_anim_index(ActionType.idle)]
+        self.props.animation = self.current_anim = anim
+        self.animation_lag = 0.0
+
+    def set_visible(self, visible):
+        """Shows or hides the actor as it enters or leaves the camera view.
+
+        :param visible: Whether the actor is within the camera view
+        :type visible: bool
+        """
+        if visible:
+            self[Transform].show()
+            self.wake()
+        else:
+            self[Transform].hide()
 
     def update(self, dt):
         """Update the character.
 
-        This method computes character's game logic as a function of time.
+        This method computes character's game logic as a function of time. The
+        movement and the orientation are computed beforehand for all the actors
+        by the :class:`game.components.movable.MovableStore`.
+
+        The animations of the actors out of the camera view are played with a
+        coarser time step.
 
         :param dt: Time delta from last update.
         :type dt: float
         """
-        self[Movable].update(dt)
-        x, y = self[Movable].position
-
-        rot, scale = self.TRANSFORMS[self.actor_type]
-        self.obj.position = to_scene(x, y)
-        self.obj.rotation.rotatev(Vec(0, 1, 0), rot + -self.heading)
-        self.obj.scale = Vec(scale, scale, scale)
-
-        self.orientate()
+        movable = self[Movable]
+        if movable.visible:
+            rot, scale = self.TRANSFORMS[self.actor_type]
+            self[Transform].update(
+                movable.interpolated, rot - movable.heading, scale)
+            dt += self.animation_lag
+            self.animation_lag = 0.0
+        else:
+            self.animation_lag += dt
+            if self.animation_lag < self.CULLED_ANIMATION_STEP:
+                return
+            dt, self.animation_lag = self.animation_lag, 0.0
 
         # play animation
         if self.current_anim:
             self.current_anim.play(dt)
 
 
-def lookup_entity(evt):
-    """Looks up the entity associated with given event.
-
-    :param evt: Event object.
-    :type evt: :class:`events.Event`
-    """
-    context = evt.context
-    if evt.srv_id in context.server_entities_map:
-        e_id = context.server_entities_map[evt.srv_id]
-        return context.entities[e_id]
+@keyed_subscriber(ActorActionChange)
+def actor_action_change(actor, evt):
+    """Updates actor action.
 
+    :param actor: The actor the event is addressed to
+    :type actor: :class:`game.entities.actor.Actor`
 
-@subscriber(ActorActionChange)
-def actor_action_change(evt):
-    """Updates actor action."""
-    actor = lookup_entity(evt)
-    if actor:
-        actor.set_action(evt.new)
+    :param evt: The event instance
+    :type evt: :class:`game.events.ActorActionChange`
+    """
+    actor.set_action(evt.new)
 
 
-@subscriber(ActorIdle)
-def actor_set_postition(evt):
+@keyed_subscriber(ActorIdle)
+def actor_set_postition(actor, evt):
     """Updates the character position
 
     Gets all the relevant data from the event.
 
+    :param actor: The actor the event is addressed to
+    :type actor: :class:`game.entities.actor.Actor`
+
     :param evt: The event instance
     :type evt: :class:`game.events.ActorIdle`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
-    actor = evt.context.resolve_entity(evt.srv_id)
-    if actor:
-        actor[Movable].position = evt.x, evt.y
+    LOG.debug('Event subscriber: %s', evt)
+    actor[Movable].position = evt.x, evt.y
 
 
-@subscriber(ActorMove)
-def character_set_movement(evt):
+@keyed_subscriber(ActorMove)
+def character_set_movement(actor, evt):
     """Set the move action in the actor.
 
+    :param actor: The actor the event is addressed to
+    :type actor: :class:`game.entities.actor.Actor`
+
     :param evt: The event instance
     :type evt: :class:`game.events.ActorMove`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
-    actor = evt.context.resolve_entity(evt.srv_id)
-    if actor and evt.path:
+    LOG.debug('Event subscriber: %s', evt)
+    if evt.path:
         actor[Movable].move(
             position=evt.position,
             path=evt.path,
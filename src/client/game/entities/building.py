@@ -1,23 +1,23 @@
 from enum import IntEnum
 from enum import unique
+from events import keyed_subscriber
 from events import subscriber
 from game.entities.entity import Entity
 from game.events import BuildingDisappear
 from game.events import BuildingSpawn
 from game.events import BuildingStatusChange
 from game.events import EntityPick
+from game.materials import get_material_cache
+from log import get_logger
 from matlib.vec import Vec
 from network.message import Message
 from network.message import MessageField as MF
 from network.message import MessageType
-from renderlib.material import Material
 from renderlib.mesh import MeshProps
-from renderlib.texture import Texture
 from utils import to_scene
-import logging
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 @unique
@@ -55,14 +55,11 @@ class Building(Entity):
         self._position = to_scene(*position)
         self._completed = None
 
-        # create texture
-        texture = Texture.from_image(resource['texture'], Texture.TextureType.texture_2d)
         self.mesh_project = resource['model_project']
         self.mesh_complete = resource['model_complete']
 
-        # create material
-        material = Material()
-        material.texture = texture
+        # get the material shared by the buildings of the same resource
+        material = get_material_cache().acquire(resource, 'texture')
 
         # create render props
         self.props = MeshProps()
@@ -109,8 +106,12 @@ class Building(Entity):
     def remove(self):
         """Removes itself from the scene.
         """
-        LOG.debug('Remove building {}'.format(self.e_id))
+        LOG.debug('Remove building %s', self.e_id)
         self.obj.remove()
+        get_material_cache().release(self.props.material)
+
+    def awake(self):
+        return False
 
     def update(self, dt):
         """Updates the building.
@@ -128,7 +129,7 @@ def building_spawn(evt):
 
     A building of the appropriate type is created and placed into the game.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
 
     # Only instantiate the new building if it does not exist
@@ -149,39 +150,33 @@ def building_spawn(evt):
         # Create the building
         building = Building(
             resource, context.scene, evt.pos, (evt.cur_hp, tot), evt.completed)
-        context.entities[building.e_id] = building
-        context.server_entities_map[evt.srv_id] = building.e_id
+        context.entities.add(building, evt.srv_id)
 
 
 @subscriber(BuildingDisappear)
 def building_disappear(evt):
     """Removes a building from the game.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     if evt.srv_id in context.server_entities_map:
-        e_id = context.server_entities_map.pop(evt.srv_id)
-        building = context.entities.pop(e_id)
+        building = context.entities.remove_server(evt.srv_id)
         building.remove()
 
 
-@subscriber(BuildingStatusChange)
-def building_health_change(evt):
+@keyed_subscriber(BuildingStatusChange)
+def building_health_change(building, evt):
     """Updates the number of hp of the building.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
-    context = evt.context
-    if evt.srv_id in context.server_entities_map:
-        e_id = context.server_entities_map[evt.srv_id]
-        building = context.entities[e_id]
-        building.completed = evt.completed
+    LOG.debug('Event subscriber: %s', evt)
+    building.completed = evt.completed
 
 
 @subscriber(EntityPick)
 def building_click(evt):
     """Check if the object picked is a building and if it needs repairing.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     if isinstance(evt.entity, Building):
         msg = Message(MessageType.repair, {
@@ -1,6 +1,7 @@
 from events import send_event
 from events import subscriber
 from game.actions import place_building_template
+from game.components import Transform
 from game.entities.actor import ActorType
 from game.entities.building import BuildingType
 from game.entities.entity import Entity
@@ -8,15 +9,14 @@ from game.events import BuildingDisappear
 from game.events import BuildingSpawn
 from game.events import GameModeChange
 from game.events import GameModeToggle
+from log import get_logger
 from matlib.vec import Vec
 from renderlib.material import Material
 from renderlib.mesh import MeshProps
 from utils import in_matrix
 from utils import to_matrix
-from utils import to_scene
-import logging
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class BuildingTemplate(Entity):
@@ -41,15 +41,13 @@ class BuildingTemplate(Entity):
         :param scale_factor: The scale factor of the grid.
         :type scale_factor: int
         """
-        super().__init__()
-
         self.pos = (0, 0)
         self.matrix = matrix
         self.scale_factor = scale_factor
 
         mesh = resource['model_complete']
 
-        # create material
+        # create material (not shared, its color changes with the position)
         material = Material()
         material.color = self.BUILDABLE_COLOR
 
@@ -59,33 +57,37 @@ class BuildingTemplate(Entity):
 
         # create components
         self.obj = scene.add_mesh(mesh, self.props)
+        super().__init__(Transform(self.obj))
 
     def remove(self):
         """Removes itself from the scene.
         """
-        LOG.debug('Remove building template {}'.format(self.e_id))
+        LOG.debug('Remove building template %s', self.e_id)
         self.obj.remove()
 
+    def awake(self):
+        # NOTE: woken up when moved by `place_building_template`
+        return False
+
     def update(self, dt):
         """Update the building template.
 
         This method just applies the current position of the entity to the
-        renderable transform.
+        renderable transform, when it changes.
 
         :param dt: Time delta from last update.
         :type dt: float
         """
-        x, y = self.pos
+        if not self[Transform].update(self.pos, scale=1.05):
+            return
 
+        x, y = self.pos
         m_x, m_y = to_matrix(x, y, self.scale_factor)
         if not in_matrix(self.matrix, m_x, m_y) or not self.matrix[m_y][m_x]:
             self.props.material.color = self.NON_BUILDABLE_COLOR
         else:
             self.props.material.color = self.BUILDABLE_COLOR
 
-        self.obj.position = to_scene(x, y)
-        self.obj.scale = Vec(1.05, 1.05, 1.05)
-
 
 @subscriber(GameModeToggle)
 def show_building_template(evt):
@@ -6,10 +6,10 @@ from game.events import ActorSpawn
 from game.events import ActorStatusChange
 from game.events import CharacterBuildingStart
 from game.events import CharacterBuildingStop
-import logging
+from log import get_logger
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class Character(Actor):
@@ -41,7 +41,7 @@ def character_spawn(evt):
     :param evt: The event instance
     :type evt: :class:`game.events.ActorSpawn`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
 
     # Only instantiate the new character if it does not exist
@@ -64,8 +64,7 @@ def character_spawn(evt):
         # Create the character
         character = Character(
             resource, context.scene, evt.actor_type)
-        context.entities[character.e_id] = character
-        context.server_entities_map[evt.srv_id] = character.e_id
+        context.entities.add(character, evt.srv_id)
 
 
 @subscriber(ActorDisappear)
@@ -77,16 +76,15 @@ def character_disappear(evt):
     :param evt: The event instance
     :type evt: :class:`game.events.ActorDisappear`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     is_character = evt.actor_type in Character.MEMBERS
     if evt.srv_id in context.server_entities_map and is_character:
-        e_id = context.server_entities_map.pop(evt.srv_id)
-        character = context.entities.pop(e_id)
+        character = context.entities.remove_server(evt.srv_id)
         character.remove()
 
 
-@subscriber(ActorDisappear)
+@subscriber(ActorDisappear, deferred=True, priority=1)
 def character_death_sound(evt):
     # TODO: add documentation
     is_character = evt.actor_type in Character.MEMBERS
@@ -94,11 +92,11 @@ def character_death_sound(evt):
         evt.context.audio_mgr.play_fx('player_death')
 
 
-@subscriber(ActorStatusChange)
+@subscriber(ActorStatusChange, deferred=True, priority=1)
 def character_get_hit_sound(evt):
     """Play character attack sounds.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     is_character = evt.actor_type in Character.MEMBERS
     if evt.srv_id in context.server_entities_map and is_character:
@@ -106,15 +104,15 @@ def character_get_hit_sound(evt):
             evt.context.audio_mgr.play_fx('zombie_attack')
 
 
-@subscriber(CharacterBuildingStart)
+@subscriber(CharacterBuildingStart, deferred=True, priority=1)
 def character_building_start(evt):
     # TODO: add documentation
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     evt.context.audio_mgr.play_fx('crafting', loops=-1, key=evt.srv_id)
 
 
-@subscriber(CharacterBuildingStop)
+@subscriber(CharacterBuildingStop, deferred=True, priority=1)
 def character_building_stop(evt):
     # TODO: add documentation
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     evt.context.audio_mgr.stop_fx(key=evt.srv_id)
@@ -6,13 +6,13 @@ from game.events import ActorDisappear
 from game.events import ActorSpawn
 from game.events import ActorStatusChange
 from game.events import EntityPick
+from log import get_logger
 from network.message import Message
 from network.message import MessageField as MF
 from network.message import MessageType
-import logging
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class Enemy(Actor):
@@ -21,6 +21,27 @@ class Enemy(Actor):
     MEMBERS = {ActorType.zombie}
 
 
+def enemy_resource(context, actor_type):
+    """Returns the resource of the enemies of the given type.
+
+    :param context: The game context.
+    :type context: :class:`context.Context`
+
+    :param actor_type: The type of the enemy
+    :type actor_type: :enum:`game.entities.actor.ActorType`
+
+    :returns: The enemy resource
+    :rtype: :class:`loaders.Resource`
+    """
+    entities = context.res_mgr.get('/entities')
+    return context.res_mgr.get(
+        entities.data['entities_map'].get(
+            ActorType(actor_type).name,
+            '/enemies/zombie'
+        )
+    )
+
+
 @subscriber(ActorSpawn)
 def enemy_spawn(evt):
     """Add a enemy in the game.
@@ -30,26 +51,22 @@ def enemy_spawn(evt):
     :param evt: The event instance
     :type evt: :class:`game.events.ActorSpawn`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
 
     # Only instantiate the new character if it does not exist
     entity_exists = context.resolve_entity(evt.srv_id)
 
     if not entity_exists and evt.actor_type in Enemy.MEMBERS:
-        entities = context.res_mgr.get('/entities')
-        resource = context.res_mgr.get(
-            entities.data['entities_map'].get(
-                ActorType(evt.actor_type).name,
-                '/enemies/zombie'
-            )
-        )
+        resource = enemy_resource(context, evt.actor_type)
 
-        # Create the character
-        character = Enemy(resource, context.scene, evt.actor_type)
+        # Create the character, reusing a pooled one if available
+        if context.enemy_pool is not None:
+            character = context.enemy_pool.acquire(resource, evt.actor_type)
+        else:
+            character = Enemy(resource, context.scene, evt.actor_type)
         character.set_action(ActionType.move)
-        context.entities[character.e_id] = character
-        context.server_entities_map[evt.srv_id] = character.e_id
+        context.entities.add(character, evt.srv_id)
 
 
 @subscriber(ActorDisappear)
@@ -61,13 +78,15 @@ def enemy_disappear(evt):
     :param evt: The event instance
     :type evt: :class:`game.events.ActorDisappear`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     is_zombie = evt.actor_type in Enemy.MEMBERS
     if evt.srv_id in context.server_entities_map and is_zombie:
-        e_id = context.server_entities_map.pop(evt.srv_id)
-        character = context.entities.pop(e_id)
-        character.remove()
+        character = context.entities.remove_server(evt.srv_id)
+        if context.enemy_pool is not None:
+            context.enemy_pool.release(character)
+        else:
+            character.remove()
 
 
 @subscriber(ActorDisappear)
@@ -87,7 +106,7 @@ def enemy_click(evt):
     :param evt: The event instance
     :type evt: :class:`game.events.ActorDisappear`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     if isinstance(evt.entity, Enemy):
         msg = Message(MessageType.attack, {
@@ -96,11 +115,11 @@ def enemy_click(evt):
         context.msg_queue.append(msg)
 
 
-@subscriber(ActorStatusChange)
+@subscriber(ActorStatusChange, deferred=True, priority=1)
 def fight_sounds(evt):
     """Play zombie attack sounds.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     is_zombie = evt.actor_type in Enemy.MEMBERS
     if evt.srv_id in context.server_entities_map and is_zombie:
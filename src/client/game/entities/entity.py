@@ -10,6 +10,10 @@ class Entity(ABC):
     # entity.
     count = count()
 
+    #: scheduler of the updates of the entity, set when the entity is
+    # scheduled (see :class:`game.scheduler.UpdateScheduler`)
+    scheduler = None
+
     def __init__(self, *components):
         """Constructor.
 
@@ -42,6 +46,22 @@ class Entity(ABC):
         """
         pass
 
+    def awake(self):
+        """Tells whether the entity needs to be updated at each frame.
+
+        Entities which are not awake after an update are put to sleep until
+        they are woken up with :meth:`wake`.
+
+        :returns: Whether the entity is awake
+        :rtype: bool
+        """
+        return True
+
+    def wake(self):
+        """Resumes the updates of the entity, if sleeping."""
+        if self.scheduler is not None:
+            self.scheduler.wake(self)
+
     @abstractmethod
     def remove(self):
         """Remove the entity from the game."""
@@ -1,9 +1,8 @@
 from game.entities.entity import Entity
 from game.entities.map_object import MapObject
+from game.materials import get_material_cache
 from matlib.vec import Vec
-from renderlib.material import Material
 from renderlib.mesh import MeshProps
-from renderlib.texture import Texture
 
 
 class Map(Entity):
@@ -21,16 +20,11 @@ class Map(Entity):
         super().__init__()
 
         mesh = resource['walls_mesh']
-        texture = Texture.from_image(
-            resource['walls_texture'],
-            Texture.TextureType.texture_2d)
-
-        material = Material()
-        material.texture = texture
-        material.receive_light = True
+        self.material = get_material_cache().acquire(
+            resource, 'walls_texture', receive_light=True)
 
         props = MeshProps()
-        props.material = material
+        props.material = self.material
         props.receive_shadows = False
         props.cast_shadows = False
 
@@ -54,6 +48,9 @@ class Map(Entity):
         """
         self.objects.append(obj)
 
+    def awake(self):
+        return False
+
     def update(self, dt):
         # NOTE: nothing to do
         pass
@@ -62,3 +59,4 @@ class Map(Entity):
         for obj in self.objects:
             obj.remove()
         self.obj.remove()
+        get_material_cache().release(self.material)
@@ -4,22 +4,21 @@ from events import subscriber
 from game.entities.entity import Entity
 from game.events import EntityPick
 from game.events import ObjectSpawn
+from game.materials import get_material_cache
+from log import get_logger
 from math import pi
 from matlib.vec import Vec
 from network.message import Message
 from network.message import MessageField as MF
 from network.message import MessageType
-from renderlib.material import Material
 from renderlib.mesh import MeshProps
-from renderlib.texture import Texture
 from utils import to_scene
-import logging
 
 
 Y_AXIS = Vec(0, 1, 0)
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 @unique
@@ -46,16 +45,11 @@ class MapObject(Entity):
         super().__init__()
 
         mesh = resource['model']
-        texture = Texture.from_image(
-            resource['texture'],
-            Texture.TextureType.texture_2d)
-
-        material = Material()
-        material.texture = texture
-        material.receive_light = True
+        self.material = get_material_cache().acquire(
+            resource, 'texture', receive_light=True)
 
         props = MeshProps()
-        props.material = material
+        props.material = self.material
         props.cast_shadows = True
         props.receive_shadows = True
 
@@ -72,6 +66,9 @@ class MapObject(Entity):
         self._position = parameters['pos']
         self._bounding_box = Vec(-0.5, 0.5, -0.5), Vec(0.5, 1.5, 0.5)
 
+    def awake(self):
+        return False
+
     def update(self, dt):
         # NOTE: nothing to do
         pass
@@ -95,11 +92,12 @@ class MapObject(Entity):
 
     def remove(self):
         self.obj.remove()
+        get_material_cache().release(self.material)
 
 
 @subscriber(ObjectSpawn)
 def object_spawn(evt):
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     level = context.map
 
@@ -113,14 +111,14 @@ def object_spawn(evt):
     map_obj = MapObject(obj_res, context.scene, obj_data)
     level.add_object(map_obj)
 
-    context.entities[map_obj.e_id] = map_obj
-    context.server_entities_map[evt.srv_id] = map_obj.e_id
+    # NOTE: no events are addressed to the map objects
+    context.entities.add(map_obj, evt.srv_id, routed=False)
     # TODO: handle operated objects
 
 
 @subscriber(EntityPick)
 def object_click(evt):
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
     if isinstance(evt.entity, MapObject):
         msg = Message(MessageType.use, {
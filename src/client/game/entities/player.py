@@ -1,18 +1,22 @@
 from context import Context
 from events import subscriber
+from game.components import Movable
 from game.entities.actor import ActorType
 from game.entities.character import Character
 from game.events import ActorSpawn
+from log import get_logger
 from matlib.vec import Vec
-import logging
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class Player(Character):
     """Game entity representing the local player"""
 
+    # Ground point the camera was last pointed at
+    camera_target = None
+
     def update(self, dt):
         """Update the local player.
 
@@ -25,13 +29,16 @@ class Player(Character):
         super(Player, self).update(dt)
 
         # map player game position to world (x,y -> x,z)
-        x, z = self.position
+        x, z = self[Movable].interpolated
 
-        # update camera position and orientation
-        context = Context.get_instance()
-        camera = context.camera
-        camera.position = Vec(x, 20, z + 5)
-        camera.look_at(camera.position, Vec(x, 0, z))
+        # update camera position and orientation, only when it actually moves
+        if (x, z) != self.camera_target:
+            self.camera_target = x, z
+            context = Context.get_instance()
+            camera = context.camera
+            camera.position = Vec(x, 20, z + 5)
+            camera.look_at(camera.position, Vec(x, 0, z))
+            context.viewport.invalidate()
 
 
 @subscriber(ActorSpawn)
@@ -41,7 +48,7 @@ def player_spawn(evt):
     :param evt: The event instance
     :type evt: :class:`game.events.ActorSpawn`
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
 
     # Only instantiate the player if it does not exist
@@ -63,14 +70,13 @@ def player_spawn(evt):
 
         # Create the player
         player = Player(resource, context.scene, evt.actor_type)
-        context.entities[player.e_id] = player
-        context.server_entities_map[evt.srv_id] = player.e_id
+        context.entities.add(player, evt.srv_id)
 
 
 @subscriber(ActorSpawn)
 def player_spawn_sound(evt):
     # TODO: add documentation
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     is_player = evt.srv_id == evt.context.player_id
     if is_player:
         evt.context.audio_mgr.play_fx('toilet_flush')
@@ -0,0 +1,124 @@
+"""Pool of recycled actors.
+
+Creating an actor is expensive (animation instances, scene object, material):
+actors of high-churn kinds (eg. zombies) are hidden and kept for reuse when
+they disappear, instead of being destroyed.
+"""
+from collections import defaultdict
+from log import get_logger
+from profiling import CallStats
+import time
+
+
+LOG = get_logger(__name__)
+
+
+class ActorPool:
+    """Recycled actors of a class, by resource."""
+
+    def __init__(self, cls, scene, max_size=256, max_samples=1000):
+        """Constructor.
+
+        :param cls: The class of the pooled actors
+        :type cls: :class:`game.entities.actor.Actor` subclass
+
+        :param scene: Scene to add the actors to.
+        :type scene: :class:`renderlib.scene.Scene`
+
+        :param max_size: The maximum number of free actors of each resource
+        :type max_size: int
+
+        :param max_samples: Number of recent spawn timings kept
+        :type max_samples: int
+        """
+        self.cls = cls
+        self.scene = scene
+        self.max_size = max_size
+        #: Free actors, by resource path and actor type
+        self.free = defaultdict(list)
+
+        self.hits = 0
+        self.misses = 0
+        self.spawns = CallStats(max_samples)
+
+    def __len__(self):
+        return sum(len(actors) for actors in self.free.values())
+
+    def prewarm(self, resource, actor_type, size):
+        """Creates free actors up to the given number.
+
+        :param resource: The actor resource
+        :type resource: :class:`loaders.Resource`
+
+        :param actor_type: The type of the actors
+        :type actor_type: :enum:`game.entities.actor.ActorType`
+
+        :param size: The number of free actors
+        :type size: int
+        """
+        free = self.free[resource.r_path, actor_type]
+        while len(free) < min(size, self.max_size):
+            actor = self.cls(resource, self.scene, actor_type)
+            actor.park()
+            free.append(actor)
+        LOG.info('Pool of %s prewarmed to %d', resource.r_path, len(free))
+
+    def acquire(self, resource, actor_type):
+        """Returns an actor, recycled if any is available.
+
+        :param resource: The actor resource
+        :type resource: :class:`loaders.Resource`
+
+        :param actor_type: The type of the actor
+        :type actor_type: :enum:`game.entities.actor.ActorType`
+
+        :returns: The actor
+        :rtype: :class:`game.entities.actor.Actor`
+        """
+        start = time.perf_counter()
+        free = self.free.get((resource.r_path, actor_type))
+        if free:
+            self.hits += 1
+            actor = free.pop()
+            actor.unpark()
+        else:
+            self.misses += 1
+            actor = self.cls(resource, self.scene, actor_type)
+        self.spawns.add(time.perf_counter() - start, 0)
+        return actor
+
+    def release(self, actor):
+        """Hides an actor and keeps it for reuse, or removes it if the pool is
+        full.
+
+        :param actor: The actor
+        :type actor: :class:`game.entities.actor.Actor`
+        """
+        free = self.free[actor.resource.r_path, actor.actor_type]
+        if len(free) < self.max_size:
+            actor.park()
+            free.append(actor)
+        else:
+            actor.remove()
+
+    def clear(self):
+        """Removes all the free actors."""
+        for free in self.free.values():
+            for actor in free:
+                actor.remove()
+        self.free.clear()
+
+    def stats(self):
+        """Returns the statistics of the pool.
+
+        :returns: Mapping of the statistics: `free` actors, `hits`, `misses`,
+            `mean_latency` and `p99_latency` of the spawns (in seconds)
+        :rtype: dict
+        """
+        return {
+            'free': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'mean_latency': self.spawns.mean,
+            'p99_latency': self.spawns.percentile(99),
+        }
@@ -1,7 +1,6 @@
 from game.entities.entity import Entity
-from renderlib.material import Material
+from game.materials import get_material_cache
 from renderlib.mesh import MeshProps
-from renderlib.texture import Texture
 
 
 class Terrain(Entity):
@@ -19,13 +18,10 @@ class Terrain(Entity):
         super().__init__()
 
         mesh = resource['floor_mesh']
-        texture = Texture.from_image(resource['floor_texture'], Texture.TextureType.texture_2d)
-
-        material = Material()
-        material.texture = texture
+        self.material = get_material_cache().acquire(resource, 'floor_texture')
 
         props = MeshProps()
-        props.material = material
+        props.material = self.material
         props.receive_shadows = True
         props.cast_shadows = False
 
@@ -34,9 +30,13 @@ class Terrain(Entity):
         # matrix that adds one more walkable line on top of the scenario.
         self.obj.position.z = 1.0
 
+    def awake(self):
+        return False
+
     def update(self, dt):
         # NOTE: nothing to do here
         pass
 
     def remove(self):
         self.obj.remove()
+        get_material_cache().release(self.material)
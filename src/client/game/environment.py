@@ -17,7 +17,7 @@ def get_daytime(hour):
     return 'night'
 
 
-@subscriber(TimeUpdate)
+@subscriber(TimeUpdate, deferred=True, priority=1)
 def deejay(evt):
     """Change music based on daytime.
     """
@@ -1,4 +1,5 @@
 from events import Event
+from events import PooledEvent
 
 
 class ActorSpawn(Event):
@@ -7,6 +8,8 @@ class ActorSpawn(Event):
     Event emitted when a new actor is discovered in the gamestate.
     """
 
+    __slots__ = ('srv_id', 'actor_type', 'cur_hp')
+
     def __init__(self, srv_id, actor_type, cur_hp):
         self.srv_id = srv_id
         self.actor_type = actor_type
@@ -23,6 +26,8 @@ class ActorDisappear(Event):
     Event emitted when a previously existing actor does not exist anymore.
     """
 
+    __slots__ = ('srv_id', 'actor_type')
+
     def __init__(self, srv_id, actor_type):
         self.srv_id = srv_id
         self.actor_type = actor_type
@@ -31,12 +36,14 @@ class ActorDisappear(Event):
         return '<ActorDisappear({}, {})>'.format(self.srv_id, self.actor_type)
 
 
-class ActorStatusChange(Event):
+class ActorStatusChange(PooledEvent):
     """An actor status changed.
 
     Event emitted when the amount of hp of a building changes.
     """
 
+    __slots__ = ('srv_id', 'actor_type', 'old', 'new')
+
     def __init__(self, srv_id, actor_type, old, new):
         self.srv_id = srv_id
         self.actor_type = actor_type
@@ -48,12 +55,14 @@ class ActorStatusChange(Event):
             self.srv_id, self.actor_type, self.old, self.new)
 
 
-class ActorActionChange(Event):
+class ActorActionChange(PooledEvent):
     """An entity changed current action.
 
     Event emitted when an entity started doing another action.
     """
 
+    __slots__ = ('srv_id', 'actor_type', 'old', 'new')
+
     def __init__(self, srv_id, actor_type, old, new):
         self.srv_id = srv_id
         self.actor_type = actor_type
@@ -71,6 +80,8 @@ class BuildingSpawn(Event):
     Event emitted when a new building is discovered in the gamestate.
     """
 
+    __slots__ = ('srv_id', 'b_type', 'pos', 'cur_hp', 'completed')
+
     def __init__(self, srv_id, b_type, pos, cur_hp, completed):
         self.srv_id = srv_id
         self.b_type = b_type
@@ -88,6 +99,8 @@ class BuildingDisappear(Event):
     Event emitted when a previously existing building does not exist anymore.
     """
 
+    __slots__ = ('srv_id', 'b_type', 'pos', 'cur_hp', 'completed')
+
     def __init__(self, srv_id, b_type, pos, cur_hp, completed):
         self.srv_id = srv_id
         self.b_type = b_type
@@ -105,6 +118,8 @@ class BuildingStatusChange(Event):
     Event emitted when the amount of hp of a building changes.
     """
 
+    __slots__ = ('srv_id', 'old', 'new', 'completed')
+
     def __init__(self, srv_id, old, new, completed):
         self.srv_id = srv_id
         self.old = old
@@ -122,6 +137,8 @@ class TimeUpdate(Event):
     Event emitted on game time change.
     """
 
+    __slots__ = ('hour', 'minute')
+
     def __init__(self, hour, minute):
         """Constructor.
 
@@ -139,6 +156,8 @@ class EntityPick(Event):
     """The player clicked on an entity.
     """
 
+    __slots__ = ('entity',)
+
     def __init__(self, entity):
         """Constructor.
 
@@ -151,12 +170,14 @@ class EntityPick(Event):
         return '<EntityPick({})>'.format(self.entity)
 
 
-class ActorIdle(Event):
+class ActorIdle(PooledEvent):
     """Actor is idle.
 
     Event emitted when the actor is in idle state.
     """
 
+    __slots__ = ('srv_id', 'x', 'y')
+
     def __init__(self, srv_id, x, y):
         """Constructor.
 
@@ -176,12 +197,14 @@ class ActorIdle(Event):
         return '<ActorIdle({}, {}, {})>'.format(self.srv_id, self.x, self.y)
 
 
-class ActorMove(Event):
+class ActorMove(PooledEvent):
     """Receved move action.
 
     Event emitted whenever the player is subject to a move action.
     """
 
+    __slots__ = ('srv_id', 'position', 'path', 'speed')
+
     def __init__(self, srv_id, position, path, speed):
         """Constructor.
 
@@ -214,6 +237,8 @@ class CharacterJoin(Event):
     Event emitted when a character joins the game.
     """
 
+    __slots__ = ('srv_id', 'name')
+
     def __init__(self, srv_id, name):
         self.srv_id = srv_id
         self.name = name
@@ -228,6 +253,8 @@ class CharacterLeave(Event):
     Event emitted when a character leaves the game.
     """
 
+    __slots__ = ('srv_id', 'name', 'reason')
+
     def __init__(self, srv_id, name, reason):
         self.srv_id = srv_id
         self.name = name
@@ -244,6 +271,8 @@ class CharacterBuildingStart(Event):
     Event emitted when a character started building.
     """
 
+    __slots__ = ('srv_id',)
+
     def __init__(self, srv_id):
         self.srv_id = srv_id
 
@@ -257,6 +286,8 @@ class CharacterBuildingStop(Event):
     Event emitted when a character stopped building.
     """
 
+    __slots__ = ('srv_id',)
+
     def __init__(self, srv_id):
         self.srv_id = srv_id
 
@@ -270,6 +301,8 @@ class PlayerJoin(CharacterJoin):
     Event emitted when the local player actually joined the game.
     """
 
+    __slots__ = ()
+
     def __str__(self):
         return '<PlayerJoin({}, {})>'.format(self.srv_id, self.name)
 
@@ -280,6 +313,8 @@ class GameModeChange(Event):
     Event emitted when the game mode changed.
     """
 
+    __slots__ = ('prev', 'cur')
+
     def __init__(self, prev, cur):
         self.prev, self.cur = prev, cur
 
@@ -293,6 +328,8 @@ class GameModeToggle(Event):
     Event emitted when the user is toggling a game mode.
     """
 
+    __slots__ = ('mode',)
+
     def __init__(self, mode):
         """Constructor.
 
@@ -311,6 +348,8 @@ class ObjectSpawn(Event):
     Event emitted when a new static object appear.
     """
 
+    __slots__ = ('srv_id', 'obj_type', 'pos', 'operated_by')
+
     def __init__(self, srv_id, obj_type, pos, operated_by):
         """Constructor.
 
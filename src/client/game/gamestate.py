@@ -1,4 +1,6 @@
+from collections import Counter
 from events import send_event
+from events import send_events
 from game.entities.actor import ActionType
 from game.entities.actor import ActorType
 from game.entities.building import BuildingType
@@ -15,11 +17,12 @@ from game.events import CharacterBuildingStart
 from game.events import CharacterBuildingStop
 from game.events import ObjectSpawn
 from game.events import TimeUpdate
+from log import get_logger
 from network import MessageField as MF
-import logging
+from profiling import get_profiler
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class GameStateManager:
@@ -40,6 +43,9 @@ class GameStateManager:
         # during initialization
         self.cur = -1
         self.gamestate_buf = [None for x in range(size)]
+        # Whether each section changed in the last gamestate, computed once
+        # and shared by all the processors
+        self.changes = {}
 
     def push(self, gamestate):
         """Push a new gamestate into the ring bffer.
@@ -49,6 +55,7 @@ class GameStateManager:
         """
         self.cur = (self.cur + 1) % self.size
         self.gamestate_buf[self.cur] = gamestate
+        self.changes = {}
 
     def get(self, n=1):
         """Get n gamestates from the ring buffer.
@@ -67,9 +74,51 @@ class GameStateManager:
             for i in range(self.cur, self.cur - n, -1)
         ]
 
+    def section_changed(self, section):
+        """Checks if a section changed in the last gamestate.
+
+        Sections are compared by value once per gamestate, the result being
+        shared by all the processors. Since each gamestate is decoded anew, the
+        comparison walks the whole section when it is unchanged: its cost is
+        linear in the size of the section (eg. the number of entities), and
+        lower only when a difference is found early.
+
+        :param section: The section of the gamestate
+        :type section: :enum:`network.message.MessageField`
+
+        :returns: False only if there is a previous gamestate and the section
+            is unchanged
+        :rtype: bool
+        """
+        changed = self.changes.get(section)
+        if changed is None:
+            new, old = self.get(2)
+            if old is None:
+                changed = True
+            else:
+                changed = new.get(section) != old.get(section)
+            self.changes[section] = changed
+        return changed
+
+    def changed(self, sections):
+        """Checks if any of the given sections changed in the last gamestate.
+
+        :param sections: The sections to be checked
+        :type sections: sequence of :enum:`network.message.MessageField`
+
+        :returns: False only if there is a previous gamestate and all the given
+            sections are unchanged
+        :rtype: bool
+        """
+        return any(self.section_changed(section) for section in sections)
+
 
 __MANAGER = GameStateManager(2)
 __PROCESSORS = []
+__STATS = Counter()
+__INVOCATIONS = Counter()
+__SKIPS = Counter()
+__RECORDERS = []
 
 
 def processor(f):
@@ -79,18 +128,89 @@ def processor(f):
     return f
 
 
+def add_recorder(f):
+    """Registers a function to be called with every received gamestate.
+
+    Recorders are called before any processor, with the raw gamestate as only
+    parameter.
+
+    :param f: The recorder function
+    :type f: callable
+    """
+    __RECORDERS.append(f)
+
+
+def remove_recorder(f):
+    """Unregisters a recorder function.
+
+    :param f: The recorder function
+    :type f: callable
+    """
+    __RECORDERS.remove(f)
+
+
+def depends_on(section):
+    """Decorator declaring a gamestate section a processor depends on.
+
+    A processor declaring its dependencies is skipped when none of them changed
+    since the previous gamestate, so it must not produce anything in that case.
+    Processors without declared dependencies are always called.
+
+    :param section: The section of the gamestate
+    :type section: :enum:`network.message.MessageField`
+    """
+    def wrap(f):
+        f.dependencies = getattr(f, 'dependencies', ()) + (section,)
+        return f
+    return wrap
+
+
 def process_gamestate(gamestate):
     """Director of all the gamestate handlers.
 
     Pushes the gamestate in the global gamestate manager and calls every
-    processor passing the gamestate manager as parameter.
+    processor whose dependencies changed, passing the gamestate manager as
+    parameter.
 
     :param gamestate: The current gamestate
     :type gamestate: dict
     """
     __MANAGER.push(gamestate)
+    for record in __RECORDERS:
+        record(gamestate)
+
+    profiler = get_profiler()
     for proc in __PROCESSORS:
-        proc(__MANAGER)
+        deps = getattr(proc, 'dependencies', None)
+        if deps and not __MANAGER.changed(deps):
+            __SKIPS[proc.__name__] += 1
+            continue
+        __INVOCATIONS[proc.__name__] += 1
+        if profiler:
+            profiler.call('processor', proc, __MANAGER)
+        else:
+            proc(__MANAGER)
+
+
+def get_stats():
+    """Returns the gamestate processing counters.
+
+    :returns: The mapping of counter names to their values
+    :rtype: dict
+    """
+    return dict(__STATS)
+
+
+def processor_stats():
+    """Returns the number of invocations and skips of each processor.
+
+    :returns: The mapping of processor names to (invoked, skipped) tuples
+    :rtype: dict
+    """
+    return {
+        proc.__name__: (__INVOCATIONS[proc.__name__], __SKIPS[proc.__name__])
+        for proc in __PROCESSORS
+    }
 
 
 def gamestate_entities(gs_mgr):
@@ -108,6 +228,7 @@ def gamestate_entities(gs_mgr):
 
 
 @processor
+@depends_on(MF.entities)
 def handle_actor_spawn(gs_mgr):
     """Check for new entities and send the appropriate events.
 
@@ -120,15 +241,17 @@ def handle_actor_spawn(gs_mgr):
     o = o or {}
     new, old = n[MF.entities], o.get(MF.entities, {})
     new_entities = set(new) - set(old)
+    evts = []
     for ent in new_entities:
         data = new[ent]
         actor_type = ActorType(data[MF.entity_type])
         cur_hp = data[MF.cur_hp]
-        evt = ActorSpawn(ent, actor_type, cur_hp)
-        send_event(evt)
+        evts.append(ActorSpawn(ent, actor_type, cur_hp))
+    send_events(evts)
 
 
 @processor
+@depends_on(MF.entities)
 def handle_actor_disappear(gs_mgr):
     """Check for disappeared entities and send the appropriate events.
 
@@ -141,12 +264,14 @@ def handle_actor_disappear(gs_mgr):
     o = o or {}
     new, old = n[MF.entities], o.get(MF.entities, {})
     old_entities = set(old) - set(new)
-    for ent in old_entities:
-        evt = ActorDisappear(ent, old[ent][MF.entity_type])
-        send_event(evt)
+    send_events([
+        ActorDisappear(ent, old[ent][MF.entity_type])
+        for ent in old_entities
+    ])
 
 
 @processor
+@depends_on(MF.entities)
 def handle_actor_action_change(gs_mgr):
     new, old = gs_mgr.get(2)
     if not old:
@@ -154,38 +279,61 @@ def handle_actor_action_change(gs_mgr):
 
     new_entities = new.get(MF.entities, {})
     old_entities = old.get(MF.entities, {})
+    evts = []
     for srv_id, entity in old_entities.items():
         if srv_id in new_entities:
             old_action = entity[MF.action_type]
             new_action = new_entities[srv_id][MF.action_type]
             if old_action != new_action:
                 actor_type = ActorType(entity[MF.entity_type])
-                send_event(ActorActionChange(
+                evts.append(ActorActionChange.acquire(
                     srv_id,
                     actor_type,
                     old_action,
                     new_action))
+    send_events(evts)
 
 
 @processor
+@depends_on(MF.entities)
 def handle_actor_idle(gs_mgr):
     """Handles entities in idle state and fires ActorIdle event for them.
 
+    The event is fired only for idle entities that are new, that were doing
+    something else or that changed position since the previous gamestate: in
+    any other case resetting the actor position would have no effect.
+
     :param gs_mgr: the gs_mgr
     :type gs_mgr: dict
     """
-    for srv_id, entity in gamestate_entities(gs_mgr):
-        # Update the position of every idle entity
-        if entity.get(MF.action_type, ActionType.idle) == ActionType.idle:
-            x, y = entity[MF.x_pos], entity[MF.y_pos]
-            evt = ActorIdle(srv_id, x, y)
-            send_event(evt)
+    n, o = gs_mgr.get(2)
+    o = o or {}
+    new, old = n[MF.entities], o.get(MF.entities, {})
+    evts = []
+    for srv_id, entity in new.items():
+        if entity.get(MF.action_type, ActionType.idle) != ActionType.idle:
+            continue
+
+        x, y = entity[MF.x_pos], entity[MF.y_pos]
+        prev = old.get(srv_id)
+        if (prev is not None and
+                prev.get(MF.action_type, ActionType.idle) == ActionType.idle and
+                prev[MF.x_pos] == x and prev[MF.y_pos] == y):
+            __STATS['idle_suppressed'] += 1
+            continue
+
+        evts.append(ActorIdle.acquire(srv_id, x, y))
+    send_events(evts)
 
 
 @processor
 def handle_actor_move(gs_mgr):
     """Handles moving entities and fires ActorMove event for them.
 
+    NOTE: this processor fires events for moving entities even if nothing
+    changed since the previous gamestate, so it does not declare dependencies
+    and it's never skipped.
+
     :param gs_mgr: the gs_mgr
     :type gs_mgr: dict
     """
@@ -194,20 +342,23 @@ def handle_actor_move(gs_mgr):
         return
     new_entities = new.get(MF.entities, {})
     old_entities = old.get(MF.entities, {})
+    evts = []
     for srv_id, entity in old_entities.items():
         if entity[MF.action_type] == ActionType.move and srv_id in new_entities:
             action = entity[MF.action]
             position = entity[MF.x_pos], entity[MF.y_pos]
             new_entity = new_entities[srv_id]
             new_position = new_entity[MF.x_pos], new_entity[MF.y_pos]
-            send_event(ActorMove(
+            evts.append(ActorMove.acquire(
                 srv_id,
                 position=position,
                 path=[new_position],
                 speed=action[MF.speed]))
+    send_events(evts)
 
 
 @processor
+@depends_on(MF.entities)
 def handle_character_start_building(gs_mgr):
     """Handles building entities and fires CharacterBuildingStart event for them.
 
@@ -224,6 +375,7 @@ def handle_character_start_building(gs_mgr):
 
 
 @processor
+@depends_on(MF.entities)
 def handle_character_stop_building(gs_mgr):
     """Handles entities that stopped building and fires CharacterBuildingStop
     event for them.
@@ -241,6 +393,7 @@ def handle_character_stop_building(gs_mgr):
 
 
 @processor
+@depends_on(MF.entities)
 def handle_actor_health(gs_mgr):
     """Check for entity health changes and send the appropriate event.
 
@@ -250,6 +403,7 @@ def handle_actor_health(gs_mgr):
     n, o = gs_mgr.get(2)
     o = o or {}
     new, old = n[MF.entities], o.get(MF.entities, {})
+    evts = []
     for e_id, entities in new.items():
         if e_id in old:
             new_hp = entities[MF.cur_hp]
@@ -257,10 +411,13 @@ def handle_actor_health(gs_mgr):
             hp_changed = new_hp != old_hp
             actor_type = ActorType(entities[MF.entity_type])
             if hp_changed:
-                send_event(ActorStatusChange(e_id, actor_type, old_hp, new_hp))
+                evts.append(ActorStatusChange.acquire(
+                    e_id, actor_type, old_hp, new_hp))
+    send_events(evts)
 
 
 @processor
+@depends_on(MF.time)
 def handle_time(gs_mgr):
     """Handles time change and sends time update event.
 
@@ -289,17 +446,19 @@ def handle_buildings(selected, buildings, event):
     :param event: The event class to be used
     :type event: :class:`type`
     """
+    evts = []
     for building in selected:
         data = buildings[building]
         b_type = BuildingType(data[MF.building_type])
         pos = data[MF.x_pos], data[MF.y_pos]
         cur_hp = data[MF.cur_hp]
         completed = data[MF.completed]
-        evt = event(building, b_type, pos, cur_hp, completed)
-        send_event(evt)
+        evts.append(event(building, b_type, pos, cur_hp, completed))
+    send_events(evts)
 
 
 @processor
+@depends_on(MF.buildings)
 def handle_building_spawn(gs_mgr):
     """Check for new buildings and send the appropriate events.
 
@@ -316,6 +475,7 @@ def handle_building_spawn(gs_mgr):
 
 
 @processor
+@depends_on(MF.buildings)
 def handle_building_disappear(gs_mgr):
     """Check for disappeared buildings and send the appropriate events.
 
@@ -332,6 +492,7 @@ def handle_building_disappear(gs_mgr):
 
 
 @processor
+@depends_on(MF.buildings)
 def handle_building_health(gs_mgr):
     """Check for building health/satatus changes and send the appropriate event.
 
@@ -346,13 +507,14 @@ def handle_building_health(gs_mgr):
             new_hp = building[MF.cur_hp]
             old_hp = old[b_id][MF.cur_hp]
             hp_changed = new_hp != old_hp
-            status_changed = building[MF.completed] == old[b_id][MF.completed]
+            status_changed = building[MF.completed] != old[b_id][MF.completed]
             if hp_changed or status_changed:
                 send_event(BuildingStatusChange(
                     b_id, old_hp, new_hp, building[MF.completed]))
 
 
 @processor
+@depends_on(MF.objects)
 def handle_object_spawn(gs_mgr):
     """Check for new static objects and place them on the scene.
 
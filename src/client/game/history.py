@@ -0,0 +1,283 @@
+"""Bounded, delta-compressed history of the received gamestates.
+
+Gamestates are stored as groups, each one made of a keyframe (the whole
+msgpack-encoded gamestate) followed by the deltas of the next gamestates,
+each one computed against the previous gamestate. Any stored tick can be
+reconstructed by applying to the keyframe of its group all the deltas up to
+the tick itself.
+"""
+from collections import deque
+from log import get_logger
+from network import MessageField as MF
+import msgpack
+
+
+LOG = get_logger(__name__)
+
+
+#: Placeholder for missing item fields
+MISSING = object()
+
+
+#: Delta keys
+SET = b'set'
+DEL = b'del'
+NEW = b'new'
+UPD = b'upd'
+GONE = b'gone'
+
+
+def is_collection(value):
+    """Checks if a gamestate section is a collection of items (eg. entities).
+
+    :param value: The section value
+    :type value: object
+
+    :returns: True if the section maps keys to items, otherwise False
+    :rtype: bool
+    """
+    return (
+        isinstance(value, dict) and
+        all(isinstance(item, dict) for item in value.values()))
+
+
+def compute_delta(old, new):
+    """Computes the delta between two gamestates.
+
+    Collections of items (entities, buildings, objects) are compared item by
+    item, storing only the changed fields of each item; any other section is
+    stored as a whole if changed.
+
+    :param old: The previous gamestate
+    :type old: dict
+
+    :param new: The new gamestate
+    :type new: dict
+
+    :returns: The delta
+    :rtype: dict
+    """
+    delta = {SET: {}, DEL: [], NEW: {}, UPD: {}, GONE: {}}
+    for section, value in new.items():
+        prev = old.get(section)
+        if is_collection(value) and is_collection(prev):
+            added, updated = {}, {}
+            for key, item in value.items():
+                prev_item = prev.get(key)
+                if prev_item is None or set(prev_item) - set(item):
+                    added[key] = item
+                    continue
+                fields = {
+                    f: v for f, v in item.items()
+                    if prev_item.get(f, MISSING) != v
+                }
+                if fields:
+                    updated[key] = fields
+            gone = [key for key in prev if key not in value]
+            if added:
+                delta[NEW][section] = added
+            if updated:
+                delta[UPD][section] = updated
+            if gone:
+                delta[GONE][section] = gone
+        elif section not in old or prev != value:
+            delta[SET][section] = value
+
+    delta[DEL] = [section for section in old if section not in new]
+    return {k: v for k, v in delta.items() if v}
+
+
+def apply_delta(gamestate, delta):
+    """Applies a delta to a gamestate, in place.
+
+    :param gamestate: The gamestate to be modified
+    :type gamestate: dict
+
+    :param delta: The delta, as returned by :func:`compute_delta`
+    :type delta: dict
+
+    :returns: The modified gamestate
+    :rtype: dict
+    """
+    gamestate.update(delta.get(SET, {}))
+    for section in delta.get(DEL, []):
+        del gamestate[section]
+    for section, keys in delta.get(GONE, {}).items():
+        for key in keys:
+            del gamestate[section][key]
+    for section, items in delta.get(NEW, {}).items():
+        gamestate[section].update(items)
+    for section, items in delta.get(UPD, {}).items():
+        collection = gamestate[section]
+        for key, fields in items.items():
+            collection[key].update(fields)
+    return gamestate
+
+
+class GameStateHistory:
+    """History of the last received gamestates.
+
+    The history is bounded both in time and in memory: the oldest groups of
+    gamestates are discarded as soon as they exceed the time window or the
+    memory budget. The most recent group is never discarded.
+    """
+
+    def __init__(self, seconds, budget, keyframe_interval=50):
+        """Constructor.
+
+        :param seconds: Time window of the history in seconds
+        :type seconds: float
+
+        :param budget: Maximum amount of memory used by the encoded gamestates
+            in bytes
+        :type budget: int
+
+        :param keyframe_interval: Number of gamestates between keyframes
+        :type keyframe_interval: int
+        """
+        self.seconds = seconds
+        self.budget = budget
+        self.keyframe_interval = keyframe_interval
+
+        # Groups of [first tick, timestamps, encoded records]: the first record
+        # of each group is a keyframe, the others are deltas.
+        self.groups = deque()
+        self.size = 0
+        self.next_tick = 0
+        self.last = None
+
+    def __len__(self):
+        return sum(len(records) for _, _, records in self.groups)
+
+    @property
+    def first_tick(self):
+        """The oldest tick available, or None if the history is empty."""
+        return self.groups[0][0] if self.groups else None
+
+    @property
+    def last_tick(self):
+        """The most recent tick available, or None if the history is empty."""
+        return self.next_tick - 1 if self.groups else None
+
+    def push(self, gamestate):
+        """Records a new gamestate.
+
+        :param gamestate: The gamestate
+        :type gamestate: dict
+
+        :returns: The tick assigned to the gamestate
+        :rtype: int
+        """
+        tick = self.next_tick
+        timestamp = gamestate.get(MF.timestamp, 0)
+
+        group = self.groups[-1] if self.groups else None
+        if (group is None or self.last is None or
+                len(group[2]) >= self.keyframe_interval):
+            record = msgpack.packb(gamestate)
+            group = [tick, [], []]
+            self.groups.append(group)
+        else:
+            record = msgpack.packb(compute_delta(self.last, gamestate))
+
+        group[1].append(timestamp)
+        group[2].append(record)
+        self.size += len(record)
+        self.next_tick += 1
+        self.last = gamestate
+
+        self.evict(timestamp)
+        return tick
+
+    def evict(self, now):
+        """Discards the oldest groups exceeding the time window or the budget.
+
+        :param now: The timestamp of the most recent gamestate in milliseconds
+        :type now: int
+        """
+        while len(self.groups) > 1:
+            # NOTE: a group is discarded when even its latest gamestate is
+            # outside of the time window.
+            _, timestamps, records = self.groups[0]
+            expired = now - timestamps[-1] > self.seconds * 1000
+            if not expired and self.size <= self.budget:
+                break
+            self.groups.popleft()
+            self.size -= sum(len(r) for r in records)
+
+    def get(self, tick):
+        """Reconstructs the gamestate of the given tick.
+
+        :param tick: The tick
+        :type tick: int
+
+        :returns: The gamestate
+        :rtype: dict
+
+        :raises IndexError: if the tick is not available
+        """
+        for first, _, records in self.groups:
+            if first <= tick < first + len(records):
+                gamestate = msgpack.unpackb(records[0])
+                for record in records[1:tick - first + 1]:
+                    apply_delta(gamestate, msgpack.unpackb(record))
+                return gamestate
+        raise IndexError('tick {} not in history'.format(tick))
+
+    def timestamp(self, tick):
+        """Returns the timestamp of the given tick.
+
+        :param tick: The tick
+        :type tick: int
+
+        :returns: The timestamp in milliseconds
+        :rtype: int
+        """
+        for first, timestamps, _ in self.groups:
+            if first <= tick < first + len(timestamps):
+                return timestamps[tick - first]
+        raise IndexError('tick {} not in history'.format(tick))
+
+    def diff(self, a, b):
+        """Computes the delta between two ticks.
+
+        :param a: The first tick
+        :type a: int
+
+        :param b: The second tick
+        :type b: int
+
+        :returns: The delta, as returned by :func:`compute_delta`
+        :rtype: dict
+        """
+        return compute_delta(self.get(a), self.get(b))
+
+    def save(self, fp):
+        """Writes the history into a file.
+
+        :param fp: The file object, opened in binary mode
+        :type fp: file
+        """
+        fp.write(msgpack.packb({
+            b'keyframe_interval': self.keyframe_interval,
+            b'groups': list(self.groups),
+        }))
+
+    @classmethod
+    def load(cls, fp):
+        """Loads a history previously saved with :meth:`save`.
+
+        :param fp: The file object, opened in binary mode
+        :type fp: file
+
+        :returns: The history
+        :rtype: :class:`GameStateHistory`
+        """
+        data = msgpack.unpackb(fp.read())
+        history = cls(
+            float('inf'), float('inf'), data[b'keyframe_interval'])
+        for first, timestamps, records in data[b'groups']:
+            history.groups.append([first, timestamps, records])
+            history.size += sum(len(r) for r in records)
+            history.next_tick = first + len(records)
+        return history
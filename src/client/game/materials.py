@@ -0,0 +1,122 @@
+"""Shared textures and materials of the entities.
+
+Entities created from the same resource share their texture and material,
+instead of uploading the same image again for each of them: the cache keeps
+them alive while at least one entity is using them.
+"""
+from log import get_logger
+from renderlib.material import Material
+from renderlib.texture import Texture
+
+
+LOG = get_logger(__name__)
+
+
+class MaterialCache:
+    """Reference counted cache of textures and materials.
+
+    Textures are keyed by the path of the resource and the name of the image
+    within it; materials by their texture and parameters.
+    """
+
+    def __init__(self):
+        #: Texture key to texture and number of materials using it
+        self.textures = {}
+        #: Material key to material and number of users
+        self.materials = {}
+        #: Key of each cached material, by material id
+        self.keys = {}
+
+    def acquire(self, resource, texture, **params):
+        """Returns a material for the given texture and parameters.
+
+        The material is shared and must not be changed; it must be released
+        with :meth:`release` when no longer used.
+
+        :param resource: The resource containing the texture image
+        :type resource: :class:`loaders.Resource`
+
+        :param texture: The name of the texture image within the resource
+        :type texture: str
+
+        :param params: The attributes of the material (eg. `receive_light`)
+        :type params: dict
+
+        :returns: The material
+        :rtype: :class:`renderlib.material.Material`
+        """
+        t_key = resource.r_path, texture
+        key = t_key + tuple(sorted(params.items()))
+        entry = self.materials.get(key)
+        if entry is None:
+            material = Material()
+            material.texture = self.acquire_texture(t_key, resource[texture])
+            for name, value in params.items():
+                setattr(material, name, value)
+            entry = self.materials[key] = [material, 0]
+            self.keys[id(material)] = key
+        entry[1] += 1
+        return entry[0]
+
+    def acquire_texture(self, key, image):
+        """Returns the texture with the given key, creating it if needed.
+
+        :param key: The key of the texture
+        :type key: tuple
+
+        :param image: The texture image
+        :type image: :class:`renderlib.image.Image`
+
+        :returns: The texture
+        :rtype: :class:`renderlib.texture.Texture`
+        """
+        entry = self.textures.get(key)
+        if entry is None:
+            LOG.debug('Creating texture %s', key)
+            texture = Texture.from_image(image, Texture.TextureType.texture_2d)
+            entry = self.textures[key] = [texture, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, material):
+        """Releases a material, dropping it when it is no longer used.
+
+        :param material: The material returned by :meth:`acquire`
+        :type material: :class:`renderlib.material.Material`
+        """
+        key = self.keys.get(id(material))
+        if key is None:
+            return
+        entry = self.materials[key]
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+
+        del self.materials[key]
+        del self.keys[id(material)]
+        t_key = key[:2]
+        t_entry = self.textures[t_key]
+        t_entry[1] -= 1
+        if t_entry[1] <= 0:
+            LOG.debug('Dropping texture %s', t_key)
+            del self.textures[t_key]
+
+    def counts(self):
+        """Returns the number of cached textures and materials.
+
+        :returns: Mapping of the counts: `textures` and `materials`
+        :rtype: dict
+        """
+        return {'textures': len(self.textures), 'materials': len(self.materials)}
+
+
+__CACHE = MaterialCache()
+
+
+def get_material_cache():
+    """Returns the cache of the entity materials.
+
+    :returns: The material cache
+    :rtype: :class:`game.materials.MaterialCache`
+    """
+    return __CACHE
@@ -0,0 +1,92 @@
+"""Scheduling of the entity updates.
+
+Only the entities which are changing (eg. moving or playing an animation) need
+to be updated each frame: the scheduler keeps them apart from the sleeping
+ones, so that the cost of a frame scales with what is actually changing.
+
+Entities go to sleep when :meth:`game.entities.entity.Entity.awake` returns
+False after an update and are woken up explicitly, with
+:meth:`game.entities.entity.Entity.wake`, when something happens to them (eg.
+a movement starts).
+"""
+from log import get_logger
+
+
+LOG = get_logger(__name__)
+
+
+class UpdateScheduler:
+    """Active and sleeping sets of the entities."""
+
+    def __init__(self):
+        #: Entities updated each frame, by local id
+        self.active = {}
+        #: Entities not updated until woken up, by local id
+        self.sleeping = {}
+
+    def __len__(self):
+        return len(self.active) + len(self.sleeping)
+
+    def add(self, entity):
+        """Schedules the updates of an entity.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+        """
+        entity.scheduler = self
+        if entity.awake():
+            self.active[entity.e_id] = entity
+        else:
+            self.sleeping[entity.e_id] = entity
+
+    def remove(self, entity):
+        """Stops the updates of an entity.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+        """
+        self.active.pop(entity.e_id, None)
+        self.sleeping.pop(entity.e_id, None)
+        entity.scheduler = None
+
+    def wake(self, entity):
+        """Moves an entity into the active set.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+        """
+        e_id = entity.e_id
+        if self.sleeping.pop(e_id, None) is not None:
+            self.active[e_id] = entity
+
+    def sleep(self, entity):
+        """Moves an entity into the sleeping set.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+        """
+        e_id = entity.e_id
+        if self.active.pop(e_id, None) is not None:
+            self.sleeping[e_id] = entity
+
+    def update(self, dt):
+        """Updates the active entities, putting to sleep the idle ones.
+
+        :param dt: Time delta from last update.
+        :type dt: float
+        """
+        idle = []
+        for entity in list(self.active.values()):
+            entity.update(dt)
+            if not entity.awake():
+                idle.append(entity)
+        for entity in idle:
+            self.sleep(entity)
+
+    def counts(self):
+        """Returns the number of active and sleeping entities.
+
+        :returns: Mapping of the counts: `active` and `sleeping`
+        :rtype: dict
+        """
+        return {'active': len(self.active), 'sleeping': len(self.sleeping)}
@@ -0,0 +1,226 @@
+"""Spatial index of the game entities.
+
+Entities are hashed into a uniform grid laid on the ground plane (the `x` and
+`z` scene axes), aligned to the walkable matrix grid. Each entity is stored in
+the cell containing the center of its bounding box; queries take into account
+the extent of the bounding boxes by looking at the neighbouring cells too.
+"""
+from game.components import Movable
+from math import ceil
+from math import floor
+
+
+class SpatialHash:
+    """Uniform grid of the entities with a bounding box.
+
+    Entities with a :class:`game.components.Movable` component are kept up to
+    date as their position changes.
+    """
+
+    def __init__(self, scale_factor, cells=2):
+        """Constructor.
+
+        :param scale_factor: The scale factor of the walkable matrix
+        :type scale_factor: int
+
+        :param cells: The number of walkable matrix cells for each side of a
+            grid cell
+        :type cells: int
+        """
+        self.cell_size = cells / scale_factor
+        self.cells = {}
+        # Cell of each entity, by local id
+        self.entity_cells = {}
+
+        # Largest half extent and height of the indexed bounding boxes
+        self.extent = 0.0
+        self.top = 0.0
+        self.margin = 0
+
+    def __len__(self):
+        return len(self.entity_cells)
+
+    def cell(self, x, z):
+        """Returns the grid cell containing the given point.
+
+        :param x: The x coordinate in scene coordinates
+        :type x: float
+
+        :param z: The z coordinate in scene coordinates
+        :type z: float
+
+        :returns: The cell coordinates
+        :rtype: tuple
+        """
+        s = self.cell_size
+        return int(floor(x / s)), int(floor(z / s))
+
+    def add(self, entity):
+        """Adds an entity to the index.
+
+        Entities without a bounding box are ignored.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+        """
+        bb = entity.bounding_box
+        if not bb:
+            return
+
+        l, m = bb
+        self.extent = max(self.extent, (m.x - l.x) / 2, (m.z - l.z) / 2)
+        self.top = max(self.top, m.y)
+        self.margin = int(ceil(self.extent / self.cell_size))
+
+        self.insert(entity, self.cell((l.x + m.x) / 2, (l.z + m.z) / 2))
+        try:
+            entity[Movable].on_move = self.move
+        except KeyError:
+            pass
+
+    def insert(self, entity, cell):
+        """Stores an entity into a cell, removing it from its current one.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+
+        :param cell: The cell coordinates
+        :type cell: tuple
+        """
+        e_id = entity.e_id
+        current = self.entity_cells.get(e_id)
+        if current == cell:
+            return
+        if current is not None:
+            self.discard(e_id, current)
+        self.entity_cells[e_id] = cell
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            bucket = self.cells[cell] = {}
+        bucket[e_id] = entity
+
+    def discard(self, e_id, cell):
+        """Removes an entity from a cell.
+
+        :param e_id: The local id of the entity
+        :type e_id: int
+
+        :param cell: The cell coordinates
+        :type cell: tuple
+        """
+        bucket = self.cells[cell]
+        del bucket[e_id]
+        if not bucket:
+            del self.cells[cell]
+
+    def move(self, entity, position):
+        """Updates the cell of an entity after a change of its position.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+
+        :param position: The new position in world coordinates
+        :type position: tuple
+        """
+        if entity.e_id in self.entity_cells:
+            self.insert(entity, self.cell(position[0], position[1]))
+
+    def remove(self, entity):
+        """Removes an entity from the index.
+
+        :param entity: The entity
+        :type entity: :class:`game.entities.entity.Entity`
+        """
+        cell = self.entity_cells.pop(entity.e_id, None)
+        if cell is None:
+            return
+        self.discard(entity.e_id, cell)
+        try:
+            entity[Movable].on_move = None
+        except KeyError:
+            pass
+
+    def traverse(self, pos, ray):
+        """Returns the cells crossed by a ray, in front-to-back order.
+
+        Only the part of the ray between the ground and the top of the highest
+        bounding box is considered.
+
+        :param pos: The origin of the ray
+        :type pos: :class:`matlib.Vec`
+
+        :param ray: The direction of the ray
+        :type ray: :class:`matlib.Vec`
+
+        :returns: Generator of cell coordinates
+        :rtype: generator
+        """
+        if ray.y >= 0:
+            return
+
+        t0 = max((self.top - pos.y) / ray.y, 0.0)
+        t1 = -pos.y / ray.y
+        if t1 < t0:
+            return
+
+        s = self.cell_size
+        x0, z0 = pos.x + ray.x * t0, pos.z + ray.z * t0
+        x1, z1 = pos.x + ray.x * t1, pos.z + ray.z * t1
+        cx, cz = self.cell(x0, z0)
+        end_x, end_z = self.cell(x1, z1)
+
+        # Amanatides-Woo traversal: t_x and t_z are the values of the ray
+        # parameter at the next vertical and horizontal cell boundaries.
+        step_x = 1 if ray.x > 0 else -1
+        step_z = 1 if ray.z > 0 else -1
+        if ray.x:
+            t_x = ((cx + (step_x > 0)) * s - x0) / ray.x
+            dt_x = s / abs(ray.x)
+        else:
+            t_x = dt_x = float('inf')
+        if ray.z:
+            t_z = ((cz + (step_z > 0)) * s - z0) / ray.z
+            dt_z = s / abs(ray.z)
+        else:
+            t_z = dt_z = float('inf')
+
+        for _ in range(abs(end_x - cx) + abs(end_z - cz) + 1):
+            yield cx, cz
+            if t_x < t_z:
+                cx += step_x
+                t_x += dt_x
+            else:
+                cz += step_z
+                t_z += dt_z
+
+    def query_ray(self, pos, ray):
+        """Returns the entities which may be hit by a ray.
+
+        Entities are grouped by the cell of the ray they are found in, in
+        front-to-back order; each entity is returned once.
+
+        :param pos: The origin of the ray
+        :type pos: :class:`matlib.Vec`
+
+        :param ray: The direction of the ray
+        :type ray: :class:`matlib.Vec`
+
+        :returns: Generator of lists of entities
+        :rtype: generator
+        """
+        cells = self.cells
+        margin = range(-self.margin, self.margin + 1)
+        seen = set()
+        for cx, cz in self.traverse(pos, ray):
+            batch = []
+            for dx in margin:
+                for dz in margin:
+                    cell = cx + dx, cz + dz
+                    if cell in seen:
+                        continue
+                    seen.add(cell)
+                    bucket = cells.get(cell)
+                    if bucket:
+                        batch.extend(bucket.values())
+            if batch:
+                yield batch
@@ -3,6 +3,7 @@ from events import subscriber
 from game.events import ActorStatusChange
 from game.events import GameModeChange
 from game.events import TimeUpdate
+from log import get_logger
 from matlib.vec import Vec
 from renderlib.camera import OrthographicCamera
 from renderlib.quad import Quad
@@ -11,10 +12,9 @@ from renderlib.scene import Scene
 from renderlib.text import Text
 from renderlib.text import TextProps
 from renderlib.texture import Texture
-import logging
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 class HealthBar:
@@ -150,6 +150,8 @@ class UI:
         font = resource['font'].get_size(16)
         props = TextProps()
         props.color = Vec(1, 1, 1, 1)
+        self.font = font
+        self.text_props = props
 
         # Mode node
         self.game_mode_text = Text(font, Context.GameMode.default.value)
@@ -176,6 +178,10 @@ class UI:
         self.transform(self.health_bar.bg_obj, 0, avatar_res.data['width'] + 5)
         self.transform(self.health_bar.fg_obj, 0, avatar_res.data['width'] + 5)
 
+        # frame profile overlay (lines created on demand)
+        self.frame_stats_top = avatar_res.data['width'] + 40
+        self.frame_stats_texts = []
+
     def transform(self, obj, x, y):
         """Transform the UI scene node from screen space to scene space.
 
@@ -218,12 +224,28 @@ class UI:
         """
         self.clock_text.string = '{h:02d}:{m:02d}'.format(h=hour, m=minute)
 
+    def set_frame_stats(self, lines):
+        """Set the lines of the frame profile overlay.
+
+        :param lines: Lines of text to visualize (none to hide the overlay).
+        :type lines: list
+        """
+        while len(self.frame_stats_texts) < len(lines):
+            text = Text(self.font, '')
+            obj = self.scene.add_text(text, self.text_props)
+            self.transform(
+                obj, 0, self.frame_stats_top + 18 * len(self.frame_stats_texts))
+            self.frame_stats_texts.append(text)
+
+        for i, text in enumerate(self.frame_stats_texts):
+            text.string = lines[i] if i < len(lines) else ''
+
     def render(self):
         """Render the user interface."""
         self.scene.render(self.camera)
 
 
-@subscriber(TimeUpdate)
+@subscriber(TimeUpdate, deferred=True)
 def update_time(evt):
     """Updates the UI clock."""
     evt.context.ui.set_clock(evt.hour, evt.minute)
@@ -239,14 +261,12 @@ def show_gamemode(evt):
         context.ui.set_mode(context.GameMode.default)
 
 
-@subscriber(ActorStatusChange)
+@subscriber(ActorStatusChange, deferred=True)
 def player_health_change(evt):
     """Updates the number of hp of the actor.
     """
-    LOG.debug('Event subscriber: {}'.format(evt))
+    LOG.debug('Event subscriber: %s', evt)
     context = evt.context
-    srv_id = evt.srv_id
-    if srv_id == context.player_id and srv_id in context.server_entities_map:
-        e_id = context.server_entities_map[evt.srv_id]
-        actor = context.entities[e_id]
+    actor = context.resolve_entity(evt.srv_id)
+    if evt.srv_id == context.player_id and actor:
         context.ui.health_bar.value = evt.new / actor.resource.data['tot_hp']
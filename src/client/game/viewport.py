@@ -0,0 +1,167 @@
+"""Projection of the screen onto the ground plane.
+
+For a perspective camera the mapping of the screen points to the points of the
+ground plane (`y = 0` in scene coordinates) is a plane homography; it is fully
+determined by the ground points of the four screen corners. The homography is
+computed once each time the camera changes and then used to unproject any
+number of screen points without tracing rays through the camera.
+
+The ground points of the screen corners also bound the footprint of the view
+on the ground, which is used to tell the visible objects apart.
+"""
+from log import get_logger
+from matlib.vec import Vec
+import numpy as np
+
+
+LOG = get_logger(__name__)
+
+
+class Viewport:
+    """Cached screen to ground projection of a camera.
+
+    The projection assumes the camera looks down on the ground, so that the
+    whole screen maps onto the ground plane; it must be invalidated each time
+    the camera is moved.
+    """
+
+    def __init__(self, camera, width, height):
+        """Constructor.
+
+        :param camera: The camera of the scene
+        :type camera: :class:`renderlib.camera.Camera`
+
+        :param width: The width of the screen
+        :type width: int
+
+        :param height: The height of the screen
+        :type height: int
+        """
+        self.camera = camera
+        self.width = width
+        self.height = height
+
+        self.origin = None
+        self.matrix = None
+        self.footprint = None
+        self._edges = None
+        self._coeffs = None
+        self.updates = 0
+
+    def invalidate(self):
+        """Marks the projection as outdated after a change of the camera."""
+        self.matrix = None
+
+    def update(self):
+        """Computes the projection from the current camera, if outdated."""
+        if self.matrix is not None:
+            return
+
+        w, h = self.width, self.height
+        # Screen corners, in polygon order
+        corners = ((0, 0), (w, 0), (w, h), (0, h))
+        a = np.zeros((8, 8))
+        b = np.zeros(8)
+        for i, (x, y) in enumerate(corners):
+            pos, ray = self.camera.trace_ray(x, y, w, h)
+            t = -pos.y / ray.y
+            gx, gz = pos.x + ray.x * t, pos.z + ray.z * t
+            a[2 * i] = x, y, 1, 0, 0, 0, -x * gx, -y * gx
+            a[2 * i + 1] = 0, 0, 0, x, y, 1, -x * gz, -y * gz
+            b[2 * i], b[2 * i + 1] = gx, gz
+
+        self.matrix = np.append(np.linalg.solve(a, b), 1.0).reshape(3, 3)
+        self._coeffs = tuple(float(c) for c in self.matrix.flat)
+        self.origin = pos
+        self.footprint = b.reshape(4, 2)
+
+        # Start point and inward unit normal of each edge of the footprint
+        edges = np.roll(self.footprint, -1, axis=0) - self.footprint
+        normals = np.stack((-edges[:, 1], edges[:, 0]), axis=1)
+        normals /= np.hypot(normals[:, 0], normals[:, 1])[:, None]
+        x, z = self.footprint[:, 0], self.footprint[:, 1]
+        if np.dot(x, np.roll(z, -1)) - np.dot(np.roll(x, -1), z) < 0:
+            normals = -normals
+        self._edges = [
+            (p.tolist(), n.tolist()) for p, n in zip(self.footprint, normals)]
+
+        self.updates += 1
+        LOG.debug('Viewport projection updated (%d)', self.updates)
+
+    def unproject(self, xs, ys):
+        """Maps screen points onto the ground plane.
+
+        :param xs: The x coordinates relative to screen
+        :type xs: :class:`numpy.ndarray`
+
+        :param ys: The y coordinates relative to screen
+        :type ys: :class:`numpy.ndarray`
+
+        :returns: The x and z scene coordinates of the ground points
+        :rtype: :class:`tuple`
+        """
+        self.update()
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        m = self.matrix
+        d = m[2, 0] * xs + m[2, 1] * ys + m[2, 2]
+        return (
+            (m[0, 0] * xs + m[0, 1] * ys + m[0, 2]) / d,
+            (m[1, 0] * xs + m[1, 1] * ys + m[1, 2]) / d)
+
+    def contains(self, xs, zs, margin=0.0):
+        """Tells which ground points are within the view of the camera.
+
+        :param xs: The x scene coordinates of the points
+        :type xs: :class:`numpy.ndarray`
+
+        :param zs: The z scene coordinates of the points
+        :type zs: :class:`numpy.ndarray`
+
+        :param margin: The distance the points may be out of the footprint
+            on the ground of the screen by (eg. the extent of an object)
+        :type margin: float
+
+        :returns: The mask of the points within the view
+        :rtype: :class:`numpy.ndarray`
+        """
+        self.update()
+        inside = np.ones(len(xs), dtype=bool)
+        for (px, pz), (nx, nz) in self._edges:
+            inside &= (xs - px) * nx + (zs - pz) * nz >= -margin
+        return inside
+
+    def ground(self, x, y):
+        """Maps a single screen point onto the ground plane.
+
+        :param x: The x coordinate relative to screen
+        :type x: int
+
+        :param y: The y coordinate relative to screen
+        :type y: int
+
+        :returns: The point in scene coordinates
+        :rtype: :class:`matlib.vec.Vec`
+        """
+        self.update()
+        m0, m1, m2, m3, m4, m5, m6, m7, m8 = self._coeffs
+        d = m6 * x + m7 * y + m8
+        return Vec((m0 * x + m1 * y + m2) / d, 0, (m3 * x + m4 * y + m5) / d)
+
+    def ray(self, x, y):
+        """Returns the ray going through the given screen point.
+
+        :param x: The x coordinate relative to screen
+        :type x: int
+
+        :param y: The y coordinate relative to screen
+        :type y: int
+
+        :returns: The origin and the normalized direction of the ray
+        :rtype: :class:`tuple`
+        """
+        target = self.ground(x, y)
+        origin = self.origin
+        ray = target - origin
+        ray.norm()
+        return Vec(origin.x, origin.y, origin.z), ray
@@ -0,0 +1,335 @@
+"""Opt-in detection of the frames exceeding their time budget.
+
+When the watchdog is enabled, a background thread checks the frame being
+executed by the main loop at regular intervals; as soon as the frame runs over
+the budget, the thread starts sampling the Python stack of the main thread
+until the frame ends. The samples of each hitch are then written, in collapsed
+stack format (as consumed by flame graph tools), along with the phases of the
+main loop during which they were taken and the events dispatched within the
+frame.
+
+The time spent in the phases which wait by design (the frame pacing sleep and,
+with vertical sync, the buffer swap) is excluded from the budget: otherwise
+any budget below the frame period would report every frame as a hitch.
+"""
+from collections import Counter
+from collections import deque
+from log import get_logger
+from profiling import FrameProfiler
+import os
+import sys
+import threading
+import time
+
+
+LOG = get_logger(__name__)
+
+
+#: The currently enabled watchdog (if any)
+__WATCHDOG = None
+
+
+class Hitch:
+    """Stack samples of a frame which exceeded its budget."""
+
+    def __init__(self, start):
+        """Constructor.
+
+        :param start: Start of the frame (as returned by `time.perf_counter`)
+        :type start: float
+        """
+        self.start = start
+        # Time spent in the budgeted phases and in the whole frame
+        self.duration = 0.0
+        self.total = 0.0
+        self.samples = Counter()
+        self.events = Counter()
+
+    def report(self, origin, budget):
+        """Formats the hitch as a collapsed stack report.
+
+        Each stack line starts with the phase of the main loop the sample was
+        taken in and ends with the number of samples.
+
+        :param origin: Time the start of the hitch is reported relative to
+        :type origin: float
+
+        :param budget: Frame budget in seconds
+        :type budget: float
+
+        :returns: The report
+        :rtype: str
+        """
+        lines = [
+            '# hitch at {:.3f} s: {:.1f} ms (budget {:.1f} ms, '
+            'frame {:.1f} ms), {} samples'.format(
+                self.start - origin,
+                self.duration * 1000,
+                budget * 1000,
+                self.total * 1000,
+                sum(self.samples.values())),
+            '# events: {}'.format(', '.join(
+                '{} x{}'.format(name, n)
+                for name, n in self.events.most_common()) or '-'),
+        ]
+        for stack, n in self.samples.most_common():
+            lines.append('{} {}'.format(stack, n))
+        return '\n'.join(lines) + '\n\n'
+
+
+class HitchWatchdog:
+    """Watchdog of the frames of the main loop.
+
+    The main loop notifies the watchdog with :meth:`begin`, :meth:`mark` and
+    :meth:`end`, just like a :class:`profiling.FrameProfiler`; these calls only
+    store a few attributes, all the sampling is done by the watchdog thread.
+    """
+
+    def __init__(
+            self, budget, path, interval=0.005, max_samples=1000,
+            exclude=('wait',), clock=time.perf_counter):
+        """Constructor.
+
+        :param budget: Frame budget in seconds, for the phases not excluded
+        :type budget: float
+
+        :param path: Path of the file the reports are appended to
+        :type path: str
+
+        :param interval: Time between two checks (or samples) in seconds
+        :type interval: float
+
+        :param max_samples: Maximum number of stack samples taken per hitch
+        :type max_samples: int
+
+        :param exclude: The phases not accounted to the budget, since they wait
+            by design
+        :type exclude: tuple
+
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+        self.budget = budget
+        self.path = path
+        self.interval = interval
+        self.max_samples = max_samples
+        self.exclude = frozenset(exclude)
+        self.clock = clock
+        self.origin = clock()
+        self.hitches = 0
+
+        # State of the frame, shared with the watchdog thread
+        self.lock = threading.Lock()
+        self.start = None
+        self.phase = None
+        # End of the last phase and time spent in the excluded phases
+        self.last = None
+        self.excluded = 0.0
+        self.hitch = None
+        self.events = Counter()
+
+        # Hitches waiting to be written by the watchdog thread
+        self.reports = deque()
+
+        self.thread_id = threading.get_ident()
+        self.thread = None
+        self.running = False
+
+    def begin(self):
+        """Starts watching a new frame."""
+        self.events.clear()
+        now = self.clock()
+        with self.lock:
+            self.phase = None
+            self.excluded = 0.0
+            self.start = self.last = now
+
+    def mark(self, phase):
+        """Notifies the end of a phase of the frame.
+
+        :param phase: The name of the phase, one of
+            :attr:`profiling.FrameProfiler.PHASES`
+        :type phase: str
+        """
+        now = self.clock()
+        with self.lock:
+            if phase in self.exclude:
+                self.excluded += now - self.last
+            self.last = now
+            self.phase = phase
+
+    def elapsed(self, now):
+        """Returns the time spent in the budgeted phases of the frame.
+
+        Must be called holding the lock, while a frame is being watched.
+
+        :param now: The current time
+        :type now: float
+
+        :returns: The time in seconds
+        :rtype: float
+        """
+        elapsed = now - self.start - self.excluded
+        if self.current_phase() in self.exclude:
+            elapsed -= now - self.last
+        return elapsed
+
+    def event_sent(self, event):
+        """Accounts an event dispatched within the frame.
+
+        :param event: The event
+        :type event: :class:`events.Event`
+        """
+        self.events[type(event).__name__] += 1
+
+    def end(self):
+        """Ends the frame, scheduling the report if it was a hitch."""
+        now = self.clock()
+        with self.lock:
+            if self.start is None:
+                return
+            duration = self.elapsed(now)
+            start, self.start = self.start, None
+            hitch, self.hitch = self.hitch, None
+
+        if hitch is not None:
+            hitch.duration = duration
+            hitch.total = now - start
+            hitch.events.update(self.events)
+            self.reports.append(hitch)
+
+    def current_phase(self):
+        """Returns the phase of the main loop being executed.
+
+        :returns: The phase name
+        :rtype: str
+        """
+        phases = FrameProfiler.PHASES
+        phase = self.phase
+        if phase is None:
+            return phases[0]
+        i = phases.index(phase) + 1
+        return phases[i] if i < len(phases) else 'end'
+
+    def sample(self):
+        """Takes a sample of the stack of the main thread, if the current
+        frame exceeds the budget.
+
+        Excluded phases are not sampled.
+        """
+        with self.lock:
+            start = self.start
+            if start is None or self.current_phase() in self.exclude:
+                return
+            if self.elapsed(self.clock()) < self.budget:
+                return
+
+            if self.hitch is None:
+                self.hitch = Hitch(start)
+            elif sum(self.hitch.samples.values()) >= self.max_samples:
+                return
+
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = collapse(frame)
+            self.hitch.samples['{};{}'.format(self.current_phase(), stack)] += 1
+
+    def write_reports(self):
+        """Appends the reports of the hitches ended so far to the file."""
+        if not self.reports:
+            return
+
+        with open(self.path, 'a') as fp:
+            while self.reports:
+                hitch = self.reports.popleft()
+                fp.write(hitch.report(self.origin, self.budget))
+                self.hitches += 1
+                LOG.warning(
+                    'Hitch: frame took %.1f ms (budget %.1f ms), written to %s',
+                    hitch.duration * 1000, self.budget * 1000, self.path)
+
+    def run(self):
+        """Main function of the watchdog thread."""
+        while self.running:
+            time.sleep(self.interval)
+            self.sample()
+            self.write_reports()
+
+    def start_thread(self):
+        """Starts the watchdog thread."""
+        self.running = True
+        self.thread = threading.Thread(
+            target=self.run, name='hitch-watchdog', daemon=True)
+        self.thread.start()
+
+    def stop_thread(self):
+        """Stops the watchdog thread, writing the pending reports."""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.write_reports()
+
+
+def collapse(frame):
+    """Formats a stack in collapsed format, from the outermost call.
+
+    :param frame: The innermost frame of the stack
+    :type frame: :class:`frame`
+
+    :returns: The functions of the stack, separated by semicolons
+    :rtype: str
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append('{}:{}'.format(
+            os.path.basename(code.co_filename), code.co_name))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def enable_watchdog(budget, path, **kwargs):
+    """Enables the hitch watchdog and starts its thread.
+
+    Must be called from the thread executing the main loop.
+
+    :param budget: Frame budget in seconds
+    :type budget: float
+
+    :param path: Path of the file the reports are appended to
+    :type path: str
+
+    :param kwargs: Other arguments for the :class:`HitchWatchdog` constructor
+    :type kwargs: dict
+
+    :returns: The enabled watchdog
+    :rtype: :class:`HitchWatchdog`
+    """
+    global __WATCHDOG
+    __WATCHDOG = HitchWatchdog(budget, path, **kwargs)
+    __WATCHDOG.start_thread()
+    return __WATCHDOG
+
+
+def disable_watchdog():
+    """Disables the hitch watchdog, stopping its thread.
+
+    :returns: The watchdog that was enabled (if any)
+    :rtype: :class:`HitchWatchdog` or None
+    """
+    global __WATCHDOG
+    watchdog, __WATCHDOG = __WATCHDOG, None
+    if watchdog is not None:
+        watchdog.stop_thread()
+    return watchdog
+
+
+def get_watchdog():
+    """Returns the currently enabled watchdog.
+
+    :returns: The watchdog or None, if disabled
+    :rtype: :class:`HitchWatchdog` or None
+    """
+    return __WATCHDOG
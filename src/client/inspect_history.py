@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""Command line inspector of gamestate history files."""
+from game.history import GameStateHistory
+from network import MessageField as MF
+from pprint import pformat
+import click
+import random
+
+
+#: Period between gamestates sent by the server, in milliseconds
+TICK_PERIOD = 100
+
+
+def format_gamestate(data):
+    """Formats a gamestate (or a delta) for human reading.
+
+    :param data: The gamestate or delta
+    :type data: dict
+
+    :returns: The formatted gamestate
+    :rtype: str
+    """
+    def decode(value):
+        if isinstance(value, dict):
+            return {decode(k): decode(v) for k, v in value.items()}
+        elif isinstance(value, (list, tuple)):
+            return [decode(v) for v in value]
+        elif isinstance(value, bytes):
+            return value.decode('utf8', 'replace')
+        return value
+    return pformat(decode(data))
+
+
+def synthetic_gamestates(n_entities, n_ticks, moving=0.5):
+    """Generates a stream of plausible gamestates.
+
+    :param n_entities: Number of entities in each gamestate
+    :type n_entities: int
+
+    :param n_ticks: Number of gamestates to generate
+    :type n_ticks: int
+
+    :param moving: Fraction of entities moving at each tick
+    :type moving: float
+
+    :returns: Generator of gamestates
+    :rtype: generator
+    """
+    rand = random.Random(0)
+    entities = {
+        i: {
+            MF.entity_type: 3,
+            MF.x_pos: rand.uniform(0, 100),
+            MF.y_pos: rand.uniform(0, 100),
+            MF.cur_hp: 10,
+            MF.action_type: 0,
+            MF.action: {},
+        }
+        for i in range(n_entities)
+    }
+    for tick in range(n_ticks):
+        for e in entities.values():
+            if rand.random() < moving:
+                e[MF.action_type] = 1
+                e[MF.x_pos] += rand.uniform(-0.2, 0.2)
+                e[MF.y_pos] += rand.uniform(-0.2, 0.2)
+                e[MF.action] = {MF.speed: 2.0}
+            else:
+                e[MF.action_type] = 0
+                e[MF.action] = {}
+            if rand.random() < 0.01:
+                e[MF.cur_hp] = max(e[MF.cur_hp] - 1, 0)
+        yield {
+            MF.timestamp: tick * TICK_PERIOD,
+            MF.time: tick // 600,
+            MF.entities: {k: dict(v) for k, v in entities.items()},
+            MF.buildings: {},
+            MF.objects: {},
+        }
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.command()
+@click.argument('history_file', type=click.File(mode='rb'))
+def info(history_file):
+    """Shows the ticks available in a history file."""
+    history = GameStateHistory.load(history_file)
+    if not len(history):
+        click.echo('Empty history')
+        return
+    first, last = history.first_tick, history.last_tick
+    duration = (history.timestamp(last) - history.timestamp(first)) / 1000
+    click.echo('Ticks: {}-{} ({:.1f} s)'.format(first, last, duration))
+    click.echo('Groups: {}'.format(len(history.groups)))
+    click.echo('Encoded size: {} bytes'.format(history.size))
+
+
+@main.command()
+@click.argument('history_file', type=click.File(mode='rb'))
+@click.argument('tick', type=int)
+def dump(history_file, tick):
+    """Dumps the gamestate of a tick."""
+    history = GameStateHistory.load(history_file)
+    click.echo(format_gamestate(history.get(tick)))
+
+
+@main.command()
+@click.argument('history_file', type=click.File(mode='rb'))
+@click.argument('a', type=int)
+@click.argument('b', type=int)
+def diff(history_file, a, b):
+    """Shows the differences between two ticks."""
+    history = GameStateHistory.load(history_file)
+    click.echo(format_gamestate(history.diff(a, b)))
+
+
+@main.command()
+@click.option('--entities', default=500)
+@click.option('--seconds', default=60)
+@click.option('--keyframe-interval', default=50)
+def bench(entities, seconds, keyframe_interval):
+    """Reports the memory used by a minute of synthetic history."""
+    n_ticks = int(seconds * 1000 / TICK_PERIOD)
+    history = GameStateHistory(
+        seconds, float('inf'), keyframe_interval=keyframe_interval)
+    for gamestate in synthetic_gamestates(entities, n_ticks):
+        history.push(gamestate)
+    per_minute = history.size * 60.0 / seconds
+    click.echo('{} entities, {} ticks: {} bytes ({:.1f} KiB per minute)'.format(
+        entities, len(history), history.size, per_minute / 1024))
+
+
+if __name__ == '__main__':
+    main()
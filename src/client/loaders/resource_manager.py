@@ -1,13 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from exceptions import ResourceError
 from functools import partial
 from loaders import load_obj
+from log import get_logger
 from utils import as_utf8
+import io
 import json
-import logging
 import os
+import time
 
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 DATAFILE = 'data.json'
 
@@ -76,6 +79,12 @@ class ResourceManager:
         self.r_path = os.path.abspath(conf['ResourceLocation'])
         self.cache = {}
 
+        #: Content of the files read ahead by :meth:`warmup`, by path
+        self.prefetched = {}
+        #: Whether the warmup is over: resources loaded afterwards are logged
+        # as hitch sources
+        self.warm = False
+
     def norm_path(self, path):
         """Normalizes the given path relative to the resource location
         configuration.
@@ -102,6 +111,7 @@ class ResourceManager:
         """
         res = self.cache.get(path)
         if not res:
+            start = time.perf_counter()
             abspath = self.norm_path(path)
             if os.path.isdir(abspath):
                 res = self.load_package(path)
@@ -109,8 +119,80 @@ class ResourceManager:
                 res = self.load(path)
 
             self.cache[path] = res
+            if self.warm:
+                LOG.warning(
+                    'Hitch: resource %s loaded lazily in %.1f ms',
+                    path, (time.perf_counter() - start) * 1000)
         return res
 
+    def open(self, path):
+        """Opens a resource file, using its prefetched content if available.
+
+        :param path: The resource relative path
+        :type path: str
+
+        :returns: The file object
+        :rtype: File
+        """
+        data = self.prefetched.pop(os.path.normpath(path), None)
+        if data is None:
+            return open(self.norm_path(path), 'rb')
+        fp = io.BytesIO(data)
+        fp.name = self.norm_path(path)
+        return fp
+
+    def read_package(self, package):
+        """Reads the content of all the files of a package.
+
+        :param package: The package
+        :type package: str
+
+        :returns: List of the resource paths and contents of the files
+        :rtype: list
+        """
+        files = []
+        root = self.norm_path(package)
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                abspath = os.path.join(dirpath, name)
+                path = os.path.join(package, os.path.relpath(abspath, root))
+                with open(abspath, 'rb') as fp:
+                    files.append((os.path.normpath(path), fp.read()))
+        return files
+
+    def warmup(self, packages, workers=4, progress=None):
+        """Loads the given packages ahead of their use.
+
+        The files of the packages are read by a pool of threads, while the
+        packages are loaded in order in the calling thread (as loading may
+        create GPU objects).
+
+        :param packages: The packages to be loaded
+        :type packages: list
+
+        :param workers: The number of reading threads
+        :type workers: int
+
+        :param progress: Function called as `progress(done, total, package)`
+            after the loading of each package
+        :type progress: callable
+        """
+        start = time.perf_counter()
+        packages = [p for p in packages if not self.cache.get(p)]
+        with ThreadPoolExecutor(max(workers, 1)) as executor:
+            futures = [executor.submit(self.read_package, p) for p in packages]
+            for i, (package, future) in enumerate(zip(packages, futures), 1):
+                self.prefetched.update(future.result())
+                self.get(package)
+                if progress:
+                    progress(i, len(packages), package)
+
+        # Drop the files not referenced by the packages
+        self.prefetched.clear()
+        LOG.info(
+            'Warmed up %d packages in %.2f s',
+            len(packages), time.perf_counter() - start)
+
     def load_package(self, package):
         """Loads the specified resource package.
 
@@ -120,9 +202,10 @@ class ResourceManager:
         :returns: The loaded resource
         :rtype: :class:`Resource`
         """
-        LOG.info('Loading package {}'.format(package))
+        LOG.info('Loading package %s', package)
         datafile = os.path.join(package, DATAFILE)
-        data = json.load(open(self.norm_path(datafile), 'r'))
+        with self.open(datafile) as fp:
+            data = json.loads(as_utf8(fp.read()))
 
         # Create the bare resource structure
         res = Package(package, data)
@@ -146,15 +229,16 @@ class ResourceManager:
         :returns: The loaded resource
         :rtype: :class:`Resource`
         """
-        LOG.info('Loading resource {}'.format(resource))
+        LOG.info('Loading resource %s', resource)
         _, ext = os.path.splitext(resource)
         load = self.get_loader(ext)
 
         # NOTE: we need to pass the directory name of the current resource
         # object, to calculate eventual relative linked objects.
-        res = Resource(resource, load(
-            fp=open(self.norm_path(resource), 'rb'),
-            cwd=os.path.dirname(resource)))
+        with self.open(resource) as fp:
+            res = Resource(resource, load(
+                fp=fp,
+                cwd=os.path.dirname(resource)))
 
         return res
 
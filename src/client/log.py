@@ -0,0 +1,194 @@
+"""Logging layer for the client hot paths.
+
+Loggers returned by :func:`get_logger` expose the usual logging methods, bound
+either to the underlying :class:`logging.Logger` method or, when the level is
+disabled (or the module is filtered out), to a function doing nothing. A
+disabled call costs a single function call: callers are expected to pass the
+arguments separately, `%`-style, so that they are formatted only when the
+record is actually emitted:
+
+    LOG.debug('Received message: %s %s', msg, msg.data)
+
+Loggers are bound at creation time and rebound by :func:`update_loggers`,
+which must be called whenever the logging configuration changes.
+"""
+from functools import lru_cache
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+import logging
+import queue
+
+
+#: Loggers created with get_logger, by name
+__LOGGERS = {}
+
+#: Enabled modules (all if empty)
+__MODULES = ()
+
+
+#: Logging methods and their levels
+METHODS = (
+    ('debug', logging.DEBUG),
+    ('info', logging.INFO),
+    ('warning', logging.WARNING),
+    ('error', logging.ERROR),
+    ('critical', logging.CRITICAL),
+)
+
+
+def noop(*args, **kwargs):
+    """Replacement of the logging methods of disabled levels."""
+
+
+class Lazy:
+    """Argument of a logging call computed only when the record is emitted.
+
+    Useful for arguments which are expensive to compute:
+
+        LOG.debug('Entities: %s', Lazy(len, context.entities))
+    """
+    __slots__ = ('f', 'args')
+
+    def __init__(self, f, *args):
+        """Constructor.
+
+        :param f: The function computing the argument
+        :type f: callable
+
+        :param args: The arguments of the function
+        :type args: tuple
+        """
+        self.f = f
+        self.args = args
+
+    def __str__(self):
+        return str(self.f(*self.args))
+
+
+class Logger:
+    """Logger binding the methods of disabled levels to a no-op function.
+
+    Any other attribute is looked up in the wrapped :class:`logging.Logger`.
+    """
+
+    def __init__(self, name):
+        """Constructor.
+
+        :param name: The name of the logger
+        :type name: str
+        """
+        self.logger = logging.getLogger(name)
+        self.update()
+
+    def __getattr__(self, name):
+        return getattr(self.logger, name)
+
+    def update(self):
+        """Rebinds the logging methods to the current configuration."""
+        enabled = is_module_enabled(self.logger.name)
+        for method, level in METHODS:
+            if enabled and self.logger.isEnabledFor(level):
+                setattr(self, method, getattr(self.logger, method))
+            else:
+                setattr(self, method, noop)
+
+
+def get_logger(name):
+    """Returns the logger with the given name.
+
+    :param name: The name of the logger, usually the module `__name__`
+    :type name: str
+
+    :returns: The logger
+    :rtype: :class:`Logger`
+    """
+    logger = __LOGGERS.get(name)
+    if logger is None:
+        logger = __LOGGERS[name] = Logger(name)
+    return logger
+
+
+def update_loggers():
+    """Rebinds all the loggers to the current logging configuration."""
+    for logger in __LOGGERS.values():
+        logger.update()
+
+
+def set_modules(modules):
+    """Sets the enabled modules.
+
+    Loggers of other modules are disabled altogether.
+
+    :param modules: The enabled modules (all if empty)
+    :type modules: iterable of str
+    """
+    global __MODULES
+    __MODULES = tuple(sorted(modules))
+    update_loggers()
+
+
+def is_module_enabled(name):
+    """Checks if a logger belongs to one of the currently enabled modules.
+
+    :param name: The name of the logger
+    :type name: str
+
+    :returns: True if the logger is enabled, otherwise False
+    :rtype: bool
+    """
+    return module_enabled(__MODULES, name)
+
+
+@lru_cache(maxsize=None)
+def module_enabled(modules, name):
+    """Checks if a logger belongs to one of the enabled modules.
+
+    The result is cached for each logger name.
+
+    :param modules: The enabled modules (all if empty)
+    :type modules: tuple
+
+    :param name: The name of the logger
+    :type name: str
+
+    :returns: True if the logger is enabled, otherwise False
+    :rtype: bool
+    """
+    if not modules:
+        return True
+    path = name.split('.')
+    for i in range(len(path)):
+        if '.'.join(path[:i + 1]) in modules:
+            return True
+    return False
+
+
+def start_queue_listener():
+    """Moves the output of the root handlers to a background thread.
+
+    The root handlers are replaced by a single :class:`QueueHandler`, whose
+    records are emitted by a :class:`QueueListener` thread through the
+    original handlers. Handler filters are moved to the queue handler, so that
+    filtered records are discarded before being queued.
+
+    NOTE: records are still formatted by the queue handler in the calling
+    thread, because their arguments (eg. pooled events) may change afterwards.
+
+    :returns: The started listener, to be stopped on exit
+    :rtype: :class:`logging.handlers.QueueListener`
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    queue_handler = QueueHandler(queue.Queue(-1))
+    for handler in handlers:
+        root.removeHandler(handler)
+        for f in handler.filters[:]:
+            handler.removeFilter(f)
+            if f not in queue_handler.filters:
+                queue_handler.addFilter(f)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
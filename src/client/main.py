@@ -4,13 +4,23 @@ from client import Client
 from configparser import ConfigParser
 from contextlib import ContextDecorator
 from core import InputManager
+from events import disable_deferred_events
 from functools import partial
 from game.audio import AudioManager
+from game.gamestate import get_stats as gamestate_stats
+from game.gamestate import processor_stats
+from hitch import disable_watchdog
 from loaders import ResourceManager
+from log import module_enabled
+from log import set_modules
+from log import start_queue_listener
 from network import Connection
 from network import MessageProxy
+from profiling import disable_profiling
+from profiling import enable_profiling
 from renderer import Renderer
 from sdl2 import sdlmixer
+import atexit
 import click
 import game.actions  # noqa
 import logging
@@ -34,17 +44,10 @@ def filter_modules(modules, record):
     parameter and the return value are compliant to the logging.Filter.filter
     API.
 
-    :param modules: List of enabled modules
-    :type modules: list
+    :param modules: Enabled modules
+    :type modules: tuple
     """
-    if not modules:
-        return True
-    else:
-        path = record.name.split('.')
-        for i in range(len(path)):
-            if '.'.join(path[:i + 1]) in modules:
-                return True
-        return False
+    return module_enabled(modules, record.name)
 
 
 def setup_logging(config):
@@ -53,10 +56,10 @@ def setup_logging(config):
     :param config: the logging section of the config object
     :type config: :class:`configparser.SectionProxy`
     """
-    modules = []
+    modules = ()
     filter_str = config.get('Modules')
     if filter_str:
-        modules = list(map(lambda x: x.strip(), filter_str.split(',')))
+        modules = tuple(sorted(map(lambda x: x.strip(), filter_str.split(','))))
 
     numeric_level = getattr(logging, config['Level'], None)
     if not isinstance(numeric_level, int):
@@ -65,12 +68,20 @@ def setup_logging(config):
     # Configure the logging module
     logging.basicConfig(
         level=numeric_level,
-        format='[%(asctime)s - %(levelname)s:%(name)s] %(msg)s')
+        format='[%(asctime)s - %(levelname)s:%(name)s] %(message)s')
 
     # Add the filter to all the handlers
     for handler in logging.root.handlers:
         handler.addFilter(partial(filter_modules, modules))
 
+    # Rebind the client loggers to the new configuration
+    set_modules(modules)
+
+    # Write the log records from a background thread
+    if config.getboolean('Async', fallback=False):
+        listener = start_queue_listener()
+        atexit.register(listener.stop)
+
 
 class sdl2context(ContextDecorator):
 
@@ -99,7 +110,7 @@ class sdl2context(ContextDecorator):
 
 
 @sdl2context()
-def main(character, config):
+def main(character, config, profile=None):
     renderer = Renderer(config['Renderer'])
     conn = Connection(config['Network'])
     proxy = MessageProxy(conn)
@@ -110,21 +121,67 @@ def main(character, config):
     client = Client(
         character, renderer, proxy, input_mgr, res_mgr, audio_mgr, config)
 
-    client.start()
+    if profile:
+        enable_profiling()
+
+    try:
+        client.start()
+    finally:
+        queue = disable_deferred_events()
+        if queue:
+            LOG.info(
+                'Deferred events: {calls} calls, max depth {max_depth}, '
+                'mean latency {mean_latency:.4f} s, '
+                'p99 latency {p99_latency:.4f} s'.format(**queue.stats()))
+
+        LOG.info('Gamestate counters: %s', gamestate_stats())
+        LOG.info(
+            'Gamestate processors (invoked, skipped): %s', processor_stats())
+
+        watchdog = disable_watchdog()
+        if watchdog and watchdog.hitches:
+            LOG.info('Written {} hitch reports to {}'.format(
+                watchdog.hitches, watchdog.path))
+
+        profiler = disable_profiling()
+        if profiler:
+            LOG.info('Processors and subscribers profile:\n{}'.format(
+                profiler.table()))
+            profiler.export_trace(profile)
+            LOG.info('Written profiling trace to {}'.format(profile))
+
+        pool = client.context.enemy_pool
+        if pool is not None:
+            pool.clear()
+
+        if client.history:
+            path = config.get('Debug', 'HistoryFile', fallback='history.bin')
+            with open(path, 'wb') as fp:
+                client.history.save(fp)
+            LOG.info('Written gamestate history to {}'.format(path))
+
+        if client.archive:
+            client.archive.close()
+            LOG.info('Written gamestate archive to {}'.format(
+                client.archive.path))
 
 
 @click.command()
 @click.argument(
     'character',
     default='ivan')
-def bootstrap(character):
+@click.option(
+    '--profile',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Profile processors and subscribers, writing a Chrome trace file.')
+def bootstrap(character, profile):
     config = ConfigParser()
     config.read(CONFIG_FILE)
     setup_logging(config['Logging'])
 
     LOG.debug('Loaded config file {}'.format(CONFIG_FILE))
 
-    main(character, config)
+    main(character, config, profile)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,9 @@
 from contextlib import contextmanager
-import logging
+from log import get_logger
 import socket
 import struct
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 HEADER = struct.Struct('!HI')
 HEADER_LENGTH = HEADER.size
@@ -71,9 +71,9 @@ class Connection:
         :param payload: the encoded payload
         :type payload: bytes
         """
-        LOG.debug('Writing message: {} {}'.format(msgtype, payload))
+        LOG.debug('Writing message: %s %s', msgtype, payload)
         self.socket.sendall(create_packet(msgtype, payload))
-        LOG.debug('Written message: {} {}'.format(msgtype, payload))
+        LOG.debug('Written message: %s %s', msgtype, payload)
 
     @contextmanager
     def blocking(self):
@@ -107,7 +107,7 @@ class Connection:
             if header is None:
                 return
             self.header = parse_header(header)
-            LOG.debug('Received header: type={} size={}'.format(self.header[0], self.header[1]))
+            LOG.debug('Received header: type=%s size=%s', self.header[0], self.header[1])
 
         if self.header is not None:
             payload = read(self.header[1])
@@ -115,10 +115,10 @@ class Connection:
                 return None
 
             self.payload = payload
-            LOG.debug('Received payload: {} bytes'.format(len(payload)))
+            LOG.debug('Received payload: %s bytes', len(payload))
 
         # Returns the tuple (msgtype, payload)
         msgtype, payload = self.header[0], self.payload
         self.header, self.payload = None, None
-        LOG.debug('Received message: {} {}'.format(msgtype, payload))
+        LOG.debug('Received message: %s %s', msgtype, payload)
         return msgtype, payload
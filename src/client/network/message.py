@@ -1,10 +1,10 @@
 from enum import Enum
 from enum import IntEnum
 from enum import unique
-import logging
+from log import get_logger
 import msgpack
 
-LOG = logging.getLogger(__name__)
+LOG = get_logger(__name__)
 
 
 @unique
@@ -57,6 +57,8 @@ class Message:
     over the available connection.
     """
 
+    __slots__ = ('msgtype', 'data')
+
     def __init__(self, msgtype, data=None):
         """Constructor.
         :param msgtype: the type of the message
@@ -125,16 +127,16 @@ class MessageProxy:
         :param callback: Callback to be called when the message is pushed
         :type callback: function or None
         """
-        LOG.debug('Enqueueing message: {} {}'.format(msg, str(msg.data)))
+        LOG.debug('Enqueueing message: %s %s', msg, msg.data)
         self.msg_queue.append((msg, callback))
 
     def push(self):
         """Pushes the message through the underneath connection"""
         while len(self.msg_queue):
             msg, cb = self.msg_queue.pop(0)
-            LOG.debug('Pushing message: {} {}'.format(msg, str(msg.data)))
+            LOG.debug('Pushing message: %s %s', msg, msg.data)
             self.conn.send(*msg.encode())
-            LOG.debug('Pushed message: {} {}'.format(msg, str(msg.data)))
+            LOG.debug('Pushed message: %s %s', msg, msg.data)
             cb()
 
     def wait_for(self, msgtype):
@@ -163,8 +165,8 @@ class MessageProxy:
                 break
             mt, payload = data
             if msgtype and mt != msgtype:
-                LOG.debug('Discarded message: {}]'.format(mt))
+                LOG.debug('Discarded message: %s]', mt)
                 continue
             msg = Message.decode(mt, payload)
-            LOG.debug('Received message: {} {}'.format(msg, str(msg.data)))
+            LOG.debug('Received message: %s %s', msg, msg.data)
             yield msg
@@ -0,0 +1,429 @@
+"""Opt-in profiling of gamestate processors and event subscribers.
+
+When profiling is enabled, every processor registered with
+:func:`game.gamestate.processor` and every subscriber registered with
+:func:`events.subscriber` is timed, keeping track of the number of calls, the
+wall time spent and the number of events emitted during each call.
+
+The phases of the main loop are timed separately by :class:`FrameProfiler`,
+which keeps the most recent frames in a ring buffer.
+"""
+from collections import deque
+from math import ceil
+import csv
+import json
+import numpy as np
+import os
+import threading
+import time
+
+
+#: The currently enabled profiler (if any)
+__PROFILER = None
+
+
+class CallStats:
+    """Statistics of the calls to a single profiled function."""
+
+    def __init__(self, max_samples):
+        """Constructor.
+
+        :param max_samples: Number of most recent timings kept to compute
+            percentiles
+        :type max_samples: int
+        """
+        self.count = 0
+        self.total = 0.0
+        self.events = 0
+        self.samples = deque(maxlen=max_samples)
+
+    @property
+    def mean(self):
+        """Mean wall time of a call in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Returns the given percentile of the recent call timings.
+
+        :param p: The percentile (0-100)
+        :type p: float
+
+        :returns: The wall time in seconds
+        :rtype: float
+        """
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        i = max(int(ceil(p / 100.0 * len(samples))) - 1, 0)
+        return samples[i]
+
+    def add(self, duration, events):
+        """Records a call.
+
+        :param duration: Wall time of the call in seconds
+        :type duration: float
+
+        :param events: Number of events emitted during the call
+        :type events: int
+        """
+        self.count += 1
+        self.total += duration
+        self.events += events
+        self.samples.append(duration)
+
+
+class Profiler:
+    """Profiler of processors and subscribers calls."""
+
+    def __init__(self, max_samples=10000, max_trace=100000):
+        """Constructor.
+
+        :param max_samples: Number of timings kept for each function
+        :type max_samples: int
+
+        :param max_trace: Number of calls kept for the trace export
+        :type max_trace: int
+        """
+        self.max_samples = max_samples
+        self.stats = {}
+        self.trace = deque(maxlen=max_trace)
+        self.stack = []
+        self.origin = time.perf_counter()
+
+    def call(self, kind, f, *args):
+        """Calls the given function recording its timing.
+
+        :param kind: The kind of the function (eg. processor, subscriber)
+        :type kind: str
+
+        :param f: The function to be called
+        :type f: callable
+
+        :param args: The arguments of the call
+        :type args: tuple
+
+        :returns: The value returned by the function
+        """
+        # Counter of the events emitted within the call
+        frame = [0]
+        self.stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return f(*args)
+        finally:
+            end = time.perf_counter()
+            self.stack.pop()
+            self.record(kind, f, start, end, frame[0])
+
+    def record(self, kind, f, start, end, events):
+        """Records the call of a function.
+
+        :param kind: The kind of the function
+        :type kind: str
+
+        :param f: The function called
+        :type f: callable
+
+        :param start: Start of the call (as returned by `time.perf_counter`)
+        :type start: float
+
+        :param end: End of the call (as returned by `time.perf_counter`)
+        :type end: float
+
+        :param events: Number of events emitted during the call
+        :type events: int
+        """
+        name = '{}.{}'.format(f.__module__, f.__qualname__)
+        key = kind, name
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = CallStats(self.max_samples)
+        stats.add(end - start, events)
+        self.trace.append((kind, name, start, end, events))
+
+    def event_sent(self):
+        """Accounts an event emitted by the function currently being called.
+        """
+        if self.stack:
+            self.stack[-1][0] += 1
+
+    def table(self):
+        """Formats the collected statistics as a text table.
+
+        Rows are sorted by total wall time, in descending order; times are
+        expressed in milliseconds.
+
+        :returns: The table
+        :rtype: str
+        """
+        header = '{:<10} {:<60} {:>8} {:>10} {:>8} {:>8} {:>8}'
+        row = '{:<10} {:<60} {:>8} {:>10.3f} {:>8.3f} {:>8.3f} {:>8}'
+        lines = [header.format(
+            'kind', 'function', 'calls', 'total', 'mean', 'p99', 'events')]
+        items = sorted(
+            self.stats.items(), key=lambda item: item[1].total, reverse=True)
+        for (kind, name), stats in items:
+            lines.append(row.format(
+                kind,
+                name,
+                stats.count,
+                stats.total * 1000,
+                stats.mean * 1000,
+                stats.percentile(99) * 1000,
+                stats.events))
+        return '\n'.join(lines)
+
+    def trace_events(self):
+        """Returns the recorded calls in Chrome trace event format.
+
+        :returns: The trace object, ready to be serialized as JSON
+        :rtype: dict
+        """
+        pid, tid = os.getpid(), threading.get_ident()
+        return {
+            'traceEvents': [
+                {
+                    'name': name,
+                    'cat': kind,
+                    'ph': 'X',
+                    'ts': (start - self.origin) * 1e6,
+                    'dur': (end - start) * 1e6,
+                    'pid': pid,
+                    'tid': tid,
+                    'args': {'events': events},
+                }
+                for kind, name, start, end, events in self.trace
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def export_trace(self, path):
+        """Writes the recorded calls into a Chrome trace event JSON file.
+
+        :param path: The path of the output file
+        :type path: str
+        """
+        with open(path, 'w') as fp:
+            json.dump(self.trace_events(), fp)
+
+
+class FrameProfiler:
+    """Profiler of the phases of the main loop.
+
+    Each frame starts with :meth:`begin` and ends with :meth:`end`; the time
+    spent between two consecutive marks is accounted to the phase named by the
+    later :meth:`mark`. The durations of the phases of the last `size` frames
+    are kept in a preallocated ring buffer, so that profiling does not
+    allocate memory once the game is running.
+    """
+
+    #: The phases of the main loop, in order of execution
+    PHASES = (
+        'network',
+        'input',
+        'deferred',
+        'simulation',
+        'entities',
+        'scene',
+        'ui',
+        'present',
+        'messages',
+        'wait',
+    )
+
+    def __init__(self, size=600, clock=time.perf_counter):
+        """Constructor.
+
+        :param size: Number of most recent frames kept
+        :type size: int
+
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+        self.size = size
+        self.clock = clock
+        self.columns = {name: i for i, name in enumerate(self.PHASES)}
+        self.starts = np.zeros(size)
+        self.durations = np.zeros((size, len(self.PHASES)))
+        # Total number of frames recorded
+        self.frames = 0
+        self.origin = clock()
+        self.current = [0.0] * len(self.PHASES)
+        self.start = None
+        self.last = None
+
+    def __len__(self):
+        return min(self.frames, self.size)
+
+    def begin(self):
+        """Starts timing a new frame."""
+        self.start = self.last = self.clock()
+        current = self.current
+        for i in range(len(current)):
+            current[i] = 0.0
+
+    def mark(self, phase):
+        """Accounts the time elapsed since the previous mark to a phase.
+
+        :param phase: The name of the phase, one of :attr:`PHASES`
+        :type phase: str
+        """
+        now = self.clock()
+        self.current[self.columns[phase]] += now - self.last
+        self.last = now
+
+    def end(self):
+        """Stores the durations of the phases of the current frame."""
+        if self.start is None:
+            return
+        row = self.frames % self.size
+        self.starts[row] = self.start
+        self.durations[row] = self.current
+        self.frames += 1
+        self.start = None
+
+    def recent(self):
+        """Returns the recorded frames, from the oldest to the most recent.
+
+        :returns: The start times of the frames and the durations of their
+            phases (one row per frame, one column per phase)
+        :rtype: tuple
+        """
+        n = len(self)
+        if self.frames <= self.size:
+            return self.starts[:n], self.durations[:n]
+        order = np.roll(np.arange(self.size), -(self.frames % self.size))
+        return self.starts[order], self.durations[order]
+
+    def percentiles(self, ps=(50, 95, 99)):
+        """Computes the percentiles of the duration of each phase.
+
+        The duration of the whole frame is reported as the `frame` phase.
+
+        :param ps: The percentiles (0-100)
+        :type ps: tuple
+
+        :returns: The durations in seconds, for each phase
+        :rtype: dict
+        """
+        _, durations = self.recent()
+        if not len(durations):
+            zeros = [0.0] * len(ps)
+            return dict.fromkeys(self.PHASES + ('frame',), zeros)
+
+        durations = np.column_stack((durations, durations.sum(axis=1)))
+        values = np.percentile(durations, ps, axis=0)
+        return {
+            name: values[:, i].tolist()
+            for i, name in enumerate(self.PHASES + ('frame',))
+        }
+
+    def table(self):
+        """Formats the p50, p95 and p99 durations of the phases as text lines.
+
+        Times are expressed in milliseconds.
+
+        :returns: The lines of the table
+        :rtype: list
+        """
+        row = '{:<10} {:>6.2f} {:>6.2f} {:>6.2f}'
+        lines = ['{:<10} {:>6} {:>6} {:>6}'.format('phase', 'p50', 'p95', 'p99')]
+        percentiles = self.percentiles()
+        for name in self.PHASES + ('frame',):
+            lines.append(row.format(
+                name, *[v * 1000 for v in percentiles[name]]))
+        return lines
+
+    def export_csv(self, path):
+        """Writes the recorded frames into a CSV file.
+
+        Each row holds the start time of a frame and the durations of its
+        phases, in milliseconds.
+
+        :param path: The path of the output file
+        :type path: str
+        """
+        starts, durations = self.recent()
+        with open(path, 'w', newline='') as fp:
+            writer = csv.writer(fp)
+            writer.writerow(('start',) + self.PHASES)
+            for start, row in zip(starts.tolist(), durations.tolist()):
+                writer.writerow(
+                    ['{:.3f}'.format((start - self.origin) * 1000)] +
+                    ['{:.3f}'.format(d * 1000) for d in row])
+
+    def trace_events(self):
+        """Returns the recorded frames in Chrome trace event format.
+
+        :returns: The trace object, ready to be serialized as JSON
+        :rtype: dict
+        """
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        starts, durations = self.recent()
+        for start, row in zip(starts.tolist(), durations.tolist()):
+            ts = (start - self.origin) * 1e6
+            events.append({
+                'name': 'frame',
+                'cat': 'frame',
+                'ph': 'X',
+                'ts': ts,
+                'dur': sum(row) * 1e6,
+                'pid': pid,
+                'tid': tid,
+            })
+            for name, duration in zip(self.PHASES, row):
+                events.append({
+                    'name': name,
+                    'cat': 'phase',
+                    'ph': 'X',
+                    'ts': ts,
+                    'dur': duration * 1e6,
+                    'pid': pid,
+                    'tid': tid,
+                })
+                ts += duration * 1e6
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_trace(self, path):
+        """Writes the recorded frames into a Chrome trace event JSON file.
+
+        :param path: The path of the output file
+        :type path: str
+        """
+        with open(path, 'w') as fp:
+            json.dump(self.trace_events(), fp)
+
+
+def enable_profiling(**kwargs):
+    """Enables profiling of processors and subscribers.
+
+    :param kwargs: Arguments for the :class:`Profiler` constructor
+    :type kwargs: dict
+
+    :returns: The enabled profiler
+    :rtype: :class:`Profiler`
+    """
+    global __PROFILER
+    __PROFILER = Profiler(**kwargs)
+    return __PROFILER
+
+
+def disable_profiling():
+    """Disables profiling.
+
+    :returns: The profiler that was enabled (if any)
+    :rtype: :class:`Profiler` or None
+    """
+    global __PROFILER
+    profiler, __PROFILER = __PROFILER, None
+    return profiler
+
+
+def get_profiler():
+    """Returns the currently enabled profiler.
+
+    :returns: The profiler or None, if profiling is disabled
+    :rtype: :class:`Profiler` or None
+    """
+    return __PROFILER
@@ -32,6 +32,7 @@ class Renderer:
             gl_major, gl_minor = [
                 int(v) for v in config.get('openglversion', '3.3').split('.')
             ]
+            vsync = int(config.get('vsync', 0))
         except (KeyError, TypeError, ValueError) as err:
             raise ConfigError(err)
 
@@ -60,6 +61,10 @@ class Renderer:
             sdl.SDL_DestroyWindow(self.win)
             raise RuntimeError('failed to initialize OpenGL context')
 
+        # synchronize the buffer swaps with the vertical retrace, if requested
+        # and supported
+        self.vsync = bool(vsync) and sdl.SDL_GL_SetSwapInterval(1) == 0
+
         # initialize renderer
         renderer_init()
 
@@ -0,0 +1,41 @@
+from network import MessageField as MF
+import pytest
+
+
+class FakeClock:
+    """Clock advanced by hand, to be passed in place of `time.perf_counter`.
+
+    Each reading advances the clock by `tick` seconds, so that busy loops
+    waiting for the clock come to an end.
+    """
+
+    def __init__(self, tick=0.0):
+        self.now = 0.0
+        self.tick = tick
+        self.sleeps = []
+
+    def __call__(self):
+        self.now += self.tick
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def gamestate():
+    """Builder of the gamestates as received from the server."""
+    def build(entities, time=0, tstamp=0):
+        return {
+            MF.timestamp: tstamp,
+            MF.time: time,
+            MF.entities: entities,
+            MF.buildings: {},
+        }
+    return build
@@ -0,0 +1,50 @@
+from game.archive import Archive
+from game.archive import ArchiveWriter
+from network import MessageField as MF
+import numpy as np
+import pytest
+
+
+def entities(tstamp, n_entities):
+    return {
+        i: {
+            MF.entity_type: 3 if i % 2 else 0,
+            MF.x_pos: float(i),
+            MF.y_pos: float(tstamp),
+            MF.cur_hp: 10,
+            MF.action_type: 1,
+        }
+        for i in range(n_entities)
+    }
+
+
+def test_write_read(tmpdir, gamestate):
+    path = str(tmpdir.join('archive'))
+    writer = ArchiveWriter(path, chunk_ticks=4)
+    for t in range(10):
+        writer.push(gamestate(entities(t * 100, t + 1), tstamp=t * 100))
+    writer.close()
+
+    archive = Archive(path)
+    assert len(archive) == 10
+    assert len(archive.chunks) == 3
+
+    rows = archive.tick(7)
+    assert np.all(rows['id'] == np.arange(8))
+    assert np.all(rows['y'] == 700)
+
+    # zombies per tick
+    row_tick, types = archive.column('row_tick'), archive.column('type')
+    zombies = np.bincount(row_tick[types == 3], minlength=10)
+    assert list(zombies) == [(t + 1) // 2 for t in range(10)]
+
+
+def test_refuse_existing_archive(tmpdir, gamestate):
+    path = str(tmpdir.join('archive'))
+    writer = ArchiveWriter(path, chunk_ticks=4)
+    writer.push(gamestate(entities(0, 1)))
+    writer.close()
+
+    with pytest.raises(FileExistsError):
+        ArchiveWriter(path)
+    assert len(Archive(path)) == 1
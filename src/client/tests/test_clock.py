@@ -0,0 +1,43 @@
+from core.clock import ServerClock
+from core.clock import millis
+
+
+def test_millis():
+    a = millis()
+    b = millis()
+    assert 0 <= b - a < 1000
+
+
+def test_server_clock():
+    clock = ServerClock(max_samples=2)
+    assert not clock.synced
+
+    # The server read its clock halfway through a 20 ms round trip
+    assert clock.sync(100.0, 10110, 120.0) == 10000
+    assert clock.synced and clock.rtt == 20
+    assert clock.to_local(10500) == 500
+    assert clock.to_server(500) == 10500
+
+    # Faster round trips give better estimates
+    clock.sync(200.0, 10206, 210.0)
+    assert clock.offset == 10001 and clock.rtt == 10
+    clock.sync(300.0, 10400, 350.0)
+    assert clock.offset == 10001
+
+    # Only the most recent syncs are considered
+    clock.sync(400.0, 10420, 440.0)
+    assert clock.offset == 10000 and clock.rtt == 40
+
+
+def test_gamestate_before_sync():
+    clock = ServerClock()
+
+    # Stamped with the local time it was received at, not the server time
+    before = millis()
+    early = clock.to_local(1500000000000)
+    assert before <= early <= millis()
+
+    now = millis()
+    clock.sync(now - 10, 1500000000100, now)
+    late = clock.to_local(1500000000200)
+    assert 0 <= late - early < 1000
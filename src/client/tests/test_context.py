@@ -0,0 +1,69 @@
+from context import EntityRegistry
+from events import Event
+from events import keyed_subscriber
+from events import send_event
+import pytest
+
+
+class Thing:
+    def __init__(self, e_id):
+        self.e_id = e_id
+
+
+class Special(Thing):
+    pass
+
+
+class Hit(Event):
+    __slots__ = ['srv_id']
+
+    def __init__(self, srv_id):
+        self.srv_id = srv_id
+
+
+def test_entity_registry():
+    registry = EntityRegistry()
+    specials = registry.view(Special)
+
+    a, b = Thing(1), Special(2)
+    registry.add(a, 10)
+    registry.add(b, 20)
+    registry[3] = Thing(3)
+
+    assert registry.resolve(20) is b
+    assert registry.server_id(1) == 10
+    assert registry.server_id(3) is None
+    assert specials == {2: b}
+    assert registry.counts() == {'total': 3, 'server': 2, 'Special': 1}
+
+    with pytest.raises(ValueError):
+        registry.add(Thing(4), 10)
+
+    assert registry.remove_server(20) is b
+    assert registry.remove_server(20) is None
+    assert registry.resolve(20) is None
+    assert specials == {}
+    del registry[1]
+    assert registry.server_id(1) is None
+    assert list(registry) == [3]
+
+
+def test_entity_routes():
+    hits = []
+
+    @keyed_subscriber(Hit)
+    def on_hit(thing, evt):
+        hits.append(thing)
+
+    registry = EntityRegistry()
+    a, b = Thing(1), Thing(2)
+    registry.add(a, 10)
+    registry.add(b, 20, routed=False)
+    send_event(Hit(10))
+    send_event(Hit(20))
+    assert hits == [a]
+
+    # Entities are routed as long as they are registered
+    registry.remove_server(10)
+    send_event(Hit(10))
+    assert hits == [a]
@@ -0,0 +1,54 @@
+from game.components import Movable
+from game.components import MovableStore
+from game.culling import VisibilityPass
+from game.entities.entity import Entity
+from game.viewport import Viewport
+from matlib.vec import Vec
+
+
+class TopDownCamera:
+    """Camera looking straight down, seeing 20x10 units of ground."""
+
+    position = Vec(0, 10, 0)
+
+    def trace_ray(self, x, y, w, h):
+        p = self.position
+        ray = Vec(x / w * 20 - 10, -10, y / h * 10 - 5)
+        ray.norm()
+        return Vec(p.x, p.y, p.z), ray
+
+
+class Walker(Entity):
+
+    def __init__(self, store, position):
+        super().__init__(Movable(position, store))
+        self.changes = []
+        self[Movable].on_visible = self.changes.append
+
+    def update(self, dt):
+        pass
+
+    def remove(self):
+        self[Movable].release()
+
+
+def test_visibility_pass():
+    store = MovableStore()
+    viewport = Viewport(TopDownCamera(), 800, 400)
+    culling = VisibilityPass(viewport, store, margin=1.0)
+    inside, border, outside = (
+        Walker(store, (0, 0)), Walker(store, (10.5, 0)), Walker(store, (0, 7)))
+
+    culling.update()
+    assert culling.counts() == {'visible': 2, 'culled': 1}
+    assert inside.changes == [] and border.changes == []
+    assert outside.changes == [False]
+
+    outside[Movable].position = 0, 5.5
+    culling.update()
+    assert outside.changes == [False, True]
+
+    border.remove()
+    culling.update()
+    assert culling.counts() == {'visible': 2, 'culled': 0}
+    assert border.changes == []
@@ -0,0 +1,212 @@
+from core.events import KeyPressEvent
+from events import Event
+from events import PooledEvent
+from events import add_route
+from events import disable_deferred_events
+from events import enable_deferred_events
+from events import get_subscribers
+from events import keyed_subscriber
+from events import remove_route
+from events import send_event
+from events import send_events
+from events import set_pool_size
+from events import subscriber
+import pytest
+
+
+class BaseEvent(Event):
+    pass
+
+
+class DerivedEvent(BaseEvent):
+    pass
+
+
+def test_mro_dispatch():
+    received = []
+
+    @subscriber(BaseEvent)
+    def on_base(evt):
+        received.append(('base', type(evt)))
+
+    @subscriber(DerivedEvent)
+    def on_derived(evt):
+        received.append(('derived', type(evt)))
+
+    send_event(BaseEvent())
+    send_event(DerivedEvent())
+    assert received == [
+        ('base', BaseEvent),
+        ('derived', DerivedEvent),
+        ('base', DerivedEvent),
+    ]
+
+
+def test_dispatch_table_invalidation():
+    class OtherEvent(Event):
+        pass
+
+    assert get_subscribers(OtherEvent) == ()
+
+    received = []
+
+    @subscriber(OtherEvent)
+    def on_other(evt):
+        received.append(evt)
+
+    assert get_subscribers(OtherEvent) == (on_other,)
+    evts = [OtherEvent(), OtherEvent()]
+    send_events(evts)
+    assert received == evts
+
+
+class AddressedEvent(Event):
+    __slots__ = ['srv_id']
+
+    def __init__(self, srv_id):
+        self.srv_id = srv_id
+
+
+class UrgentEvent(Event):
+    __slots__ = ['srv_id']
+
+    def __init__(self, srv_id):
+        self.srv_id = srv_id
+
+
+def test_keyed_routing():
+    received = []
+
+    @keyed_subscriber(AddressedEvent)
+    def on_addressed(target, evt):
+        received.append((target, evt.srv_id))
+
+    add_route(1, 'one')
+    add_route(2, 'two')
+    send_events([AddressedEvent(1), AddressedEvent(2), AddressedEvent(3)])
+    assert received == [('one', 1), ('two', 2)]
+
+    assert remove_route(2) == 'two'
+    send_event(AddressedEvent(2))
+    assert received == [('one', 1), ('two', 2)]
+    remove_route(1)
+
+
+def test_deferred_ordering():
+    received = []
+
+    @subscriber(AddressedEvent, deferred=True, priority=1)
+    def on_low(evt):
+        received.append(('low', evt.srv_id))
+
+    @subscriber(UrgentEvent, deferred=True, priority=0)
+    def on_high(evt):
+        received.append(('high', evt.srv_id))
+
+    queue = enable_deferred_events(0)
+    try:
+        send_events([AddressedEvent(1), UrgentEvent(1), UrgentEvent(2)])
+        assert received == [] and len(queue) == 3
+
+        # Zero budget: a single call per drain
+        assert queue.drain() == 1
+        assert received == [('high', 2)]
+        queue.drain(float('inf'))
+        # Calls for the same entity are executed in order of emission
+        assert received == [('high', 2), ('low', 1), ('high', 1)]
+        assert queue.stats()['max_depth'] == 3
+    finally:
+        disable_deferred_events()
+
+
+class FailingEvent(PooledEvent):
+    __slots__ = ['srv_id']
+
+    def __init__(self, srv_id):
+        self.srv_id = srv_id
+
+
+def test_deferred_failure():
+    @subscriber(FailingEvent, deferred=True)
+    def on_failing(evt):
+        raise ValueError(evt.srv_id)
+
+    set_pool_size(4)
+    queue = enable_deferred_events(0)
+    try:
+        evt = FailingEvent.acquire(1)
+        send_event(evt)
+        assert evt.holds == 1
+
+        with pytest.raises(ValueError):
+            queue.drain()
+        # The event is given back even if its handler failed
+        assert evt.holds == 0
+        assert FailingEvent.free_list == [evt]
+    finally:
+        disable_deferred_events()
+        set_pool_size(0)
+
+
+class RecycledEvent(PooledEvent):
+    __slots__ = ['srv_id']
+
+    def __init__(self, srv_id):
+        self.srv_id = srv_id
+
+
+def test_slotted_events():
+    # Slots save memory only if no base class has a __dict__
+    for evt in (RecycledEvent(1), KeyPressEvent(2)):
+        assert not hasattr(evt, '__dict__')
+
+
+def test_pooled_reuse():
+    received = []
+
+    @subscriber(RecycledEvent)
+    def on_recycled(evt):
+        received.append(evt.srv_id)
+
+    set_pool_size(1)
+    try:
+        first = RecycledEvent.acquire(1)
+        send_event(first)
+        # Sent events are given back and reused by the next acquire
+        second = RecycledEvent.acquire(2)
+        assert second is first and second.srv_id == 2
+
+        # Free lists are capped to the pool size
+        third = RecycledEvent.acquire(3)
+        send_events([second, third])
+        assert RecycledEvent.free_list == [second]
+        assert received == [1, 2, 3]
+    finally:
+        set_pool_size(0)
+        RecycledEvent.free_list.clear()
+
+
+def test_pooled_deferred_hold():
+    received = []
+
+    @subscriber(RecycledEvent, deferred=True)
+    def on_recycled_later(evt):
+        received.append(evt.srv_id)
+
+    set_pool_size(4)
+    queue = enable_deferred_events(0)
+    try:
+        evt = RecycledEvent.acquire(5)
+        send_event(evt)
+        # The pending deferred call holds the event out of the free list
+        assert evt.holds == 1
+        assert evt not in RecycledEvent.free_list
+        assert RecycledEvent.acquire(6) is not evt
+
+        queue.drain(float('inf'))
+        assert received[-1] == 5
+        assert evt.holds == 0 and evt in RecycledEvent.free_list
+    finally:
+        disable_deferred_events()
+        set_pool_size(0)
+        RecycledEvent.free_list.clear()
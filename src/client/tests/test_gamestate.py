@@ -0,0 +1,80 @@
+from collections import Counter
+from game.entities.actor import ActionType
+from game.gamestate import GameStateManager
+from game.gamestate import depends_on
+from game.gamestate import get_stats
+from game.gamestate import handle_actor_idle
+from game.gamestate import process_gamestate
+from game.gamestate import processor_stats
+from network import MessageField as MF
+import game.gamestate
+
+
+def test_section_changed(gamestate):
+    gs_mgr = GameStateManager(2)
+    gs_mgr.push(gamestate({1: {MF.x_pos: 0}}))
+    # Everything changed when there is no previous gamestate
+    assert gs_mgr.changed([MF.buildings])
+
+    gs_mgr.push(gamestate({1: {MF.x_pos: 0}}))
+    assert not gs_mgr.changed([MF.time, MF.entities, MF.buildings])
+    assert gs_mgr.changes == {
+        MF.time: False, MF.entities: False, MF.buildings: False}
+
+    gs_mgr.push(gamestate({1: {MF.x_pos: 1}}))
+    assert not gs_mgr.section_changed(MF.time)
+    assert gs_mgr.changed([MF.time, MF.entities])
+
+
+def test_skip_unchanged(monkeypatch, gamestate):
+    calls = []
+
+    @depends_on(MF.entities)
+    @depends_on(MF.time)
+    def proc(gs_mgr):
+        calls.append(gs_mgr.get()[0][MF.time])
+
+    def always(gs_mgr):
+        calls.append('always')
+
+    assert proc.dependencies == (MF.time, MF.entities)
+
+    module = vars(game.gamestate)
+    monkeypatch.setitem(module, '__MANAGER', GameStateManager(2))
+    monkeypatch.setitem(module, '__PROCESSORS', [proc, always])
+    monkeypatch.setitem(module, '__INVOCATIONS', Counter())
+    monkeypatch.setitem(module, '__SKIPS', Counter())
+
+    process_gamestate(gamestate({}))
+    process_gamestate(gamestate({}))
+    process_gamestate(gamestate({}, time=1))
+    process_gamestate(gamestate({2: {}}, time=1))
+
+    assert calls == [0, 'always', 'always', 1, 'always', 1, 'always']
+    assert processor_stats() == {'proc': (3, 1), 'always': (4, 0)}
+
+
+def idle(x, y, action_type=ActionType.idle):
+    return {MF.action_type: action_type, MF.x_pos: x, MF.y_pos: y}
+
+
+def test_idle_suppression(monkeypatch, gamestate):
+    sent = []
+    monkeypatch.setattr(
+        game.gamestate, 'send_events',
+        lambda evts: sent.extend((e.srv_id, e.x, e.y) for e in evts))
+
+    gs_mgr = GameStateManager(2)
+    gs_mgr.push(gamestate({1: idle(0, 0), 2: idle(1, 1, ActionType.move)}))
+    handle_actor_idle(gs_mgr)
+    assert sent == [(1, 0, 0)]
+
+    # Unchanged idle actors are not notified again, while the ones that moved
+    # or stopped are
+    suppressed = get_stats().get('idle_suppressed', 0)
+    gs_mgr.push(gamestate({1: idle(0, 0), 2: idle(1, 1)}, time=1))
+    handle_actor_idle(gs_mgr)
+    gs_mgr.push(gamestate({1: idle(0, 1), 2: idle(1, 1)}, time=2))
+    handle_actor_idle(gs_mgr)
+    assert sent == [(1, 0, 0), (2, 1, 1), (1, 0, 1)]
+    assert get_stats()['idle_suppressed'] == suppressed + 2
@@ -0,0 +1,65 @@
+from game.history import GameStateHistory
+from game.history import apply_delta
+from game.history import compute_delta
+from io import BytesIO
+from network import MessageField as MF
+import pytest
+
+
+def entity(x, y, hp=10, action_type=0):
+    return {
+        MF.x_pos: x,
+        MF.y_pos: y,
+        MF.cur_hp: hp,
+        MF.action_type: action_type,
+    }
+
+
+def test_delta_roundtrip(gamestate):
+    old = gamestate({1: entity(0, 0), 2: entity(1, 1)})
+    new = gamestate({1: entity(0, 1), 3: entity(2, 2)}, time=1, tstamp=100)
+
+    delta = compute_delta(old, new)
+    assert delta[b'upd'][MF.entities] == {1: {MF.y_pos: 1}}
+    assert delta[b'gone'][MF.entities] == [2]
+    assert apply_delta(old, delta) == new
+
+
+def test_random_access(gamestate):
+    history = GameStateHistory(60, 1024 * 1024, keyframe_interval=3)
+    states = [
+        gamestate(
+            {1: entity(i, 0), 2: entity(0, i, hp=10 - i)}, tstamp=i * 100)
+        for i in range(10)
+    ]
+    for gs in states:
+        history.push(gs)
+
+    assert (history.first_tick, history.last_tick) == (0, 9)
+    for tick, gs in enumerate(states):
+        assert history.get(tick) == gs
+
+
+def test_time_window(gamestate):
+    history = GameStateHistory(1, 1024 * 1024, keyframe_interval=2)
+    for i in range(30):
+        history.push(gamestate({1: entity(i, 0)}, tstamp=i * 100))
+
+    assert history.last_tick == 29
+    assert history.timestamp(29) - history.timestamp(history.first_tick) <= 1100
+    with pytest.raises(IndexError):
+        history.get(0)
+
+
+def test_save_load(gamestate):
+    history = GameStateHistory(60, 1024 * 1024, keyframe_interval=4)
+    for i in range(10):
+        history.push(gamestate({1: entity(i, 0)}, tstamp=i * 100))
+
+    fp = BytesIO()
+    history.save(fp)
+    fp.seek(0)
+    loaded = GameStateHistory.load(fp)
+
+    assert (loaded.first_tick, loaded.last_tick) == (0, 9)
+    assert loaded.get(7) == history.get(7)
@@ -0,0 +1,95 @@
+from hitch import HitchWatchdog
+from hitch import disable_watchdog
+from hitch import enable_watchdog
+import time
+
+
+class Ping:
+    pass
+
+
+def test_sampling(tmpdir, clock):
+    path = str(tmpdir.join('hitches.txt'))
+    watchdog = HitchWatchdog(0.05, path, clock=clock)
+
+    # Frames within the budget are not sampled
+    watchdog.begin()
+    clock.now += 0.01
+    watchdog.sample()
+    watchdog.end()
+    assert not watchdog.reports
+
+    watchdog.begin()
+    watchdog.mark('network')
+    watchdog.event_sent(Ping())
+    watchdog.event_sent(Ping())
+    clock.now += 0.1
+    watchdog.sample()
+    watchdog.sample()
+    clock.now += 0.1
+    watchdog.end()
+    assert len(watchdog.reports) == 1
+
+    watchdog.write_reports()
+    assert watchdog.hitches == 1
+    report = tmpdir.join('hitches.txt').read()
+    assert '200.0 ms (budget 50.0 ms, frame 200.0 ms), 2 samples' in report
+    assert 'Ping x2' in report
+    # Samples are rooted in the phase being executed
+    assert 'input;' in report
+    assert 'test_hitch.py:test_sampling;hitch.py:sample 2' in report
+
+
+def test_excluded_phases(tmpdir, clock):
+    path = str(tmpdir.join('hitches.txt'))
+    watchdog = HitchWatchdog(
+        0.05, path, exclude=('present', 'wait'), clock=clock)
+
+    # Waiting for the display or for the next frame is not a hitch
+    watchdog.begin()
+    clock.now += 0.01
+    watchdog.mark('ui')
+    clock.now += 0.1
+    watchdog.sample()
+    watchdog.mark('present')
+    clock.now += 0.01
+    watchdog.mark('messages')
+    clock.now += 0.1
+    watchdog.sample()
+    watchdog.mark('wait')
+    watchdog.end()
+    assert not watchdog.reports
+
+    # but the time spent elsewhere is
+    watchdog.begin()
+    clock.now += 0.1
+    watchdog.mark('ui')
+    clock.now += 0.1
+    watchdog.mark('present')
+    clock.now += 0.1
+    watchdog.sample()
+    watchdog.mark('messages')
+    watchdog.mark('wait')
+    watchdog.end()
+    hitch = watchdog.reports[0]
+    assert abs(hitch.duration - 0.2) < 1e-9
+    assert abs(hitch.total - 0.3) < 1e-9
+    assert list(hitch.samples)[0].startswith('messages;')
+
+
+def stall(seconds):
+    time.sleep(seconds)
+
+
+def test_watchdog_thread(tmpdir):
+    path = str(tmpdir.join('hitches.txt'))
+    watchdog = enable_watchdog(0.01, path, interval=0.002)
+    try:
+        watchdog.begin()
+        stall(0.1)
+        watchdog.end()
+    finally:
+        assert disable_watchdog() is watchdog
+
+    assert watchdog.hitches == 1
+    assert 'test_hitch.py:stall' in tmpdir.join('hitches.txt').read()
@@ -0,0 +1,23 @@
+from log import get_logger
+from log import noop
+from log import set_modules
+import logging
+
+
+def test_disabled_levels():
+    logger = get_logger('test_log.levels')
+    logger.setLevel(logging.INFO)
+    set_modules(())
+    assert logger.debug is noop
+    assert logger.info == logger.logger.info
+
+
+def test_filtered_modules():
+    logger = get_logger('test_log.modules.child')
+    logger.setLevel(logging.INFO)
+    set_modules(['other'])
+    assert logger.warning is noop
+
+    set_modules(['test_log.modules'])
+    assert logger.warning == logger.logger.warning
+    set_modules(())
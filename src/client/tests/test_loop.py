@@ -0,0 +1,58 @@
+from core.loop import GameLoop
+from game.components import Movable
+from game.components import MovableStore
+from game.entities.entity import Entity
+
+
+def test_fixed_steps(clock):
+    clock.tick = 0.0001
+    loop = GameLoop(0.01, clock=clock, sleep=clock.sleep)
+    assert loop.advance() == (0, 0.0)
+
+    clock.now += 0.0349
+    steps, dt = loop.advance()
+    assert steps == 3 and abs(dt - 0.035) < 1e-9
+    assert abs(loop.alpha - 0.5) < 1e-6
+
+    # Stalls are truncated
+    clock.now += 10
+    assert loop.advance()[0] == 25
+
+
+def test_frame_cap(clock):
+    clock.tick = 0.0001
+    loop = GameLoop(0.01, max_fps=50, clock=clock, sleep=clock.sleep)
+    loop.advance()
+    clock.now += 0.005
+    loop.wait()
+    assert len(clock.sleeps) == 1
+    assert 0.02 <= clock.now - loop.last < 0.0205
+
+    # Frames are not capped under vertical sync
+    loop = GameLoop(0.01, max_fps=50, vsync=True, clock=clock, sleep=clock.sleep)
+    loop.advance()
+    loop.wait()
+    assert len(clock.sleeps) == 1
+
+
+class Walker(Entity):
+
+    def update(self, dt):
+        pass
+
+    def remove(self):
+        pass
+
+
+def test_interpolation():
+    store = MovableStore()
+    movable = Walker(Movable((0.0, 0.0), store))[Movable]
+    movable.move((0, 0), [(10, 0)], 1.0)
+    store.update(1.0)
+    store.alpha = 0.25
+    assert movable.interpolated == (0.25, 0.0)
+
+    store.update(10.0)
+    assert movable.position == (10, 0) and movable.moving
+    store.update(1.0)
+    assert not movable.moving
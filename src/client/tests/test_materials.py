@@ -0,0 +1,35 @@
+from game.materials import MaterialCache
+from loaders.resource_manager import Resource
+from unittest.mock import MagicMock
+import game.materials
+
+
+def test_shared_materials(monkeypatch):
+    monkeypatch.setattr(game.materials, 'Material', lambda: MagicMock())
+    texture_cls = MagicMock()
+    texture_cls.from_image.side_effect = lambda image, t: MagicMock()
+    monkeypatch.setattr(game.materials, 'Texture', texture_cls)
+
+    cache = MaterialCache()
+    zombie = Resource('/enemies/zombie', {})
+    zombie['texture'] = 'zombie.png'
+    grunt = Resource('/characters/grunt', {})
+    grunt['texture'] = 'grunt.png'
+
+    horde = [cache.acquire(zombie, 'texture', receive_light=True)
+             for _ in range(100)]
+    assert all(m is horde[0] for m in horde)
+    assert horde[0].receive_light is True
+    assert texture_cls.from_image.call_count == 1
+
+    # Other parameters share the texture, not the material
+    unlit = cache.acquire(zombie, 'texture')
+    assert unlit is not horde[0] and unlit.texture is horde[0].texture
+    cache.acquire(grunt, 'texture', receive_light=True)
+    assert cache.counts() == {'textures': 2, 'materials': 3}
+
+    for material in horde:
+        cache.release(material)
+    assert cache.counts() == {'textures': 2, 'materials': 2}
+    cache.release(unlit)
+    assert cache.counts() == {'textures': 1, 'materials': 1}
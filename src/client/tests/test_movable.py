@@ -0,0 +1,84 @@
+from game.components import Movable
+from game.components import MovableStore
+from game.entities.entity import Entity
+from math import pi
+import pytest
+
+
+class Dummy(Entity):
+
+    def __init__(self, store):
+        super().__init__(Movable((0.0, 0.0), store))
+
+    def update(self, dt):
+        pass
+
+    def remove(self):
+        self[Movable].release()
+
+
+def close(a, b):
+    return all(abs(x - y) < 1e-9 for x, y in zip(a, b))
+
+
+def test_store_movement():
+    store = MovableStore(capacity=2)
+    ents = [Dummy(store) for _ in range(5)]
+    assert store.capacity == 8 and len(store) == 5
+
+    moved = []
+    ents[0][Movable].on_move = lambda e, pos: moved.append(pos)
+    ents[0][Movable].move((0, 0), [(3, 0), (3, 4)], 1.0)
+    ents[1][Movable].move((1, 1), [(1, 11)], 2.0)
+
+    store.update(2.0)
+    assert close(ents[0][Movable].position, (2, 0))
+    assert close(ents[1][Movable].position, (1, 5))
+    assert ents[2][Movable].direction is None
+
+    # Crosses the first waypoint and goes on towards the second one
+    store.update(2.0)
+    assert close(ents[0][Movable].position, (3, 1))
+    assert close(ents[0][Movable].destination, (3, 4))
+    d = ents[0][Movable].direction
+    assert close((d.x, d.y), (0, 1))
+
+    # Arrives and stops
+    store.update(10.0)
+    assert close(ents[0][Movable].position, (3, 4))
+    assert ents[0][Movable].destination is None
+    assert ents[0][Movable].speed == 0
+    assert close(moved[-1], (3, 4)) and len(moved) == 4
+
+    # Slots are reused after release
+    index = ents[1][Movable].index
+    ents[1].remove()
+    assert len(store) == 4 and ents[1][Movable].index is None
+    with pytest.raises(RuntimeError):
+        ents[1][Movable].position
+    assert Dummy(store)[Movable].index == index
+
+
+def test_store_orientation():
+    store = MovableStore()
+    ent = Dummy(store)
+    ent[Movable].move((0, 0), [(0, 100)], 1.0)
+    for _ in range(200):
+        store.update(0.01)
+    # Facing the positive y direction
+    assert abs(abs(ent[Movable].heading) - pi) < 1e-6
+
+
+def test_store_orientation_lod():
+    store = MovableStore(lod=4)
+    shown, culled = Dummy(store), Dummy(store)
+    store.visible[culled[Movable].index] = False
+    for ent in (shown, culled):
+        ent[Movable].move((0, 0), [(0, 100)], 1.0)
+
+    # Culled movables are rotated at once by the rotations they skipped
+    store.update(0.01)
+    assert abs(culled[Movable].heading) > abs(shown[Movable].heading)
+    for _ in range(3):
+        store.update(0.01)
+    assert abs(culled[Movable].heading - shown[Movable].heading) < 1e-9
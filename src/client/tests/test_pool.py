@@ -0,0 +1,56 @@
+from game.components import Movable
+from game.entities.actor import ActorType
+from game.entities.enemy import Enemy
+from game.entities.pool import ActorPool
+from loaders.resource_manager import Resource
+from unittest.mock import MagicMock
+import game.entities.actor
+
+
+def test_enemy_pool():
+    resource = Resource('/enemies/zombie', {})
+    resource['model'] = MagicMock()
+    resource['texture'] = MagicMock()
+    pool = ActorPool(Enemy, MagicMock(), max_size=2)
+
+    pool.prewarm(resource, ActorType.zombie, 5)
+    assert len(pool) == 2
+    parked = list(pool.free[resource.r_path, ActorType.zombie])
+    assert all(e[Movable].index is None for e in parked)
+
+    enemies = [pool.acquire(resource, ActorType.zombie) for _ in range(3)]
+    assert enemies[:2] == parked[::-1]
+    assert len({e.e_id for e in enemies}) == 3
+    assert all(e[Movable].index is not None for e in enemies)
+    enemies[0][Movable].position = 1, 2
+    assert enemies[0].position == (1, 2)
+
+    for enemy in enemies:
+        pool.release(enemy)
+    stats = pool.stats()
+    assert (stats['free'], stats['hits'], stats['misses']) == (2, 2, 1)
+    # The exceeding enemy was removed from the scene
+    assert enemies[2].obj.remove.called
+
+
+def test_recycled_animations_and_clear(monkeypatch):
+    monkeypatch.setattr(
+        game.entities.actor, 'AnimationInstance', lambda a: MagicMock())
+    resource = Resource('/enemies/zombie', {})
+    resource['model'] = MagicMock()
+    resource['texture'] = MagicMock()
+    pool = ActorPool(Enemy, MagicMock(), max_size=2)
+
+    enemy = pool.acquire(resource, ActorType.zombie)
+    played = enemy.current_anim
+    pool.release(enemy)
+
+    # Recycled enemies start their animations from the beginning
+    assert pool.acquire(resource, ActorType.zombie) is enemy
+    assert enemy.current_anim is not played
+    assert enemy.props.animation is enemy.current_anim
+
+    pool.release(enemy)
+    pool.clear()
+    assert len(pool) == 0
+    assert enemy.obj.remove.called
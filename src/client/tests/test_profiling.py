@@ -0,0 +1,104 @@
+from configparser import ConfigParser
+from context import Context
+from core.events import KeyPressEvent
+from game.actions import handle_key_press
+from game.ui import UI
+from profiling import FrameProfiler
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import csv
+import game.actions
+import game.ui
+import json
+
+
+def record(profiler, clock, durations):
+    profiler.begin()
+    for phase, duration in zip(FrameProfiler.PHASES, durations):
+        clock.now += duration
+        profiler.mark(phase)
+    profiler.end()
+
+
+def test_ring_buffer(clock):
+    profiler = FrameProfiler(4, clock=clock)
+    for i in range(6):
+        record(profiler, clock, [0.001 * (i + 1)])
+
+    assert len(profiler) == 4
+    starts, durations = profiler.recent()
+    assert [round(d, 6) for d in durations[:, 0]] == [0.003, 0.004, 0.005, 0.006]
+    assert (starts[1:] > starts[:-1]).all()
+    assert not durations[:, 1:].any()
+
+
+def test_percentiles(clock):
+    profiler = FrameProfiler(100, clock=clock)
+    assert profiler.percentiles()['frame'] == [0.0, 0.0, 0.0]
+
+    for i in range(100):
+        record(profiler, clock, [0.001, 0.0, 0.0, 0.01 if i == 99 else 0.0])
+
+    p50, p95, p99 = profiler.percentiles()['simulation']
+    assert p50 == p95 == 0.0 and p99 > 0
+    assert abs(profiler.percentiles()['network'][0] - 0.001) < 1e-9
+    assert len(profiler.table()) == len(FrameProfiler.PHASES) + 2
+
+
+def test_export(tmpdir, clock):
+    profiler = FrameProfiler(10, clock=clock)
+    record(profiler, clock, [0.001, 0.002])
+    record(profiler, clock, [0.003])
+
+    path = str(tmpdir.join('frames.csv'))
+    profiler.export_csv(path)
+    with open(path) as fp:
+        rows = list(csv.reader(fp))
+    assert rows[0] == ['start'] + list(FrameProfiler.PHASES)
+    assert rows[1][1:3] == ['1.000', '2.000']
+    assert rows[2][0] == '3.000'
+
+    path = str(tmpdir.join('frames.json'))
+    profiler.export_trace(path)
+    with open(path) as fp:
+        events = json.load(fp)['traceEvents']
+    frames = [e for e in events if e['cat'] == 'frame']
+    assert len(frames) == 2
+    assert abs(frames[0]['dur'] - 3000) < 1e-6
+    phase = [e for e in events if e['name'] == 'input'][0]
+    assert abs(phase['ts'] - 1000) < 1e-6
+
+
+class Text:
+
+    def __init__(self, font, string):
+        self.string = string
+
+
+def test_overlay_key(monkeypatch, clock):
+    monkeypatch.setattr(game.ui, 'Text', Text)
+    monkeypatch.setattr(
+        game.actions, 'sdl', SimpleNamespace(SDLK_b=1, SDLK_F3=2, SDLK_F4=3))
+
+    ui = UI.__new__(UI)
+    ui.w, ui.h = 800, 600
+    ui.scene = MagicMock()
+    ui.font = ui.text_props = None
+    ui.frame_stats_top = 0
+    ui.frame_stats_texts = []
+
+    context = Context(ConfigParser())
+    context.ui = ui
+    context.frame_profiler = FrameProfiler(10, clock=clock)
+
+    # F3 shows the overlay, one text per line of the table
+    handle_key_press(KeyPressEvent(2))
+    lines = context.frame_profiler.table()
+    assert context.show_frame_stats
+    assert [t.string for t in ui.frame_stats_texts] == lines
+
+    # and hides it, keeping the texts for later
+    handle_key_press(KeyPressEvent(2))
+    assert not context.show_frame_stats
+    assert len(ui.frame_stats_texts) == len(lines)
+    assert all(t.string == '' for t in ui.frame_stats_texts)
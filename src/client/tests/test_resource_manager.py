@@ -0,0 +1,35 @@
+from loaders import ResourceManager
+import json
+import logging
+
+
+def write_package(root, name, resources):
+    package = root / name
+    package.mkdir()
+    files = {}
+    for res, value in resources.items():
+        files[res] = res + '.json'
+        (package / files[res]).write_text(json.dumps(value))
+    (package / 'data.json').write_text(json.dumps({'resources': files}))
+
+
+def test_warmup(tmp_path, caplog):
+    write_package(tmp_path, 'zombie', {'stats': {'hp': 10}})
+    write_package(tmp_path, 'turret', {'stats': {'hp': 50}})
+    write_package(tmp_path, 'late', {'stats': {'hp': 1}})
+    res_mgr = ResourceManager({'ResourceLocation': str(tmp_path)})
+
+    done = []
+    res_mgr.warmup(
+        ['/zombie', '/turret'], 2,
+        lambda i, n, package: done.append((i, n, package)))
+    assert done == [(1, 2, '/zombie'), (2, 2, '/turret')]
+    assert res_mgr.get('/turret')['stats'] == {'hp': 50}
+    assert not res_mgr.prefetched
+
+    res_mgr.warm = True
+    with caplog.at_level(logging.WARNING):
+        res_mgr.get('/zombie')
+        assert not caplog.records
+        assert res_mgr.get('/late')['stats'] == {'hp': 1}
+    assert any('/late' in r.getMessage() for r in caplog.records)
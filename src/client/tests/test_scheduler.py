@@ -0,0 +1,105 @@
+from context import EntityRegistry
+from game.components import Movable
+from game.components import MovableStore
+from game.components.movable import get_movable_store
+from game.entities.actor import ActionType
+from game.entities.actor import ActorType
+from game.entities.enemy import Enemy
+from game.entities.entity import Entity
+from game.scheduler import UpdateScheduler
+from loaders.resource_manager import Resource
+from unittest.mock import MagicMock
+import game.entities.actor
+
+
+class Walker(Entity):
+
+    def __init__(self, store):
+        super().__init__(Movable((0.0, 0.0), store))
+        self.updates = 0
+
+    def awake(self):
+        return self[Movable].destination is not None
+
+    def update(self, dt):
+        self.updates += 1
+
+    def remove(self):
+        pass
+
+
+class Static(Walker):
+
+    def awake(self):
+        return False
+
+
+def test_active_set():
+    store = MovableStore()
+    registry = EntityRegistry()
+    registry.scheduler = scheduler = UpdateScheduler()
+    walker, static = Walker(store), Static(store)
+    registry.add(walker)
+    registry.add(static)
+    assert registry.counts()['sleeping'] == 2
+
+    walker[Movable].move((0, 0), [(1, 0)], 1.0)
+    for _ in range(4):
+        store.update(0.5)
+        scheduler.update(0.5)
+    # Arrived after two updates, then put to sleep
+    assert walker.updates == 2 and static.updates == 0
+    assert scheduler.counts() == {'active': 0, 'sleeping': 2}
+
+    static.wake()
+    scheduler.update(0.5)
+    assert static.updates == 1 and not scheduler.active
+
+    registry.remove(walker.e_id)
+    assert len(scheduler) == 1 and walker.scheduler is None
+
+
+def test_idle_actor_sleeps(monkeypatch):
+    monkeypatch.setattr(
+        game.entities.actor, 'AnimationInstance', lambda a: MagicMock())
+    resource = Resource('/enemies/zombie', {})
+    resource['model'] = MagicMock()
+    resource['texture'] = MagicMock()
+    store = get_movable_store()
+    scheduler = UpdateScheduler()
+    enemy = Enemy(resource, MagicMock(), ActorType.zombie)
+    scheduler.add(enemy)
+
+    # Idle within the camera view: the idle animation is played
+    scheduler.update(0.5)
+    assert enemy.current_anim.play.called
+    assert scheduler.counts() == {'active': 1, 'sleeping': 0}
+
+    # Idle out of the camera view: put to sleep
+    store.visible[enemy[Movable].index] = False
+    enemy.set_visible(False)
+    scheduler.update(0.5)
+    assert scheduler.counts() == {'active': 0, 'sleeping': 1}
+
+    # Non-idle actions keep the actor awake out of the view as well
+    enemy.set_action(ActionType.attack)
+    scheduler.update(0.5)
+    assert scheduler.counts() == {'active': 1, 'sleeping': 0}
+    enemy.set_action(ActionType.idle)
+    scheduler.update(0.5)
+    assert scheduler.counts() == {'active': 0, 'sleeping': 1}
+
+    # Back into the view
+    store.visible[enemy[Movable].index] = True
+    enemy.set_visible(True)
+    assert scheduler.counts() == {'active': 1, 'sleeping': 0}
+
+    # Moving out of the view
+    store.visible[enemy[Movable].index] = False
+    enemy[Movable].move((0, 0), [(1, 0)], 1.0)
+    store.update(0.5)
+    scheduler.update(0.5)
+    assert scheduler.counts() == {'active': 1, 'sleeping': 0}
+
+    scheduler.remove(enemy)
+    enemy.remove()
@@ -0,0 +1,54 @@
+from game.components import Movable
+from game.entities.entity import Entity
+from game.spatial import SpatialHash
+from matlib.vec import Vec
+
+
+class Box(Entity):
+
+    def __init__(self, x, z):
+        super().__init__(Movable((x, z)))
+
+    @property
+    def bounding_box(self):
+        x, z = self[Movable].position
+        return Vec(x - 0.5, 0, z - 0.5), Vec(x + 0.5, 2, z + 0.5)
+
+    def update(self, dt):
+        pass
+
+    def remove(self):
+        pass
+
+
+def test_traverse():
+    spatial = SpatialHash(2)
+    spatial.add(Box(0, 0))
+    # Ray going down from (0.5, 10, 0.5) to the ground at (4.5, 0, -2.5)
+    cells = list(spatial.traverse(Vec(0.5, 10, 0.5), Vec(0.4, -1, -0.3)))
+    assert cells[0] == spatial.cell(0.5 + 0.4 * 8, 0.5 - 0.3 * 8)
+    assert cells[-1] == spatial.cell(4.5, -2.5)
+    for (ax, az), (bx, bz) in zip(cells, cells[1:]):
+        assert abs(bx - ax) + abs(bz - az) == 1
+
+
+def test_query_ray_follows_movables():
+    spatial = SpatialHash(2)
+    boxes = [Box(x, z) for x in range(-20, 20, 3) for z in range(-20, 20, 3)]
+    for box in boxes:
+        spatial.add(box)
+    target = boxes[0]
+
+    def candidates():
+        # Vertical ray at x=10.2, z=10.2
+        groups = spatial.query_ray(Vec(10.2, 10, 10.2), Vec(0, -1, 0))
+        return [e for group in groups for e in group]
+
+    assert target not in candidates()
+    target[Movable].position = 10, 10
+    assert target in candidates()
+    assert len(candidates()) < len(boxes) / 10
+
+    spatial.remove(target)
+    assert target not in candidates()
+    assert target[Movable].on_move is None
@@ -0,0 +1,27 @@
+from game.components import Transform
+from game.components import get_transform_counter
+from unittest.mock import MagicMock
+
+
+def test_transform_writes_changes_only():
+    obj = MagicMock()
+    transform = Transform(obj)
+    counter = get_transform_counter()
+    counter.reset()
+
+    assert transform.update((1.0, 2.0), 0.5, 0.1)
+    for _ in range(10):
+        assert not transform.update((1.0, 2.0), 0.5, 0.1)
+    assert counter.reset() == (3, 30)
+    assert obj.rotation.rotatev.call_count == 1
+
+    # Only the heading changed
+    assert transform.update((1.0, 2.0), 0.6, 0.1)
+    assert counter.reset() == (1, 2)
+    assert obj.rotation.rotatev.call_count == 2
+
+    # Unmanaged heading and scale are left untouched
+    transform.invalidate()
+    transform.update((3.0, 4.0))
+    assert counter.reset() == (1, 0)
+    assert obj.rotation.rotatev.call_count == 2
@@ -0,0 +1,36 @@
+from matlib.vec import Vec
+from utils import bounding_boxes
+from utils import intersect
+from utils import ray_aabb
+import numpy as np
+
+
+def box(x, y, z, size=1):
+    return Vec(x, y, z), Vec(x + size, y + size, z + size)
+
+
+def test_ray_aabb():
+    bbs = [
+        box(0, 0, 5),   # hit, farther
+        box(0, 0, 2),   # hit, nearer
+        box(3, 0, 2),   # miss
+        box(0, 0, -4),  # behind the origin
+    ]
+    # Ray along the z axis, parallel to the x and y planes
+    pos, ray = Vec(0.5, 0.5, 0), Vec(0, 0, 1)
+    hits, distances = ray_aabb(pos, ray, bounding_boxes(bbs))
+    assert hits.tolist() == [1, 0]
+    assert np.allclose(distances, [2, 5])
+    for i, bb in enumerate(bbs):
+        assert intersect(pos, ray, bb) == (i in hits)
+
+
+def test_ray_aabb_random():
+    rand = np.random.RandomState(0)
+    bbs = [box(*rand.uniform(-10, 10, 3), size=2) for _ in range(200)]
+    pos = Vec(0, 20, 0)
+    for _ in range(20):
+        ray = Vec(*rand.uniform(-1, 1, 3))
+        hits, _ = ray_aabb(pos, ray, bounding_boxes(bbs))
+        expected = [i for i, bb in enumerate(bbs) if intersect(pos, ray, bb)]
+        assert sorted(hits.tolist()) == expected
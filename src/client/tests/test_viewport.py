@@ -0,0 +1,63 @@
+from game.viewport import Viewport
+from matlib.vec import Vec
+import math
+
+
+class Camera:
+    """Pinhole camera looking down at the ground from above its target."""
+
+    def __init__(self, x, z):
+        self.position = Vec(x, 20, z + 5)
+        self.traced = 0
+
+    def trace_ray(self, x, y, w, h):
+        self.traced += 1
+        # Forward, right and up vectors of the camera
+        f = Vec(0, -20, -5)
+        f.norm()
+        r = Vec(1, 0, 0)
+        u = Vec(0, 5, -20)
+        u.norm()
+        s = math.tan(math.radians(12.5))
+        ray = f + r * ((2 * x / w - 1) * s * w / h) + u * ((1 - 2 * y / h) * s)
+        ray.norm()
+        p = self.position
+        return Vec(p.x, p.y, p.z), ray
+
+
+def ground(camera, x, y, w, h):
+    pos, ray = camera.trace_ray(x, y, w, h)
+    t = -pos.y / ray.y
+    return pos.x + ray.x * t, pos.z + ray.z * t
+
+
+def test_unproject_matches_ray_tracing():
+    camera = Camera(3, -2)
+    viewport = Viewport(camera, 800, 600)
+    points = [(x, y) for x in range(0, 801, 80) for y in range(0, 601, 75)]
+    xs, zs = viewport.unproject([p[0] for p in points], [p[1] for p in points])
+    for (x, y), gx, gz in zip(points, xs, zs):
+        ex, ez = ground(camera, x, y, 800, 600)
+        assert abs(gx - ex) < 1e-6 and abs(gz - ez) < 1e-6
+        p = viewport.ground(x, y)
+        assert abs(p.x - ex) < 1e-6 and abs(p.z - ez) < 1e-6
+
+    pos, ray = viewport.ray(400, 300)
+    _, expected = camera.trace_ray(400, 300, 800, 600)
+    assert abs(pos.y - 20) < 1e-9
+    assert abs(ray.dot(expected) - 1) < 1e-9
+
+
+def test_invalidate():
+    camera = Camera(0, 0)
+    viewport = Viewport(camera, 800, 600)
+    for x in range(100):
+        viewport.ground(x, x)
+    assert viewport.updates == 1 and camera.traced == 4
+
+    camera.position = Vec(10, 20, 15)
+    viewport.invalidate()
+    p = viewport.ground(400, 300)
+    ex, ez = ground(camera, 400, 300, 800, 600)
+    assert viewport.updates == 2
+    assert abs(p.x - ex) < 1e-6 and abs(p.z - ez) < 1e-6
@@ -1,6 +1,6 @@
-from datetime import datetime
 from matlib.vec import Vec
 import math
+import numpy as np
 
 
 def as_ascii(b):
@@ -21,19 +21,6 @@ def as_utf8(b):
     return b.decode('utf8')
 
 
-def tstamp(dt=None):
-    """Returns the number of milliseconds since epoch.
-
-    :param dt: the compared datetime object
-    :type dt: :class:`datetime.datetime` or None
-
-    :returns: number of milliseconds since epoch
-    :rtype: int
-    """
-    dt = dt or datetime.utcnow()
-    return int((dt - datetime(1970, 1, 1)).total_seconds() * 1000)
-
-
 def distance(p1, p2):
     """Returns the distance between the two points.
 
@@ -76,9 +63,12 @@ def to_world(x, y, z):
     return Vec(x, z, 0)
 
 
-def intersection(pos, ray, norm, d):
-    """Find the intersection between the ray and the playe defined by norm and
-    offset d from origin.
+def intersect(pos, ray, bb):
+    """Check if the ray starting from position pos intersects the bounding box.
+
+    Uses the slab method: the ray hits the box if the intervals of the ray
+    parameter within the three pairs of parallel planes overlap in front of the
+    origin.
 
     :param pos: The origin of the ray
     :type pos: :class:`matlib.Vec`
@@ -86,18 +76,48 @@ def intersection(pos, ray, norm, d):
     :param ray: The ray
     :type ray: :class:`matlib.Vec`
 
-    :param norm: The plane normal
-    :type norm: :class:`matlib.Vec`
+    :param bb: The entity bounding box
+    :type bb: :class:`tuple`
 
-    :param d: The distance from origin
-    :type d: :class:`matlib.Vec`
+    :returns: True if the ray intersects the bounding box, otherwise False
+    :rtype: bool
     """
-    t = -(pos.dot(norm) + d) / ray.dot(norm)
-    return pos + (ray * t)
+    l, m = bb
+    t_near, t_far = 0.0, float('inf')
+    for o, d, lo, hi in (
+            (pos.x, ray.x, l.x, m.x),
+            (pos.y, ray.y, l.y, m.y),
+            (pos.z, ray.z, l.z, m.z)):
+        if d:
+            t1, t2 = (lo - o) / d, (hi - o) / d
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_near, t_far = max(t_near, t1), min(t_far, t2)
+            if t_near > t_far:
+                return False
+        elif not lo <= o <= hi:
+            return False
+    return True
+
+
+def bounding_boxes(bbs):
+    """Builds the array of bounding boxes used by :func:`ray_aabb`.
+
+    :param bbs: The bounding boxes, as pairs of min and max corners
+    :type bbs: sequence of tuple
+
+    :returns: The array of the bounding boxes, of shape (N, 2, 3)
+    :rtype: :class:`numpy.ndarray`
+    """
+    return np.array(
+        [((l.x, l.y, l.z), (m.x, m.y, m.z)) for l, m in bbs],
+        dtype=float).reshape(-1, 2, 3)
 
 
-def intersect(pos, ray, bb):
-    """Check if the ray starting from position pos intersects the bounding box.
+def ray_aabb(pos, ray, boxes):
+    """Intersects a ray with a set of axis-aligned bounding boxes.
+
+    Vectorised slab method: all the boxes are tested at once.
 
     :param pos: The origin of the ray
     :type pos: :class:`matlib.Vec`
@@ -105,33 +125,36 @@ def intersect(pos, ray, bb):
     :param ray: The ray
     :type ray: :class:`matlib.Vec`
 
-    :param bb: The entity bounding box
-    :type bb: :class:`tuple`
+    :param boxes: The bounding boxes, as returned by :func:`bounding_boxes`
+    :type boxes: :class:`numpy.ndarray`
+
+    :returns: The indices of the boxes hit by the ray and the distances of the
+        hits (in units of the ray length), sorted front-to-back; a distance is
+        0 if the origin is inside the box
+    :rtype: tuple
     """
-    # FIXME: please generalize me
-    l, m = bb
-    # front plane
-    p = intersection(pos, ray, Vec(0, 0, -1), m.z)
-    if l.x <= p.x <= m.x and l.y <= p.y <= m.y:
-        return True
-    # left plane
-    p = intersection(pos, ray, Vec(1, 0, 0), l.x)
-    if l.y <= p.y <= m.y and l.z <= p.z <= m.z:
-        return True
-    # right plane
-    p = intersection(pos, ray, Vec(-1, 0, 0), m.x)
-    if l.y <= p.y <= m.y and l.z <= p.z <= m.z:
-        return True
-    # top plane
-    p = intersection(pos, ray, Vec(0, -1, 0), m.y)
-    if l.x <= p.x <= m.x and l.z <= p.z <= m.z:
-        return True
-    # back plane
-    p = intersection(pos, ray, Vec(1, 0, 0), l.z)
-    if l.x <= p.x <= m.x and l.y <= p.y <= m.y:
-        return True
-
-    return False
+    o = np.array((pos.x, pos.y, pos.z), dtype=float)
+    d = np.array((ray.x, ray.y, ray.z), dtype=float)
+    lo, hi = boxes[:, 0], boxes[:, 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (lo - o) / d
+        t2 = (hi - o) / d
+    t_min, t_max = np.minimum(t1, t2), np.maximum(t1, t2)
+
+    # The ray is parallel to the planes of an axis: either the origin lies
+    # within the slab and the axis doesn't constrain the ray, or it is a miss.
+    parallel = d == 0
+    if parallel.any():
+        inside = (lo <= o) & (o <= hi)
+        t_min = np.where(parallel, np.where(inside, -np.inf, np.inf), t_min)
+        t_max = np.where(parallel, np.where(inside, np.inf, -np.inf), t_max)
+
+    t_near = np.maximum(t_min.max(axis=1), 0.0)
+    t_far = t_max.min(axis=1)
+    hit = np.flatnonzero(t_near <= t_far)
+    order = np.argsort(t_near[hit], kind='mergesort')
+    return hit[order], t_near[hit][order]
 
 
 def clamp_to_grid(x, y, scale_factor):